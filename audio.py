@@ -0,0 +1,142 @@
+'''
+Brick Breaker - Audio
+'''
+
+# Import the pygame libary.
+import pygame
+
+# Import the threading and time libraries to load the sounds in the background and time the loading.
+import threading
+import time
+
+# Set the game's sounds: the file, volume, and priority of each, where priority 0 is the highest.
+SOUNDS = {
+    'life_loss': ('assets/life_loss.wav', 1.0, 0),
+    'level_complete': ('assets/level_complete.wav', 1.0, 0),
+    'paddle_hit': ('assets/paddle_hit.wav', 0.2, 1),
+    'brick_hit': ('assets/brick_hit.wav', 0.5, 2),
+}
+
+# Set the number of mixer channels reserved for each priority, highest first.
+CHANNELS = (2, 2, 4)
+
+# Define classes.
+class SoundMixer:
+    '''A class to queue the sounds of a frame and play each once at the end of it, on mixer channels reserved by priority.
+
+    However many balls hit bricks in a frame, the brick hit sound plays once, so a multi-ball storm cannot use up the mixer. A sound
+    whose channels are busy borrows an idle channel of a lower priority; failing that, the highest priority cuts off its own oldest
+    sound and the others are skipped for the frame.
+
+    The sounds are loaded by load(), which initializes the pygame mixer if needed and can run on a background thread
+    (load_in_background()); sounds asked for before it has finished are skipped. A mixer created with enabled=False, or that finds
+    no audio device, loads nothing and plays nothing.'''
+    def __init__(self, sounds=SOUNDS, channels=CHANNELS, enabled=True):
+        '''Initialize the mixer'''
+        self.enabled = enabled
+        self.sound_files = sounds
+        self.channel_counts = channels
+
+        # Define whether the sounds have been loaded, and how long loading them took in seconds.
+        self.loaded = False
+        self.load_time = 0.0
+
+        # Define the priority of each sound, and the sounds queued this frame with the number of times each was asked for.
+        self.priorities = {name: priority for name, (path, volume, priority) in sounds.items()}
+        self.queued = {}
+
+        # Define the counters of sounds asked for, played, merged with the same sound in their frame, and skipped because their
+        # channels were busy.
+        self.requested = 0
+        self.played = 0
+        self.merged = 0
+        self.skipped = 0
+
+        # Define the loaded sounds, the channels reserved for each priority, and the next channel the highest priority cuts off.
+        self.sounds = {}
+        self.channels = []
+        self.next_cut = 0
+
+    def load(self):
+        '''Initialize the pygame mixer if it is not already, load the sounds, and reserve their channels'''
+        start_time = time.perf_counter()
+        if self.enabled and pygame.mixer.get_init() is None:
+            # Carry on without sound if there is no audio device.
+            try:
+                pygame.mixer.init()
+            except pygame.error:
+                self.enabled = False
+        if self.enabled:
+            sounds = {}
+            for name, (path, volume, priority) in self.sound_files.items():
+                sounds[name] = pygame.mixer.Sound(path)
+                sounds[name].set_volume(volume)
+
+            # Reserve the channels, so that pygame's automatic channel choice (e.g. for music or other sounds) cannot take them.
+            channels = []
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), sum(self.channel_counts)))
+            pygame.mixer.set_reserved(sum(self.channel_counts))
+            first = 0
+            for count in self.channel_counts:
+                channels.append([pygame.mixer.Channel(i) for i in range(first, first + count)])
+                first += count
+            self.sounds = sounds
+            self.channels = channels
+        self.load_time = time.perf_counter() - start_time
+        self.loaded = True
+
+    def load_in_background(self):
+        '''Load the sounds on a background thread, e.g. while the first pause screen is up. Returns the thread.'''
+        thread = threading.Thread(target=self.load, name='sound loader', daemon=True)
+        thread.start()
+        return thread
+
+    def play(self, name):
+        '''Queue a sound to be played at the end of the frame. Asking for it again in the same frame does not play it again.'''
+        self.requested += 1
+        self.queued[name] = self.queued.get(name, 0) + 1
+
+    def flush(self):
+        '''Play each sound queued this frame once, highest priority first'''
+        if not self.queued:
+            return
+        if self.enabled and not self.loaded:
+            self.skipped += len(self.queued)
+        elif self.enabled:
+            for name in sorted(self.queued, key=self.priorities.__getitem__):
+                self.merged += self.queued[name] - 1
+                channel = self.find_channel(self.priorities[name])
+                if channel is None:
+                    self.skipped += 1
+                    continue
+                channel.play(self.sounds[name])
+                self.played += 1
+        self.queued.clear()
+
+    def find_channel(self, priority):
+        '''Return an idle channel for a sound of a priority, or None if the sound should be skipped'''
+        for channels in self.channels[priority:]:
+            for channel in channels:
+                if not channel.get_busy():
+                    return channel
+
+        # The highest priority sounds are never skipped: cut off the oldest sound on their own channels instead.
+        if priority == 0:
+            channels = self.channels[0]
+            channel = channels[self.next_cut % len(channels)]
+            self.next_cut += 1
+            return channel
+        return None
+
+    def stats(self):
+        '''Return the counters of sounds asked for, played, merged, and skipped'''
+        return {
+            'requested': self.requested,
+            'played': self.played,
+            'merged': self.merged,
+            'skipped': self.skipped,
+        }
+
+    def report(self):
+        '''Return a line of the sound counters, for the profiler overlay'''
+        return f'sounds {self.requested} asked, {self.played} played, {self.merged} merged, {self.skipped} skipped'
@@ -0,0 +1,273 @@
+'''
+Brick Breaker - Vectorized Ball System
+'''
+
+# Import the pygame libary.
+import pygame
+
+# Import the random library.
+import random
+
+# Import NumPy if it is available. The vectorized backend is optional and the sprite-based Simulation works without it.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Import the headless simulation core.
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, SPRITE_ASSETS, Simulation
+
+# Define classes.
+class BallView:
+    '''A lightweight stand-in for a Ball sprite, used to run the per-brick rules against one row of the ball arrays'''
+    def __init__(self, diameter):
+        '''Initialize the view'''
+        self.diameter = diameter
+        self.rect = pygame.Rect(0, 0, diameter, diameter)
+        self.dx = 0
+        self.dy = 0
+        self.velocity = 0
+
+class BallSystem:
+    '''A structure-of-arrays store for every ball in play, updated with one batched NumPy operation per rule'''
+    def __init__(self, capacity=64, random_generator=random):
+        '''Initialize the ball system'''
+        if numpy is None:
+            raise ImportError('The vectorized ball system requires NumPy. Install it with: pip install numpy')
+
+        # Define the random number generator used to pick each ball's direction.
+        self.random = random_generator
+
+        # Define the ball diameter, matching the Ball sprite.
+        self.diameter = 25
+
+        # Define the ball arrays. Positions hold the integer top-left corner of each ball's rect.
+        self.count = 0
+        self.x = numpy.zeros(capacity)
+        self.y = numpy.zeros(capacity)
+        self.dx = numpy.zeros(capacity)
+        self.dy = numpy.zeros(capacity)
+        self.velocity = numpy.zeros(capacity)
+
+        # Map each paddle width to its table of deflected directions.
+        self.deflection_tables = {}
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return self.count > 0
+
+    def grow(self):
+        '''Double the capacity of the ball arrays'''
+        capacity = max(1, len(self.x) * 2)
+        for name in ('x', 'y', 'dx', 'dy', 'velocity'):
+            array = numpy.zeros(capacity)
+            array[:self.count] = getattr(self, name)[:self.count]
+            setattr(self, name, array)
+
+    def add(self, x, y, velocity):
+        '''Add a ball centered on (x, y), drawing its starting direction exactly as the Ball sprite does'''
+        if self.count == len(self.x):
+            self.grow()
+        i = self.count
+        self.x[i] = x - self.diameter // 2
+        self.y[i] = y - self.diameter // 2
+        self.dx[i] = self.random.choice([-1, 1])
+        self.dy[i] = -1
+        self.velocity[i] = velocity
+        self.count += 1
+
+    def reset(self, i):
+        '''Reset a ball to the center of the screen'''
+        self.dx[i] = self.random.choice([-1, 1])
+        self.dy[i] = -1
+        self.x[i] = WINDOW_WIDTH // 2 - self.diameter // 2
+        self.y[i] = WINDOW_HEIGHT - 55 - self.diameter // 2
+
+    def keep(self, mask):
+        '''Keep only the balls selected by a boolean mask, preserving their order'''
+        n = self.count
+        kept = int(mask.sum())
+        for name in ('x', 'y', 'dx', 'dy', 'velocity'):
+            array = getattr(self, name)
+            array[:kept] = array[:n][mask]
+        self.count = kept
+
+    def empty(self):
+        '''Remove every ball'''
+        self.count = 0
+
+    def update(self):
+        '''Move every ball, rounding to whole pixels the same way a pygame rect does'''
+        n = self.count
+        self.x[:n] = round_half_away(self.x[:n] + self.dx[:n] * self.velocity[:n])
+        self.y[:n] = round_half_away(self.y[:n] + self.dy[:n] * self.velocity[:n])
+
+    def reflect_walls(self, top):
+        '''Reverse the balls that have reached the left, right, or top walls'''
+        n = self.count
+        x = self.x[:n]
+        dx = self.dx[:n]
+        dy = self.dy[:n]
+        dx[(x <= 0) & (dx < 0)] *= -1
+        dx[(x + self.diameter >= WINDOW_WIDTH) & (dx > 0)] *= -1
+        dy[(self.y[:n] <= top) & (dy < 0)] *= -1
+
+    def overlapping(self, rect):
+        '''Return a mask of the balls whose rects collide with a rect'''
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        return (x < rect.right) & (x + self.diameter > rect.left) & (y < rect.bottom) & (y + self.diameter > rect.top)
+
+    def deflect(self, paddle):
+        '''Bounce the balls touching the paddle based on where they struck it. Returns True if any ball touched the paddle.'''
+        hits = self.overlapping(paddle.rect)
+        if not hits.any():
+            return False
+
+        # The offset from the paddle center is a whole number of pixels, so look the new direction up in a table.
+        dx_table, dy_table, offset = self.deflection_table(paddle.width)
+        alpha = (self.x[:self.count][hits] + self.diameter // 2 - paddle.rect.centerx).astype(int)
+        self.dx[:self.count][hits] = dx_table[alpha + offset]
+        self.dy[:self.count][hits] = dy_table[alpha + offset]
+        return True
+
+    def deflection_table(self, paddle_width):
+        '''Return the deflected dx and dy for every possible paddle offset, computed once per paddle width'''
+        if paddle_width not in self.deflection_tables:
+            # Compute each entry with the same Python arithmetic as the sprite path so the results match to the last bit.
+            offset = paddle_width // 2 + self.diameter
+            beta = paddle_width / 2
+            dx_values = [alpha / beta for alpha in range(-offset, offset + 1)]
+            dy_values = [- (2 - (dx) ** 2) ** 0.5 for dx in dx_values]
+            self.deflection_tables[paddle_width] = (numpy.array(dx_values), numpy.array(dy_values), offset)
+        return self.deflection_tables[paddle_width]
+
+    def fallen(self, bottom):
+        '''Return a mask of the balls whose top edge is at or below a y coordinate'''
+        return self.y[:self.count] >= bottom
+
+    def load(self, i, view):
+        '''Copy one ball's state into a view'''
+        view.rect.topleft = (int(self.x[i]), int(self.y[i]))
+        view.dx = float(self.dx[i])
+        view.dy = float(self.dy[i])
+        view.velocity = float(self.velocity[i])
+        return view
+
+    def sprites(self):
+        '''Return a snapshot of the balls as views, for code written against a sprite group'''
+        return [self.load(i, BallView(self.diameter)) for i in range(self.count)]
+
+    def draw(self, surface):
+        '''Blit the shared ball image at every ball position'''
+        image = SPRITE_ASSETS.get('circle', WHITE, (self.diameter, self.diameter))
+        surface.blits([(image, (x, y)) for x, y in zip(self.x[:self.count].tolist(), self.y[:self.count].tolist())], False)
+
+class VectorSimulation(Simulation):
+    '''A Simulation that keeps its balls in a BallSystem instead of a sprite group. Results match the sprite-based Simulation.'''
+    def __init__(self, player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed=None):
+        '''Initialize the simulation, replacing the ball group with a ball system'''
+        super().__init__(player, paddle, paddle_group, BallSystem(), brick_group, powerup_group, seed)
+        self.ball_group.random = self.random
+
+        # Define a reusable view for running the per-brick rules.
+        self.ball_view = BallView(self.ball_group.diameter)
+
+        # Balls whose top edge is below the brick area cannot reach a brick, so the per-brick rules skip them.
+        self.brick_area_bottom = self.HUD_height + WINDOW_HEIGHT // 2
+
+    def add_ball(self):
+        '''Launch a new ball from the paddle at the current level's speed'''
+        self.ball_group.add(self.paddle.rect.centerx, self.paddle.rect.top, self.ball_speed)
+
+    def get_ball_states(self):
+        '''Return the position, direction, and velocity of every ball'''
+        balls = self.ball_group
+        n = balls.count
+        return list(zip(balls.x[:n].astype(int).tolist(), balls.y[:n].astype(int).tolist(), balls.dx[:n].tolist(), balls.dy[:n].tolist(), balls.velocity[:n].tolist()))
+
+    def set_ball_states(self, ball_states):
+        '''Replace the balls with ones in the given states'''
+        balls = self.ball_group
+        balls.empty()
+        for x, y, dx, dy, velocity in ball_states:
+            balls.add(0, 0, velocity)
+            i = balls.count - 1
+            balls.x[i], balls.y[i], balls.dx[i], balls.dy[i] = x, y, dx, dy
+
+    def check_wall_collisions(self):
+        '''Check collisions between the balls and the top, left, and right walls'''
+        self.ball_group.reflect_walls(self.HUD_height)
+
+    def check_paddle_collisions(self):
+        '''Check for collisions between the balls and the paddle'''
+        if self.ball_group.deflect(self.paddle):
+            self.on_paddle_hit()
+
+    def check_brick_collisions(self):
+        '''Check for collisions between the balls and bricks, running the per-brick rules only for balls next to a brick'''
+        balls = self.ball_group
+        view = self.ball_view
+        for i in self.balls_near_bricks().tolist():
+            bricks = self.brick_group.collide(balls.load(i, view))
+            if bricks:
+                for brick in bricks:
+                    self.hit_brick(view, brick)
+                balls.dx[i] = view.dx
+                balls.dy[i] = view.dy
+
+    def balls_near_bricks(self):
+        '''Return the indices of the balls overlapping a grid cell that holds a brick, found with one batched lookup'''
+        balls = self.ball_group
+        grid = self.brick_group
+        near = balls.y[:balls.count] < self.brick_area_bottom
+        occupied_cells = grid.occupied_cells()
+        if not occupied_cells or not near.any():
+            return numpy.flatnonzero(near)
+
+        # A ball can only span two cells per axis when the cells are at least as large as the ball.
+        if grid.cell_width < balls.diameter or grid.cell_height < balls.diameter:
+            return numpy.flatnonzero(near)
+
+        # Mark the occupied cells. The extra last row and column stay empty so out-of-range lookups land there.
+        keys = numpy.array([key for key in occupied_cells if key[0] >= 0 and key[1] >= 0], dtype=int).reshape(-1, 2)
+        occupied = numpy.zeros((keys[:, 0].max(initial=0) + 2, keys[:, 1].max(initial=0) + 2), dtype=bool)
+        occupied[keys[:, 0], keys[:, 1]] = True
+
+        # Look up the cells under each corner of every ball.
+        x = balls.x[:balls.count].astype(int)
+        y = balls.y[:balls.count].astype(int)
+        last_column, last_row = occupied.shape[0] - 1, occupied.shape[1] - 1
+        left = numpy.clip(x // grid.cell_width, -1, last_column)
+        right = numpy.clip((x + balls.diameter - 1) // grid.cell_width, -1, last_column)
+        top = numpy.clip(y // grid.cell_height, -1, last_row)
+        bottom = numpy.clip((y + balls.diameter - 1) // grid.cell_height, -1, last_row)
+        near &= occupied[left, top] | occupied[right, top] | occupied[left, bottom] | occupied[right, bottom]
+        return numpy.flatnonzero(near)
+
+    def check_fallen_ball(self):
+        '''Remove the balls that have fallen off the screen, and remove a life if the last ball has fallen'''
+        balls = self.ball_group
+        fallen = balls.fallen(WINDOW_HEIGHT)
+        if not fallen.any():
+            return
+
+        # If any ball is still in play, simply remove the fallen balls.
+        if not fallen.all():
+            balls.keep(~fallen)
+            return
+
+        # Otherwise every ball but the last is removed, and the last one is reset as the player loses a life.
+        balls.keep(numpy.arange(balls.count) == balls.count - 1)
+        balls.reset(0)
+        self.lose_life()
+
+def round_half_away(values):
+    '''Round an array to whole numbers with halves rounded away from zero, as pygame does when a float is assigned to a rect'''
+    magnitude = numpy.abs(values)
+    whole = numpy.floor(magnitude)
+    whole += (magnitude - whole) >= 0.5
+    return numpy.copysign(whole, values)
@@ -0,0 +1,249 @@
+'''
+Brick Breaker - Batch Simulator
+'''
+
+# Import the os library to name the level files.
+import os
+
+# Import the importlib library to load paddle control policies by name.
+import importlib
+
+# Import the ProcessPoolExecutor class to spread games across the CPU cores.
+from concurrent.futures import ProcessPoolExecutor
+
+# Import the headless simulation core.
+from simulation import TICKS_PER_SECOND, LEVEL_MANIFEST, create_simulation
+
+# Import the lookup of simulation types by name.
+from replay import simulation_class
+
+# Set the default policy, as a 'module:function' name so that worker processes can import it.
+POLICY = 'simulation:aiming_policy'
+
+# Set the game time after which an unfinished game is abandoned.
+MAX_TICKS = TICKS_PER_SECOND * 60 * 10
+
+# Set the number of the level manifest's endless levels played after its listed levels, by default.
+ENDLESS_LEVELS = 3
+
+# Set the number of games each worker plays per task, so that results return in batches rather than one at a time.
+CHUNK_SIZE = 25
+
+# Define classes.
+class GameRecord:
+    '''A class to count the events of one game by wrapping the methods of its simulation'''
+    def __init__(self, simulation):
+        '''Initialize the record and attach it to a simulation'''
+        self.simulation = simulation
+
+        # Define how the game ended: 'cleared', 'game_over', or None while it is still being played, and the score it ended with.
+        # The score is taken when the game ends, since the simulation resets the player straight afterwards.
+        self.outcome = None
+        self.score = None
+
+        # Define the event counters.
+        self.lives_lost = 0
+        self.bricks_broken = 0
+        self.powerups_dropped = 0
+        self.powerups_collected = 0
+
+        # Wrap the rules that produce each event.
+        break_brick = simulation.break_brick
+        check_powerup_collisions = simulation.check_powerup_collisions
+        on_life_lost = simulation.on_life_lost
+        on_game_over = simulation.on_game_over
+        on_level_complete = simulation.on_level_complete
+
+        def counted_break_brick(brick):
+            powerups = len(simulation.powerup_group)
+            break_brick(brick)
+            self.bricks_broken += 1
+            self.powerups_dropped += len(simulation.powerup_group) - powerups
+
+        def counted_check_powerup_collisions():
+            powerups = len(simulation.powerup_group)
+            check_powerup_collisions()
+            self.powerups_collected += powerups - len(simulation.powerup_group)
+
+        def counted_on_life_lost():
+            self.lives_lost += 1
+            on_life_lost()
+
+        def counted_on_game_over():
+            self.end('game_over')
+            on_game_over()
+
+        def counted_on_level_complete():
+            self.end('cleared')
+            on_level_complete()
+
+        simulation.break_brick = counted_break_brick
+        simulation.check_powerup_collisions = counted_check_powerup_collisions
+        simulation.on_life_lost = counted_on_life_lost
+        simulation.on_game_over = counted_on_game_over
+        simulation.on_level_complete = counted_on_level_complete
+
+    def end(self, outcome):
+        '''Record how the game ended, keeping the first outcome if more than one happens in the same tick'''
+        if self.outcome is None:
+            self.outcome = outcome
+            self.score = self.simulation.player.score
+
+def load_policy(name):
+    '''Return the paddle control policy named 'module:function\''''
+    module_name, function_name = name.split(':')
+    return getattr(importlib.import_module(module_name), function_name)
+
+def start_level(simulation, level, level_number):
+    '''Start a simulation on a compiled level, with the ball speed and scoring of a level number'''
+    simulation.ball_group.empty()
+    simulation.powerup_group.empty()
+    simulation.paddle.reset()
+    simulation.level_number = level_number
+    simulation.level_timer = 0
+    simulation.level = level
+    simulation.ball_speed = simulation.level_manifest.ball_speed(level_number)
+    simulation.lay_out_bricks()
+    simulation.add_ball()
+
+def level_number_of(brick_map):
+    '''Return the level number in a level file name such as level_2.txt, or 1 for other files'''
+    name = os.path.basename(brick_map).removesuffix('.txt')
+    number = name.rpartition('_')[2]
+    return int(number) if number.isdigit() else 1
+
+def load_level(simulation, level):
+    '''Return the compiled level and level number of a level to play: a level number of the manifest, or the path of a level file'''
+    if isinstance(level, int):
+        return simulation.level_manifest.level(level, simulation.level_cache), level
+    return simulation.level_cache.load(level, os.path.basename(level).removesuffix('.txt')), level_number_of(level)
+
+def manifest_levels(manifest, endless=ENDLESS_LEVELS):
+    '''Return the level numbers of the levels listed by a manifest, followed by a number of its endless levels if it has any'''
+    manifest.read()
+    return list(range(1, len(manifest.levels) + 1 + (endless if manifest.endless else 0)))
+
+def play_game(level, seed, policy, simulation_type, max_ticks=MAX_TICKS):
+    '''Play one level, a level number of the manifest or a level file, until it is cleared, the player runs out of lives, or the
+    game times out. Returns the game's results.'''
+    # Create the simulation without starting level 1, so that the level played is the first to draw from the seeded random numbers.
+    simulation = create_simulation(simulation_type, seed, start=False)
+    compiled_level, level_number = load_level(simulation, level)
+    start_level(simulation, compiled_level, level_number)
+    record = GameRecord(simulation)
+    ticks = 0
+    while record.outcome is None and ticks < max_ticks:
+        simulation.step(*policy(simulation))
+        ticks += 1
+    return {
+        'level': level if isinstance(level, str) else f'{level}: {compiled_level.name}',
+        'seed': seed,
+        'outcome': record.outcome or 'timeout',
+        'ticks': ticks,
+        'score': simulation.player.score if record.score is None else record.score,
+        'lives_lost': record.lives_lost,
+        'bricks_broken': record.bricks_broken,
+        'powerups_dropped': record.powerups_dropped,
+        'powerups_collected': record.powerups_collected,
+    }
+
+def play_games(task):
+    '''Play a chunk of games in a worker process. Takes (level, seeds, policy name, simulation type name, max_ticks).'''
+    level, seeds, policy_name, simulation_name, max_ticks = task
+    policy = load_policy(policy_name)
+    simulation_type = simulation_class(simulation_name)
+    return [play_game(level, seed, policy, simulation_type, max_ticks) for seed in seeds]
+
+def run_batch(levels, games, policy=POLICY, simulation_name='Simulation', max_ticks=MAX_TICKS, workers=None, first_seed=0):
+    '''Play a number of seeded games of each level (a level number of the manifest or a level file) across a pool of worker
+    processes, and return every game's results. Game i of every level uses seed first_seed + i, so results do not depend on the
+    number of workers.'''
+    tasks = []
+    for level in levels:
+        for start in range(first_seed, first_seed + games, CHUNK_SIZE):
+            seeds = range(start, min(start + CHUNK_SIZE, first_seed + games))
+            tasks.append((level, seeds, policy, simulation_name, max_ticks))
+
+    # Play in this process when only one worker is asked for, which keeps tracebacks and profiling simple.
+    if workers == 1:
+        chunks = map(play_games, tasks)
+        return [result for chunk in chunks for result in chunk]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return [result for chunk in executor.map(play_games, tasks) for result in chunk]
+
+def percentile(sorted_values, fraction):
+    '''Return a percentile of a sorted list, or None if it is empty'''
+    if not sorted_values:
+        return None
+    return sorted_values[int(fraction * (len(sorted_values) - 1))]
+
+def summarize(results):
+    '''Return the aggregate statistics of each level's games'''
+    levels = {}
+    for result in results:
+        levels.setdefault(result['level'], []).append(result)
+
+    summary = {}
+    for level, games in levels.items():
+        cleared = [game for game in games if game['outcome'] == 'cleared']
+        clear_times = sorted(game['ticks'] / TICKS_PER_SECOND for game in cleared)
+        scores = sorted(game['score'] for game in games)
+        dropped = sum(game['powerups_dropped'] for game in games)
+        collected = sum(game['powerups_collected'] for game in games)
+        total_time = sum(game['ticks'] for game in games) / TICKS_PER_SECOND
+        summary[level] = {
+            'games': len(games),
+            'clear_rate': len(cleared) / len(games),
+            'game_over_rate': sum(game['outcome'] == 'game_over' for game in games) / len(games),
+            'timeout_rate': sum(game['outcome'] == 'timeout' for game in games) / len(games),
+            'clear_time_p50': percentile(clear_times, 0.50),
+            'clear_time_p95': percentile(clear_times, 0.95),
+            'clear_time_mean': sum(clear_times) / len(clear_times) if clear_times else None,
+            'lives_lost_mean': sum(game['lives_lost'] for game in games) / len(games),
+            'score_min': scores[0],
+            'score_p05': percentile(scores, 0.05),
+            'score_p50': percentile(scores, 0.50),
+            'score_p95': percentile(scores, 0.95),
+            'score_max': scores[-1],
+            'score_mean': sum(scores) / len(scores),
+            'bricks_per_second': sum(game['bricks_broken'] for game in games) / total_time if total_time else 0.0,
+            'powerup_pickup_rate': collected / dropped if dropped else None,
+        }
+    return summary
+
+if __name__ == '__main__':
+    # Import the argparse, json, and time libraries to read the command line options, store the results, and time the batch.
+    import argparse
+    import json
+    import time
+
+    parser = argparse.ArgumentParser(description='Play many seeded Brick Breaker games of each level with a scripted paddle policy and report aggregate statistics.')
+    parser.add_argument('levels', nargs='*', help='level files to play (default: the levels of the level manifest)')
+    parser.add_argument('--endless', type=int, default=ENDLESS_LEVELS, help='number of the manifest\'s endless levels to play after its listed levels')
+    parser.add_argument('--games', type=int, default=100, help='number of games to play of each level')
+    parser.add_argument('--policy', default=POLICY, help='paddle control policy as module:function, called with the simulation and returning (left, right)')
+    parser.add_argument('--simulation', default='Simulation', help='simulation type: Simulation, VectorSimulation, or SweptSimulation')
+    parser.add_argument('--workers', type=int, default=None, help='number of worker processes (default: one per CPU core)')
+    parser.add_argument('--max-seconds', type=int, default=MAX_TICKS // TICKS_PER_SECOND, help='game time after which an unfinished game is abandoned')
+    parser.add_argument('--first-seed', type=int, default=0, help='seed of the first game of each level')
+    parser.add_argument('--save', default=None, help='write the statistics and every game\'s results to this JSON file')
+    args = parser.parse_args()
+
+    levels = args.levels or manifest_levels(LEVEL_MANIFEST, args.endless)
+    start_time = time.perf_counter()
+    results = run_batch(levels, args.games, args.policy, args.simulation, args.max_seconds * TICKS_PER_SECOND, args.workers, args.first_seed)
+    elapsed = time.perf_counter() - start_time
+    summary = summarize(results)
+
+    print(f'{"level":<24}{"clear":>7}{"clear s p50":>13}{"p95":>8}{"lives lost":>12}{"score p50":>11}{"p5-p95":>16}{"bricks/s":>10}{"pickups":>9}')
+    for level, stats in summary.items():
+        clear_p50 = f'{stats["clear_time_p50"]:>13.1f}' if stats['clear_time_p50'] is not None else f'{"-":>13}'
+        clear_p95 = f'{stats["clear_time_p95"]:>8.1f}' if stats['clear_time_p95'] is not None else f'{"-":>8}'
+        pickups = f'{stats["powerup_pickup_rate"]:>9.0%}' if stats['powerup_pickup_rate'] is not None else f'{"-":>9}'
+        score_range = f'{stats["score_p05"]}-{stats["score_p95"]}'
+        print(f'{level:<24}{stats["clear_rate"]:>7.0%}{clear_p50}{clear_p95}{stats["lives_lost_mean"]:>12.2f}{stats["score_p50"]:>11}{score_range:>16}{stats["bricks_per_second"]:>10.2f}{pickups}')
+    print(f'Played {len(results)} games in {elapsed:.1f} s: {len(results) / elapsed:.1f} games/s')
+
+    if args.save:
+        with open(args.save, 'w') as results_file:
+            json.dump({'summary': summary, 'games': results}, results_file)
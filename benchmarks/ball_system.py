@@ -0,0 +1,54 @@
+'''
+Brick Breaker - Ball System Benchmark
+
+Compares the frame time of the sprite-based Simulation with the NumPy-backed VectorSimulation.
+Run from the repository root with: python -m benchmarks.ball_system
+'''
+
+# Import the random library.
+import random
+
+# Import the time library.
+import time
+
+# Import the simulation backends.
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, Simulation, create_simulation
+from ball_system import VectorSimulation
+
+# Set the ball counts and the number of frames to time at each count.
+BALL_COUNTS = (10, 100, 1000)
+FRAMES = 60
+
+def scatter_balls(simulation, count, seed):
+    '''Add balls to a simulation and spread them over the lower half of the screen with random upward directions'''
+    placement = random.Random(seed)
+    for i in range(count):
+        simulation.add_ball()
+    balls = simulation.ball_group
+    for i, ball in enumerate(balls.sprites()):
+        x = placement.randrange(0, WINDOW_WIDTH - 25)
+        y = placement.randrange(WINDOW_HEIGHT // 2 + 100, WINDOW_HEIGHT - 100)
+        dx = placement.uniform(-1.2, 1.2)
+        dy = - (2 - dx ** 2) ** 0.5
+        if isinstance(simulation, VectorSimulation):
+            balls.x[i], balls.y[i], balls.dx[i], balls.dy[i] = x, y, dx, dy
+        else:
+            ball.rect.topleft = (x, y)
+            ball.dx, ball.dy = dx, dy
+
+def time_frames(simulation_class, count, seed=0):
+    '''Return the mean frame time in milliseconds for a simulation with a number of balls in play'''
+    simulation = create_simulation(simulation_class, seed)
+    scatter_balls(simulation, count, seed)
+
+    start_time = time.perf_counter()
+    for frame in range(FRAMES):
+        simulation.step()
+    return (time.perf_counter() - start_time) / FRAMES * 1000
+
+if __name__ == '__main__':
+    print(f'{"balls":>6} {"sprite ms/frame":>16} {"numpy ms/frame":>15} {"speedup":>8}')
+    for count in BALL_COUNTS:
+        sprite_time = time_frames(Simulation, count)
+        vector_time = time_frames(VectorSimulation, count)
+        print(f'{count:>6} {sprite_time:>16.3f} {vector_time:>15.3f} {sprite_time / vector_time:>7.1f}x')
@@ -0,0 +1,59 @@
+'''
+Brick Breaker - Startup Benchmark
+
+Measures how long importing the game takes, and how long the game takes to get its first screen on the display, each in a fresh process.
+Run from the repository root with: python -m benchmarks.startup
+'''
+
+# Import the os, subprocess, and sys libraries to run the game in fresh processes.
+import os
+import subprocess
+import sys
+
+# Import the statistics library to summarize the runs.
+import statistics
+
+# Set the number of fresh processes to time each measurement over.
+RUNS = 5
+
+# Set the script that times importing a module, after importing pygame, which every part of the game needs.
+IMPORT_SCRIPT = '''
+import time
+import pygame
+start_time = time.perf_counter()
+import {module}
+print(time.perf_counter() - start_time)
+'''
+
+# Set the environment the game runs in: without a window or an audio device, so that the benchmark runs anywhere.
+ENVIRONMENT = dict(os.environ, SDL_VIDEODRIVER='dummy', SDL_AUDIODRIVER='dummy', PYGAME_HIDE_SUPPORT_PROMPT='1')
+
+def time_import(module):
+    '''Return the time in milliseconds that importing a module takes in a fresh process'''
+    output = subprocess.run([sys.executable, '-c', IMPORT_SCRIPT.format(module=module)], env=ENVIRONMENT, capture_output=True, text=True, check=True).stdout
+    return float(output.split()[-1]) * 1000
+
+def time_startup():
+    '''Return the time in milliseconds of each step of the game's startup in a fresh process, as printed by the game'''
+    output = subprocess.run([sys.executable, '-m', 'brick_breaker', '--startup-time'], env=ENVIRONMENT, capture_output=True, text=True, check=True).stdout
+    steps = {}
+    for line in output.splitlines():
+        words = line.split()
+        if len(words) > 2 and words[-1] == 'ms':
+            steps[' '.join(words[:-2])] = float(words[-2])
+    return steps
+
+if __name__ == '__main__':
+    # Import the argparse library to read the command line options.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Measure the startup time of Brick Breaker.')
+    parser.add_argument('--runs', type=int, default=RUNS, help='number of fresh processes to time each measurement over')
+    args = parser.parse_args()
+
+    imports = [time_import('brick_breaker') for run in range(args.runs)]
+    print(f'{"import brick_breaker":<24}{statistics.median(imports):>9.1f} ms')
+
+    runs = [time_startup() for run in range(args.runs)]
+    for name in runs[0]:
+        print(f'{name:<24}{statistics.median(run[name] for run in runs):>9.1f} ms')
@@ -0,0 +1,238 @@
+'''
+Brick Breaker - Benchmark Suite
+
+Runs scripted game scenarios and reports ticks per second, collision and render time, and peak memory for each. Peak memory is the
+Python memory traced from creating the scenario to its end, in a new process; pixel data held by SDL is not included.
+Results can be saved as JSON and compared against a saved baseline, flagging any metric that regressed beyond a threshold.
+Run from the repository root with: python -m benchmarks.suite --save results.json --baseline baseline.json
+'''
+
+# Import the json library to store results.
+import json
+
+# Import the sys library to report regressions through the exit status.
+import sys
+
+# Import the time library.
+import time
+
+# Import the tracemalloc library to measure peak memory, and the multiprocessing library and ProcessPoolExecutor class to measure it
+# in a new process.
+import tracemalloc
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Import the array class to build custom levels.
+from array import array
+
+# Import the pygame libary.
+import pygame
+
+# Import the headless simulation core.
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, BLACK, PALETTE, TICKS_PER_SECOND, MAX_LEVEL_COLUMNS, MAX_LEVEL_ROWS, CompiledLevel, create_simulation, tracking_policy, aiming_policy
+
+# Import the frame profiler to time the collision checks.
+from profiler import FrameProfiler
+
+# Import the lookup of simulation types by name.
+from replay import simulation_class
+
+# Set the seed every scenario is run with, so that runs can be compared.
+SEED = 0
+
+# Set the fraction by which a metric may get worse before it is flagged as a regression.
+THRESHOLD = 0.10
+
+# Set whether each metric is better when higher or lower.
+HIGHER_IS_BETTER = {'ticks_per_second': True, 'collision_ms': False, 'render_ms': False, 'peak_memory_kb': False}
+
+# Define classes.
+class Scenario:
+    '''A scripted game session to benchmark. Subclasses set up the game and decide how each tick is played and when the session ends.'''
+    name = None
+    ticks = TICKS_PER_SECOND * 10
+
+    def setup(self, simulation_type, seed):
+        '''Create the simulation to run'''
+        return create_simulation(simulation_type, seed)
+
+    def step(self, simulation):
+        '''Play one tick'''
+        simulation.step(*tracking_policy(simulation))
+
+    def finished(self, simulation, tick):
+        '''Return whether the session is over'''
+        return tick >= self.ticks
+
+class LevelClear(Scenario):
+    '''Play level 1 until every brick has been broken'''
+    name = 'level_1_clear'
+    ticks = TICKS_PER_SECOND * 60 * 10
+
+    def step(self, simulation):
+        '''Play one tick, aiming the ball around the level'''
+        simulation.step(*aiming_policy(simulation))
+
+    def finished(self, simulation, tick):
+        '''Return whether level 1 has been cleared, giving up after ten minutes of game time'''
+        return simulation.level_number != 1 or tick >= self.ticks
+
+class BallStorm(Scenario):
+    '''Launch 500 balls at once and play on'''
+    name = 'ball_storm'
+    ball_count = 500
+    ticks = TICKS_PER_SECOND * 5
+
+    def setup(self, simulation_type, seed):
+        '''Create the simulation and add the extra balls'''
+        simulation = super().setup(simulation_type, seed)
+        for i in range(self.ball_count - len(simulation.ball_group)):
+            simulation.add_ball()
+        return simulation
+
+class LevelTransitions(Scenario):
+    '''Clear the bricks every tick, so that every tick starts a new level'''
+    name = 'level_transitions'
+    ticks = 300
+
+    def step(self, simulation):
+        '''Clear the bricks and play one tick'''
+        simulation.clear_bricks()
+        simulation.step()
+
+class DenseLevel(Scenario):
+    '''Play a custom level of 100 x 100 small bricks'''
+    name = 'dense_level'
+    rows = 100
+    columns = 100
+    ticks = TICKS_PER_SECOND * 10
+
+    def setup(self, simulation_type, seed):
+        '''Create the simulation and replace level 1 with the dense grid'''
+        simulation = super().setup(simulation_type, seed)
+        codes = range(1, len(PALETTE))
+        cells = array('B', (codes[(i + j) % len(codes)] for i in range(self.rows) for j in range(self.columns)))
+        simulation.level = CompiledLevel(self.name, self.name, cells, self.columns)
+        simulation.lay_out_bricks()
+        return simulation
+
+class HugeLevel(DenseLevel):
+    '''Play a custom level of the largest size, 400 x 166 tiny bricks'''
+    name = 'huge_level'
+    rows = MAX_LEVEL_ROWS
+    columns = MAX_LEVEL_COLUMNS
+    ticks = TICKS_PER_SECOND * 2
+
+# Set the scenarios run by default, in order.
+SCENARIOS = (LevelClear(), BallStorm(), LevelTransitions(), DenseLevel(), HugeLevel())
+
+def render(surface, simulation):
+    '''Draw every sprite group to an off-screen surface, as the game's full redraw does'''
+    surface.fill(BLACK)
+    for group in (simulation.paddle_group, simulation.ball_group, simulation.brick_group, simulation.powerup_group, simulation.missile_group, simulation.monkey_group):
+        group.draw(surface)
+
+def run_scenario(scenario, simulation_type, seed=SEED, measure_memory=True):
+    '''Run a scenario and return its metrics'''
+    # Time each tick and the collision checks within it, then time drawing the result.
+    simulation = scenario.setup(simulation_type, seed)
+    profiler = FrameProfiler(window=None)
+    profiler.instrument(simulation)
+    surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+    step_time = 0.0
+    render_time = 0.0
+    tick = 0
+    while not scenario.finished(simulation, tick):
+        profiler.begin_frame()
+        start_time = time.perf_counter()
+        scenario.step(simulation)
+        step_time += time.perf_counter() - start_time
+        profiler.end_frame()
+
+        start_time = time.perf_counter()
+        render(surface, simulation)
+        render_time += time.perf_counter() - start_time
+        tick += 1
+
+    results = {
+        'ticks': tick,
+        'ticks_per_second': tick / step_time if step_time else 0.0,
+        'collision_ms': sum(profiler.recent.get('check_collisions', ())) / tick * 1000 if tick else 0.0,
+        'render_ms': render_time / tick * 1000 if tick else 0.0,
+    }
+
+    # Run the scenario again without the timers to measure its peak memory, since tracing allocations slows every tick. It is run in a
+    # new process, so that the levels, sprites, and images that the timed run left in the process-wide caches are counted again.
+    if measure_memory:
+        with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+            results['peak_memory_kb'] = executor.submit(measure_peak_memory, scenario, simulation_type, seed).result()
+
+    return results
+
+def measure_peak_memory(scenario, simulation_type, seed=SEED):
+    '''Return the peak memory in KiB traced while a scenario is created and run, including its level and sprites'''
+    tracemalloc.start()
+    simulation = scenario.setup(simulation_type, seed)
+    tick = 0
+    while not scenario.finished(simulation, tick):
+        scenario.step(simulation)
+        tick += 1
+    peak_memory = tracemalloc.get_traced_memory()[1] / 1024
+    tracemalloc.stop()
+    return peak_memory
+
+def run_suite(scenarios=SCENARIOS, simulation_name='Simulation', seed=SEED, measure_memory=True):
+    '''Run each scenario and return the results of the whole suite'''
+    simulation_type = simulation_class(simulation_name)
+    return {
+        'simulation': simulation_name,
+        'seed': seed,
+        'scenarios': {scenario.name: run_scenario(scenario, simulation_type, seed, measure_memory) for scenario in scenarios},
+    }
+
+def compare(results, baseline, threshold=THRESHOLD):
+    '''Return a description of every metric that is worse than the baseline by more than the threshold'''
+    regressions = []
+    for name, metrics in results['scenarios'].items():
+        baseline_metrics = baseline['scenarios'].get(name, {})
+        for metric, higher_is_better in HIGHER_IS_BETTER.items():
+            if metric not in metrics or not baseline_metrics.get(metric):
+                continue
+            change = (metrics[metric] - baseline_metrics[metric]) / baseline_metrics[metric]
+            if (-change if higher_is_better else change) > threshold:
+                regressions.append(f'{name}: {metric} {baseline_metrics[metric]:.3f} -> {metrics[metric]:.3f} ({change:+.1%})')
+    return regressions
+
+if __name__ == '__main__':
+    # Import the argparse library to read the command line options.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run the Brick Breaker benchmark scenarios.')
+    parser.add_argument('--simulation', default='Simulation', help='simulation type to benchmark: Simulation, VectorSimulation, or SweptSimulation')
+    parser.add_argument('--scenario', action='append', choices=[scenario.name for scenario in SCENARIOS], help='run only this scenario (may be repeated)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the peak memory pass')
+    parser.add_argument('--save', default=None, help='write the results to this JSON file')
+    parser.add_argument('--baseline', default=None, help='compare the results against this JSON file')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD, help='fraction by which a metric may get worse before it is flagged')
+    args = parser.parse_args()
+
+    scenarios = [scenario for scenario in SCENARIOS if not args.scenario or scenario.name in args.scenario]
+    results = run_suite(scenarios, args.simulation, measure_memory=not args.no_memory)
+
+    print(f'{"scenario":<20}{"ticks":>8}{"ticks/s":>11}{"collision ms":>14}{"render ms":>11}{"peak KiB":>10}')
+    for name, metrics in results['scenarios'].items():
+        peak_memory = f'{metrics["peak_memory_kb"]:>10.0f}' if 'peak_memory_kb' in metrics else f'{"-":>10}'
+        print(f'{name:<20}{metrics["ticks"]:>8}{metrics["ticks_per_second"]:>11.0f}{metrics["collision_ms"]:>14.4f}{metrics["render_ms"]:>11.4f}{peak_memory}')
+
+    if args.save:
+        with open(args.save, 'w') as results_file:
+            json.dump(results, results_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(results, json.load(baseline_file), args.threshold)
+        for regression in regressions:
+            print(f'Regression: {regression}')
+        if regressions:
+            sys.exit(1)
+        print(f'No regressions beyond {args.threshold:.0%} of the baseline.')
@@ -5,571 +5,462 @@ Brick Breaker
 # Import the pygame libary.
 import pygame
 
-# Import the random library.
-import random
+# Import the headless simulation core.
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, BLACK, TICKS_PER_SECOND, BRICK_TYPES, Simulation, Player, Paddle, LevelCache
 
-# Initialize the pygame module.
-pygame.init()
+# Import the chunked brick field.
+from brick_field import BrickField
 
-# Set the game display.
-WINDOW_WIDTH = 1200
-WINDOW_HEIGHT = 1000
-display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
-pygame.display.set_caption('Brick Breaker')
+# Import the dirty rectangle renderer.
+from renderer import DirtyRenderer
 
-# Set the FPS and clock.
+# Import the cached HUD.
+from hud import HUD
+
+# Import the input recorder.
+from replay import Recorder
+
+# Import the frame profiler, its overlay, and the startup timer.
+from profiler import FrameProfiler, ProfilerOverlay, StartupTimer
+
+# Import the game state machine.
+from game_state import PAUSED, LEVEL_INTRO, GAME_OVER, VICTORY, GameStateMachine
+
+# Import the fixed timestep and the render interpolator.
+from timestep import FixedTimestep, Interpolator
+
+# Import the sound mixer.
+from audio import SoundMixer
+
+# Import the game state snapshots.
+from snapshot import save_snapshot, load_snapshot
+
+# Import the os and time libraries to name and store replay logs.
+import os
+import time
+
+# Set whether to play sounds. With audio off the pygame mixer is never initialized and no sounds are loaded, e.g. for headless runs.
+AUDIO = True
+
+# Set the font the game's text is drawn in.
+FONT_PATH = 'assets/Mechanical-g5Y5.otf'
+FONT_SIZE = 32
+
+# Set the frame rate the display is drawn at, or None to draw as fast as possible. The game itself always runs at TICKS_PER_SECOND ticks
+# per second, however fast frames are drawn.
 FPS = 120
-clock = pygame.time.Clock()
 
-# Set the colors for the game.
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-BLUE = (0, 102, 255)
-GREEN = (71, 209, 71)
-RED = (230, 0, 0)
-PINK = (255, 102, 153)
+# Set whether to draw moving sprites between their last two tick positions, which smooths motion when frames and ticks do not line up.
+INTERPOLATION = True
+
+# Set whether to redraw only the changed regions of the display each frame, or the whole display.
+DIRTY_RENDERING = True
+
+# Set the directory where a replay log of each session is saved, or None to disable recording.
+REPLAY_DIRECTORY = 'replays'
+
+# Set the file the game is saved to with F5 and resumed from with F9.
+SAVE_PATH = os.path.join('saves', 'quicksave.bbs')
+
+# Set the file a per-frame timing trace of each session is written to (CSV, or JSON if it ends in .json), or None to disable the trace.
+# The profiler overlay can be toggled with F3 either way.
+PROFILE_TRACE_PATH = None
+
+# Define the game's display and font, opened and loaded the first time they are needed, so that importing the game has no side effects.
+def get_display():
+    '''Return the game display, opening the window the first time it is asked for'''
+    if pygame.display.get_surface() is None:
+        pygame.display.init()
+        pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+        pygame.display.set_caption('Brick Breaker')
+    return pygame.display.get_surface()
+
+FONTS = {}
+
+def get_font(path=FONT_PATH, size=FONT_SIZE):
+    '''Return a font, loading it the first time it is asked for. A path of None gives pygame's default font.'''
+    if (path, size) not in FONTS:
+        pygame.font.init()
+        FONTS[(path, size)] = pygame.font.Font(path, size)
+    return FONTS[(path, size)]
 
 # Define classes.
-class Game:
+class Game(Simulation):
     ''' A class to control and update the gameplay'''
-    def __init__(self, player, paddle, paddle_group, ball_group, brick_group, powerup_group):
+    def __init__(self, player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed=None):
         '''Initialize the game'''
-        self.player = player
-        self.paddle = paddle
-        self.paddle_group = paddle_group
-        self.ball_group = ball_group
-        self.brick_group = brick_group
-        self.powerup_group = powerup_group
+        # Inherit the simulation's state and rules.
+        super().__init__(player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed)
 
-        self.level_number = 1
+        # Define the HUD, created with its font the first time it is drawn.
+        self.hud = None
 
-        self.HUD_height = 40
-        self.font = pygame.font.Font('assets/Mechanical-g5Y5.otf', 32)
+        # Set the sound mixer, which plays the sounds queued by each frame's ticks once the frame's ticks have run. Its sounds are loaded
+        # by main() on a background thread.
+        self.sounds = SoundMixer(enabled=AUDIO)
 
-        self.running = True
+        # Define the dirty rectangle renderer, if one is used.
+        self.renderer = None
 
-        self.level_timer = 0
+        # Define the game state machine, and the pause screen last shown on the display.
+        self.states = GameStateMachine()
+        self.shown_screen = None
 
-        # Set the sounds for the game.
-        self.brick_hit = pygame.mixer.Sound('assets/brick_hit.wav')
-        self.brick_hit.set_volume(0.5)
-        self.paddle_hit = pygame.mixer.Sound('assets/paddle_hit.wav')
-        self.paddle_hit.set_volume(0.2)
+    @property
+    def display_surface(self):
+        '''Return the game display, opening it if it is not open yet'''
+        return get_display()
 
-        self.level_complete = pygame.mixer.Sound('assets/level_complete.wav')
-        self.life_loss = pygame.mixer.Sound('assets/life_loss.wav')
-
-    def update(self):
-        '''Update the game'''
-        self.check_collisions()
-        self.check_fallen_ball()
-        self.check_level_completion()
-        self.check_fallen_powerup()
+    @property
+    def HUD(self):
+        '''Return the HUD, loading the game's font the first time it is needed'''
+        if self.hud is None:
+            self.hud = HUD(get_font(), WINDOW_WIDTH, self.HUD_height)
+        return self.hud
 
     def draw(self):
         '''Draw the HUD and other information to the display'''
+        display_surface = self.display_surface
 
         # Draw a line separating the HUD from the gameplay window.
         pygame.draw.line(display_surface, WHITE, (0, self.HUD_height), (WINDOW_WIDTH, self.HUD_height), 3)
 
-        # Set text.
-        score_text = self.font.render(f'Score: {self.player.score}', True, WHITE)
-        score_rect = score_text.get_rect()
-        score_rect.left = 15
-        score_rect.centery = self.HUD_height / 2
-
-        time_text = self.font.render(f'{self.level_timer}', True, WHITE)
-        time_rect = time_text.get_rect()
-        time_rect.centerx = WINDOW_WIDTH / 2
-        time_rect.centery = self.HUD_height / 2
-
-        lives_text = self.font.render(f'Lives: {self.player.lives}', True, WHITE)
-        lives_rect = lives_text.get_rect()
-        lives_rect.right = WINDOW_WIDTH - 15
-        lives_rect.centery = self.HUD_height / 2
-
-        # Blit the text to the display.
-        display_surface.blit(lives_text, lives_rect)
-        display_surface.blit(score_text, score_rect)
-        display_surface.blit(time_text, time_rect)
-
-    def check_collisions(self):
-        # Check collisions between the ball and the top, left, and right walls.
-        for ball in self.ball_group:
-            if (ball.rect.left <= 0) and (ball.dx < 0):
-                ball.dx = (-1) * ball.dx
-            if (ball.rect.right >= WINDOW_WIDTH) and (ball.dx > 0):
-                ball.dx = (-1) * ball.dx
-            if (ball.rect.top <= self.HUD_height) and (ball.dy < 0):
-                ball.dy = (-1) * ball.dy
-
-        # Check for collisions between the ball and the paddle.
-        if pygame.sprite.spritecollide(self.paddle, self.ball_group, False):
-            self.paddle_hit.play()
-            for ball in pygame.sprite.groupcollide(self.ball_group, self.paddle_group, False, False):
-                alpha = ball.rect.centerx - self.paddle.rect.centerx
-                beta = self.paddle.width / 2
-                ball.dx = alpha / beta
-                ball.dy = - (2 - (ball.dx) ** 2) ** 0.5
-
-        # Check for collision between the ball and bricks.
-        for ball in self.ball_group:
-            for brick in pygame.sprite.spritecollide(ball, self.brick_group, False):
-                # Set the ball_brick_collision variable to False.
-                ball_brick_collision = False
-
-                # Set the hit zones within the brick that has been struck.
-                hit_zone_buffer = ball.diameter / 2
-                hit_zone_l = pygame.Rect(brick.rect.topleft, (hit_zone_buffer, brick.height))
-                hit_zone_r = pygame.Rect((brick.rect.right - hit_zone_buffer, brick.rect.top), (hit_zone_buffer, brick.height))
-                hit_zone_b = pygame.Rect((brick.rect.left, brick.rect.bottom - hit_zone_buffer), (brick.width, hit_zone_buffer))
-                hit_zone_t = pygame.Rect(brick.rect.topleft,(brick.width, hit_zone_buffer))
-
-                # Check which hit zone the ball has collided with.
-                if hit_zone_l.collidepoint(ball.rect.right, ball.rect.centery):
-                    ball_brick_collision = True
-                    ball.dx = (-1) * ball.dx
-                elif hit_zone_r.collidepoint(ball.rect.left, ball.rect.centery):
-                    ball_brick_collision = True
-                    ball.dx = (-1) * ball.dx
-                elif hit_zone_b.collidepoint(ball.rect.centerx, ball.rect.top):
-                    ball_brick_collision = True
-                    ball.dy = (-1) * ball.dy
-                elif hit_zone_t.collidepoint(ball.rect.centerx, ball.rect.bottom):
-                    ball_brick_collision = True
-                    ball.dy = (-1) * ball.dy
-
-                if ball_brick_collision:
-                    # Play the hit sound and kill the brick.
-                    self.brick_hit.play()
-                    brick.kill()
-
-                    # Determine whether to generate a powerup.
-                    if random.choice(list(range(5))) == random.choice(list(range(5))):
-                        new_powerup = PowerUp(brick.rect.centerx, brick.rect.centery, random.choice(['AddBall']))
-                        self.powerup_group.add(new_powerup)
-
-                # Add to the player's score based on the level number and the level timer.
-                if self.level_timer <= 60:
-                    self.player.score += self.level_number * 10 + (60 - self.level_timer)
-                else:
-                    self.player.score += self.level_number * 10
-        
-        # Check for collisions between the paddle and a powerup.
-        for powerup in self.powerup_group:
-            if pygame.sprite.spritecollide(powerup, self.paddle_group, False):
-                powerup.kill()
-                if powerup.ptype == 'AddBall':
-                    self.add_ball()
-
-    def check_fallen_ball(self):
-        '''Check if any of the player's balls has fallen off of the screen'''
-        # If a ball has fallen off the screen, check whether it is the last ball the player has.
-        # If the player has more balls, remove the ball from the ball group.
-        # If the player has run out of lives, run the game over conditions and prompt the player to play again.
-        for ball in self.ball_group:
-            if ball.rect.top >= WINDOW_HEIGHT:
-                # If the player has more balls available, simply kill the ball that has fallen off the screen.
-                if len(self.ball_group) > 1:
-                    ball.kill()
-                else:
-                    # Remove a life.
-                    self.player.lives -= 1
-
-                    # Play the life lost sound.
-                    self.life_loss.play()
-
-                    # Reset the position of the ball and paddle.
-                    ball.reset()
-                    self.paddle.reset()
-
-                    # Remove all current powerups on the screen
-                    self.powerup_group.empty()
-
-                    # Update the display.
-                    display_surface.fill(BLACK)
-                    self.draw()
-                    self.powerup_group.draw(display_surface)
-                    self.paddle_group.draw(display_surface)
-                    self.brick_group.draw(display_surface)
-                    pygame.display.update()
-
-                    # Check if the player has run out of lives.
-                    if self.player.lives == 0:
-                        self.pause_game('Game Over!', 'Press ENTER to Play Again')
-                        self.reset_game()
-                    else:
-                        self.pause_game('Life Lost!', 'Press ENTER to Continue', False)
-
-    def check_fallen_powerup(self):
-        '''Check whether any existing powerups have fallen off the screen; if so, delete it'''
-        for powerup in self.powerup_group:
-            if powerup.rect.top >= WINDOW_HEIGHT:
-                powerup.kill()
-
-    def check_level_completion(self):
-        '''Check whether the current level has been completed'''
-        # Check whether there are no more bricks remaining.
-        if len(self.brick_group) == 0:
-            # Increment the level number.
-            self.level_number += 1
-
-            # Reset the paddle position.
-            self.paddle.reset()
-
-            # Remove all of the balls from the ball group.
-            self.ball_group.empty()
-            
-            # Update the display.
-            display_surface.fill(BLACK)
-            self.ball_group.draw(display_surface)
-            self.paddle_group.draw(display_surface)
-            pygame.display.update()
+        # Blit the score, timer, and lives text, rendered only when their values change.
+        self.HUD.draw(display_surface, self.player.score, self.level_timer, self.player.lives)
 
-            # Play the level complete jingle.
-            self.level_complete.play()
-            
-            # Pause the game.
-            self.pause_game('Level Complete', 'Press ENTER to Continue', True)
+    def on_paddle_hit(self):
+        '''Play the paddle hit sound'''
+        self.sounds.play('paddle_hit')
 
-            # Start the next level.
-            self.start_new_level()
-        else:
-            pass
+    def on_brick_hit(self, brick):
+        '''Play the brick hit sound and erase the brick from the renderer's background'''
+        self.sounds.play('brick_hit')
+        if self.renderer:
+            self.renderer.patch(brick.rect)
 
-    def add_ball(self):
-        new_ball = Ball(self.paddle_group.sprites()[0].rect.centerx, self.paddle_group.sprites()[0].rect.top, self.level_number + 3)
-        self.ball_group.add(new_ball)
-
-    def start_new_level(self):
-        '''Start a new level of the game'''
-        self.level_timer = 0
-        brick_horizontal_buffer = 5
-        brick_vertical_buffer = 5
-        brick_columns = 11
-        brick_rows = 12
-        brick_width = ((WINDOW_WIDTH) - (brick_columns + 1) * brick_horizontal_buffer) / brick_columns
-        brick_height = ((WINDOW_HEIGHT) * (1/2) - (brick_rows + 1) * brick_vertical_buffer) / brick_rows
-
-        if self.level_number == 1:
-            self.level = Level(f'levels/level_{self.level_number}.txt', 'Heart')
-            my_ball = Ball(self.paddle_group.sprites()[0].rect.centerx, self.paddle_group.sprites()[0].rect.top, self.level_number + 3)
-            self.ball_group.add(my_ball)
-        elif self.level_number == 2:
-            self.level = Level(f'levels/level_{self.level_number}.txt', 'Box')
-            my_ball = Ball(self.paddle_group.sprites()[0].rect.centerx, self.paddle_group.sprites()[0].rect.top, self.level_number + 3)
-            self.ball_group.add(my_ball)
-        elif self.level_number == 3:
-            self.level = Level(f'levels/level_{self.level_number}.txt', 'Hourglass')
-            my_ball = Ball(self.paddle_group.sprites()[0].rect.centerx, self.paddle_group.sprites()[0].rect.top, self.level_number + 3)
-            self.ball_group.add(my_ball)
-        else:
-            self.pause_game('You Win!', 'Press ENTER to play again!', True)
-            self.player.reset()
-            self.level_number = 1
-            my_ball = Ball(self.paddle_group.sprites()[0].rect.centerx, self.paddle_group.sprites()[0].rect.top, self.level_number + 3)
-            self.ball_group.add(my_ball)
-            self.level = Level(f'levels/level_{self.level_number}.txt', 'Heart')
-
-        for i in range(1, brick_rows + 1):
-            for j in range(1, brick_columns + 1):
-                if self.level.mapping_dictionary[(i, j)]:
-                        brick = Brick(brick_horizontal_buffer * (j) + brick_width * (j - 1), brick_vertical_buffer * (i) + brick_height * (i - 1) + self.HUD_height, brick_width, brick_height, self.level.mapping_dictionary[(i, j)])
-                        self.brick_group.add(brick)
-        
-        # Draw all sprites and update the display.
+    def on_brick_damaged(self, brick):
+        '''Play the brick hit sound and redraw the weakened brick in the renderer's background'''
+        self.sounds.play('brick_hit')
+        if self.renderer:
+            self.renderer.repaint(brick)
+
+    def on_life_lost(self):
+        '''Play the life lost sound, redraw the display, and pause the game if the player has lives remaining'''
+        # Play the life lost sound.
+        self.sounds.play('life_loss')
+
+        # Draw the gameplay behind the pause screen.
+        display_surface = self.display_surface
+        display_surface.fill(BLACK)
+        self.draw()
+        self.powerup_group.draw(display_surface)
+        self.paddle_group.draw(display_surface)
+        self.brick_group.draw(display_surface)
+
+        if self.player.lives > 0:
+            self.pause_game('Life Lost!', 'Press ENTER to Continue', False, PAUSED)
+
+    def on_game_over(self):
+        '''Pause the game on the game over screen'''
+        self.pause_game('Game Over!', 'Press ENTER to Play Again', False, GAME_OVER)
+
+    def on_level_complete(self):
+        '''Redraw the display, play the level complete jingle, and pause the game'''
+        # Draw the gameplay behind the pause screen.
+        display_surface = self.display_surface
+        display_surface.fill(BLACK)
+        self.ball_group.draw(display_surface)
+        self.paddle_group.draw(display_surface)
+
+        # Play the level complete jingle.
+        self.sounds.play('level_complete')
+
+        # Pause the game.
+        self.pause_game('Level Complete', 'Press ENTER to Continue', True, PAUSED)
+
+    def on_level_start(self):
+        '''Draw the new level and pause the game prior to gameplay'''
+        # Draw all sprites behind the pause screen.
+        display_surface = self.display_surface
         display_surface.fill(BLACK)
         self.draw()
         self.paddle_group.draw(display_surface)
         self.ball_group.draw(display_surface)
         self.brick_group.draw(display_surface)
-        pygame.display.update()
+
+        # Draw the new bricks into the renderer's background.
+        if self.renderer:
+            self.renderer.rebuild()
 
         # Pause the game prior to gameplay.
-        self.pause_game(f'Level: {self.level_number} - {self.level.name}', 'Press ENTER to continue')
+        self.pause_game(f'Level: {self.level_number} - {self.level.name}', 'Press ENTER to continue', False, LEVEL_INTRO)
 
-    def pause_game(self, main_text, sub_text, hide_gameplay = False):
-        '''Pause the game'''
+    def on_victory(self):
+        '''Pause the game on the victory screen'''
+        self.pause_game('You Win!', 'Press ENTER to play again!', True, VICTORY)
+
+    def pause_game(self, main_text, sub_text, hide_gameplay = False, state = PAUSED):
+        '''Pause the game by queuing a pause screen, which the game loop shows once the current tick has finished'''
 
         # Set a text offset to space out the pause text.
         text_offset = 45
 
         # Set text.
-        main_text = self.font.render(main_text, True, WHITE)
+        main_text = self.HUD.render_text(main_text)
         main_rect = main_text.get_rect()
         main_rect.center = (WINDOW_WIDTH // 2, WINDOW_HEIGHT * (57/100) )
 
-        sub_text = self.font.render(sub_text, True, WHITE)
+        sub_text = self.HUD.render_text(sub_text)
         sub_rect = sub_text.get_rect()
         sub_rect.center = (WINDOW_WIDTH // 2, main_rect.centery + text_offset)
 
-        # If the hide_gameplay option has been selected, hide the current gameplay.
+        # Capture the gameplay as it is now, or hide it if the hide_gameplay option has been selected.
+        frame = self.display_surface.copy()
         if hide_gameplay:
-            display_surface.fill(BLACK)
-
-        # Blit the pause screen text to the display.
-        display_surface.blit(main_text, main_rect)
-        display_surface.blit(sub_text, sub_rect)
-        pygame.display.update()
-
-        # Pause the game. Allow the player to either quit the program or press enter to continue.
-        is_paused = True
-        while is_paused:
-            for event in pygame.event.get():
-                # Allow the user to quit the game.
-                if event.type == pygame.QUIT:
-                    is_paused = False
-                    self.running = False
-                # Allow the use to continue.
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_RETURN:
-                        is_paused = False
-
-    def reset_game(self):
-        '''Reset the game and player attributes'''
-        self.player.reset()
-        self.brick_group.empty()
-        self.ball_group.empty()
-        self.powerup_group.empty()
-        self.level_number = 1
-        self.start_new_level()
-    
-class Player:
-    '''A class to model the player'''
-    def __init__(self):
-        '''Initialize the player and define player attributes'''
-        self.lives = 3
-        self.score = 0
-    
-    def reset(self):
-        '''Reset the player attributes'''
-        self.lives = 3
-        self.score = 0
-    
-class Paddle(pygame.sprite.Sprite):
-    '''A class to model a paddle controlled by the player.'''
-    def __init__(self):
-        '''Initialize the paddle'''
-        # Inherit the parent class's methods and attributes.
-        super().__init__()
-
-        # Define the paddle height, width, and buffer distance to the bottom of the display. 
-        self.height = 15
-        self.width = 150
-        self.lower_buffer = 25
-
-        # Define the paddle image as a surface and fill it with the color white.
-        self.image = pygame.Surface([self.width, self.height])
-        self.image.fill(WHITE)
-
-        # Generate and locate the paddle rect.
-        self.rect = self.image.get_rect() 
-        self.rect.centerx = WINDOW_WIDTH / 2
-        self.rect.bottom = WINDOW_HEIGHT - self.lower_buffer
-
-        # Define the paddle velocity.
-        self.velocity = 8
-
-    def update(self):
-        '''Allow the player to move the paddle across the screen'''
-        # Generate an object containing the keys pressed.
-        keys = pygame.key.get_pressed()
-
-        # Move the player if the left or right arrow key has been pressed and they are within the screen bounds.
-        if keys[pygame.K_a] and self.rect.left >= 0:
-            self.rect.x -= self.velocity
-        if keys[pygame.K_d] and self.rect.right <= WINDOW_WIDTH:
-            self.rect.x += self.velocity
-    
-    def reset(self):
-        self.rect.centerx = WINDOW_WIDTH / 2
-        self.rect.bottom = WINDOW_HEIGHT - self.lower_buffer
-
-class Ball(pygame.sprite.Sprite):
-    '''A class to model the ball'''
-    def __init__(self, x, y, velocity):
-        '''Initialize the ball'''
-        # Inherit the parent class's attributes and methods.
-        super().__init__()
-
-        # Define the kinematic attributes of the ball.
-        self.starting_dx = random.choice([-1, 1])
-        self.starting_dy = -1
-        self.velocity = velocity
-        self.dx = self.starting_dx
-        self.dy = self.starting_dy
-
-        # Define the ball diameter.
-        self.diameter = 25
-        
-        # Define the ball image.
-        self.image = pygame.Surface([self.diameter, self.diameter])
-        pygame.draw.circle(self.image, WHITE, (self.diameter / 2, self.diameter / 2), self.diameter / 2)
-
-        # Generate and locate the ball rect.
-        self.rect = self.image.get_rect()
-        self.rect.center = (x, y)
-        #self.rect.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT - 55)
-    
-    def update(self):
-        '''Move the ball'''
-        self.rect.x += self.dx * self.velocity
-        self.rect.y += self.dy * self.velocity
-    
-    def reset(self):
-        '''Reset the ball to the center of the screen'''
-        self.dx = random.choice([-1, 1])
-        self.dy = -1
-        self.rect.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT - 55)
-
-class Brick(pygame.sprite.Sprite):
-    '''A class to model a brick'''
-    def __init__(self, x, y, width, height, color):
-        '''Initialize the brick'''
-        # Inherit the parent class's attributes and methods.
-        super().__init__()
-        
-        # Define the brick color, width, and height.
-        self.color = color
-        self.width = width
-        self.height = height
-
-        # Generate and fill the brick image with the brick color.
-        self.image = pygame.Surface([self.width, self.height])
-        self.image.fill(self.color)
-
-        # Define and locate the brick rect.
-        self.rect = self.image.get_rect()
-        self.rect.topleft = (x, y)
-
-class PowerUp(pygame.sprite.Sprite):
-    '''A powerup that the player can obtain'''
-    def __init__(self, x, y, ptype):
-        # Inherit the parent classes attributes and methods.
-        super().__init__()
-
-        # Set the width and height of the powerup block.
-        self.height = 20
-        self.width = 20
-
-        # Define the powerup image as a pygame surface and fill it with the color white.
-        self.image = pygame.Surface([self.width, self.height])
-        self.image.fill(WHITE)
-
-        # Generate and locate the power up rect.
-        self.rect = self.image.get_rect()
-        self.rect.centerx = x
-        self.rect.centery = y
-
-        # Define the powerup velocity.
-        self.velocity = 2
-
-        # Define the type of the power up.
-        self.ptype = ptype
-    
-    def update(self):
-        '''Move the powerup down the screen for the player to collect it'''
-        self.rect.y += self.velocity
-
-class Level:
-    '''A class to map out a level'''
-    def __init__(self, brick_map, name):
-        '''Initialize the Level'''
-        self.brick_map = brick_map
-        self.color_dictionary = {'X':None, 'P':PINK, 'R':RED, 'G':GREEN, 'B':BLUE, 'W':WHITE}
-        self.name = name
-        
-        # Open the input brick_map .txt file and store the text in a list attribute.
-        with open(self.brick_map) as level_file:
-            data_list = level_file.readlines()
-            self.level_list = []
-            for line in data_list:
-                self.level_list.append(line.removesuffix('\n'))
-        
-        # Create a mapping dictionary which assigns a particular row, column tuple to a specific color.
-        self.mapping_dictionary = {}
-        for i, line in enumerate(self.level_list, 1):
-            for j, char in enumerate(line, 1):
-                self.mapping_dictionary[(i,j)] = self.color_dictionary[char]
-    
-    def check_format(self):
-        '''Check whether the level .txt file is formatted correctly'''    
-        for line in self.level_list:
-            if len(line) != len(self.level_list[0]):
-                return False
-            else:
-                return True
-
-'''
-Game Loop
-'''
-
-# Create the player.
-my_player = Player()
+            frame.fill(BLACK)
 
-# Create the paddle group and the Paddle object.
-my_paddle_group = pygame.sprite.Group()
-my_paddle = Paddle()
-my_paddle_group.add(my_paddle)
+        # Blit the pause screen text to the frame.
+        frame.blit(main_text, main_rect)
+        frame.blit(sub_text, sub_rect)
 
-# Create the ball group (we will add Ball objects via the game's start_new_level method)
-my_ball_group = pygame.sprite.Group()
+        self.states.enter(state, main_text, sub_text, frame)
 
-# Create the brick group (we will add Brick objects via the game's start_new_level method)
-my_brick_group = pygame.sprite.Group()
-
-# Create the powerup group (we will add PowerUp objects randomly when breaking bricks)
-my_power_up_group = pygame.sprite.Group()
-
-# Create a Game object.
-my_game = Game(my_player, my_paddle, my_paddle_group, my_ball_group, my_brick_group, my_power_up_group)
-my_game.start_new_level()
+    def show_screen(self):
+        '''Show the current pause screen, if it is not on the display already'''
+        screen = self.states.screen
+        if screen is not self.shown_screen:
+            self.display_surface.blit(screen.frame, (0, 0))
+            pygame.display.update()
+            self.shown_screen = screen
 
-# Initialize a frame counter.
-frame_counter = 0
+    def wait_for_input(self):
+        '''Show the current pause screen and block until the next event, so a paused game uses no CPU'''
+        self.show_screen()
 
-while my_game.running:
-    for event in pygame.event.get():
-        # Check to see if they player wants to quit the game.
+        # Allow the player to either quit the program or press enter to continue.
+        event = pygame.event.wait()
         if event.type == pygame.QUIT:
-            my_game.running = False
+            self.running = False
+        elif self.states.handle(event) and not self.states.paused:
+            # The pause screens have covered the display, so the renderer must redraw all of it.
+            self.shown_screen = None
+            if self.renderer:
+                self.renderer.invalidate()
+
+def save_replay(recorder):
+    '''Save the replay log of a recorder to the replay directory, if recording is enabled'''
+    if REPLAY_DIRECTORY:
+        os.makedirs(REPLAY_DIRECTORY, exist_ok=True)
+        path = os.path.join(REPLAY_DIRECTORY, time.strftime('session-%Y%m%d-%H%M%S.bbr'))
+
+        # Keep a log saved earlier in the same second, e.g. before a saved game was resumed.
+        if os.path.exists(path):
+            path = path.removesuffix('.bbr') + f'-{recorder.simulation.frame_counter}.bbr'
+        recorder.finish().save(path)
+
+'''
+Game Loop
+'''
 
-        # For testing purposes, use '0' to delete all bricks on the screen.
-        if event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_0:
-                my_brick_group.empty()
-    
-    # Increment the frame counter and level timer.
-    frame_counter += 1
-    if frame_counter % 120 == 0:
-        my_game.level_timer += 1
+def main(startup_only=False):
+    '''Open the game window and play until the player quits. With startup_only, return as soon as the first level's intro screen is
+    on the display, printing how long each step of the startup took.'''
+    # Time the startup, from here to the first screen on the display.
+    startup = StartupTimer()
+
+    # Open the game display and create the clock.
+    display_surface = get_display()
+    clock = pygame.time.Clock()
+    startup.mark('display')
+
+    # Create the player.
+    my_player = Player()
+
+    # Create the paddle group and the Paddle object.
+    my_paddle_group = pygame.sprite.RenderUpdates()
+    my_paddle = Paddle()
+    my_paddle_group.add(my_paddle)
+
+    # Create the ball group (we will add Ball objects via the game's start_new_level method)
+    my_ball_group = pygame.sprite.RenderUpdates()
+
+    # Create the brick group (the bricks of each level are loaded into it by the game's start_new_level method)
+    my_brick_group = BrickField(BRICK_TYPES)
+
+    # Create the powerup group (we will add PowerUp objects randomly when breaking bricks)
+    my_power_up_group = pygame.sprite.RenderUpdates()
+
+    # Create a Game object.
+    my_game = Game(my_player, my_paddle, my_paddle_group, my_ball_group, my_brick_group, my_power_up_group)
+
+    # Load the sounds on a background thread, so the first level's intro can be shown while they load.
+    sound_loader = my_game.sounds.load_in_background()
+    startup.mark('game')
+
+    # Compile every level up front, reusing the levels compiled by the last run if their files have not changed.
+    my_game.level_cache = LevelCache(os.path.join('levels', '.level_cache'))
+    my_game.level_cache.load_directory('levels')
+    startup.mark('levels')
+
+    # Create the dirty rectangle renderer.
+    if DIRTY_RENDERING:
+        my_game.renderer = DirtyRenderer(display_surface, my_game, [my_paddle_group, my_ball_group, my_power_up_group, my_game.missile_group, my_game.monkey_group])
+
+    my_game.start_new_level()
+    startup.mark('first level')
+
+    # Create the input recorder.
+    my_recorder = Recorder(my_game)
+
+    # Create the frame profiler and time each phase of the game's tick.
+    my_profiler = FrameProfiler(trace=PROFILE_TRACE_PATH is not None)
+    my_profiler.instrument(my_game)
+
+    # Create the profiler overlay, which also shows the time the HUD's text caches save and the sounds the mixer has played and merged.
+    my_overlay = ProfilerOverlay(my_profiler, get_font(None, 22), pygame.Rect(WINDOW_WIDTH - 430, my_game.HUD_height + 10, 420, 390), 1 / (FPS or TICKS_PER_SECOND),
+                                 [lambda: my_game.HUD.report(), my_game.sounds.report])
+
+    # Create the fixed timestep, and the interpolator for the moving sprite groups.
+    my_timestep = FixedTimestep(TICKS_PER_SECOND)
+    my_interpolator = Interpolator([my_paddle_group, my_ball_group, my_power_up_group, my_game.missile_group, my_game.monkey_group])
+
+    # Set whether the player has asked to clear the bricks on the next tick.
+    clear_bricks = False
+
+    # Show the first level's intro as soon as it is ready.
+    my_game.show_screen()
+    startup.mark('first screen')
+    if startup_only:
+        sound_loader.join()
+        print(startup.report())
+        print(f'{"sounds (background)":<20}{my_game.sounds.load_time * 1000:>9.1f} ms')
+        pygame.quit()
+        return startup
+
+    while my_game.running:
+        # While a pause screen is up, wait for the player without stepping or drawing the game. The time spent waiting is not game time.
+        if my_game.states.paused:
+            my_game.wait_for_input()
+            my_timestep.reset()
+            my_interpolator.clear()
+            continue
+
+        my_profiler.begin_frame()
+        phase_start = time.perf_counter()
+
+        for event in pygame.event.get():
+            # Check to see if they player wants to quit the game.
+            if event.type == pygame.QUIT:
+                my_game.running = False
+
+            # For testing purposes, use '0' to delete all bricks on the screen.
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_0:
+                    clear_bricks = True
+
+                # Use P or Escape to pause the game.
+                if event.key in (pygame.K_p, pygame.K_ESCAPE) and not my_game.states.paused:
+                    my_game.pause_game('Paused', 'Press ENTER to Continue')
+
+                # Use F3 to show or hide the profiler overlay.
+                if event.key == pygame.K_F3:
+                    my_overlay.toggle()
+                    if my_game.renderer:
+                        my_game.renderer.invalidate()
+
+                # Use F5 to save the game.
+                if event.key == pygame.K_F5:
+                    os.makedirs(os.path.dirname(SAVE_PATH), exist_ok=True)
+                    save_snapshot(my_game, SAVE_PATH)
+
+                # Use F9 to resume the saved game. The session recorded so far is saved, and a new recording starts from the saved game.
+                if event.key == pygame.K_F9 and os.path.exists(SAVE_PATH):
+                    save_replay(my_recorder)
+                    load_snapshot(my_game, SAVE_PATH)
+                    my_recorder = Recorder(my_game, resumed=True)
+                    my_interpolator.clear()
+                    clear_bricks = False
+                    if my_game.renderer:
+                        my_game.renderer.rebuild()
+
+        my_profiler.add('events', time.perf_counter() - phase_start)
+
+        # Leave the tick for after the pause if the player has paused the game.
+        if my_game.states.paused:
+            continue
+
+        # Step the game as many ticks as the time since the last frame pays for, using the keys held by the player and recording them
+        # for replay. A tick that queues a pause screen ends the frame's ticks.
+        keys = pygame.key.get_pressed()
+        ticks = my_timestep.advance()
+        for tick in range(ticks):
+            if INTERPOLATION and tick == ticks - 1:
+                my_interpolator.capture()
+            my_recorder.step(keys[pygame.K_a], keys[pygame.K_d], clear_bricks)
+            if clear_bricks:
+                clear_bricks = False
+                if my_game.renderer:
+                    my_game.renderer.rebuild()
+            if my_game.states.paused:
+                break
+
+        # Play the sounds of the frame's ticks, each sound once.
+        my_game.sounds.flush()
+
+        # Move the sprites part of the way into the next tick for drawing.
+        if INTERPOLATION:
+            my_interpolator.apply(my_timestep.alpha)
+
+        phase_start = time.perf_counter()
+        if my_game.states.paused:
+            # The tick has queued a pause screen, which is drawn in place of the frame.
+            pass
+        elif my_game.renderer:
+            # Redraw and update only the changed regions of the display.
+            my_game.renderer.render()
+        else:
+            # Fill the display and draw all sprite groups.
+            display_surface.fill(BLACK)
+            my_paddle_group.draw(display_surface)
+            my_ball_group.draw(display_surface)
+            my_brick_group.draw(display_surface)
+            my_power_up_group.draw(display_surface)
+            my_game.missile_group.draw(display_surface)
+            my_game.monkey_group.draw(display_surface)
 
-    # Fill the display.
-    display_surface.fill(BLACK)
+            # Draw the Game object.
+            my_game.draw()
 
-    # Update and draw all sprite groups.
-    my_paddle_group.update()
-    my_paddle_group.draw(display_surface)
+            # Update the display.
+            pygame.display.update()
+        my_profiler.add('render', time.perf_counter() - phase_start)
 
-    my_ball_group.update()
-    my_ball_group.draw(display_surface)
+        # Return the sprites to their simulated positions.
+        if INTERPOLATION:
+            my_interpolator.restore()
 
-    my_brick_group.update()
-    my_brick_group.draw(display_surface)
+        # Draw the profiler overlay over the frame, and have the renderer restore the region beneath it next frame.
+        overlay_rect = my_overlay.draw(display_surface) if not my_game.states.paused else None
+        if overlay_rect:
+            pygame.display.update(overlay_rect)
+            if my_game.renderer:
+                my_game.renderer.refresh(overlay_rect)
 
-    my_power_up_group.update()
-    my_power_up_group.draw(display_surface)
+        # Tick the clock, waiting out the rest of the frame if the frame rate is capped.
+        phase_start = time.perf_counter()
+        clock.tick(FPS or 0)
+        my_profiler.add('wait', time.perf_counter() - phase_start)
+        my_profiler.end_frame()
 
-    # Update and draw the Game object.
-    my_game.update()
-    my_game.draw()
+    # Save the replay log of the session.
+    save_replay(my_recorder)
 
-    # Update the display and tick the clock.
-    pygame.display.update()
-    clock.tick(FPS)
+    # Save the timing trace of the session.
+    if PROFILE_TRACE_PATH:
+        my_profiler.export(PROFILE_TRACE_PATH)
 
-# End of the game.
-pygame.quit()
+    # End of the game.
+    pygame.quit()
 
 '''Development Tasks'''
 # Create a paddle and allow the player to horizontally translate it accross the display. (COMPLETE)
@@ -590,11 +481,21 @@ pygame.quit()
 # Revise the UI to include the round timer. (COMPLETE)
 # Add a power up that will randomly drop from a brick. (COMPLETE)
 # The powers will spawn front he brick and move down the screen until the player picks it up. (COMPLETE)
-# The powers will last a certain period of time (say 10 seconds).
-# Powerup # 1: additional ball.
-# Powerup # 2: missiles.
-# Powerup # 3: increased paddle size.
-# The powers will spawn from the brick and move down the screen until the player picks it up. The powers will last a certain period of time (say 10 seconds).
-# Add a monkey power up that bounces across the screen and destroys all bricks in its path.
+# The powers will last a certain period of time (say 10 seconds). (COMPLETE)
+# Powerup # 1: additional ball. (COMPLETE)
+# Powerup # 2: missiles. (COMPLETE)
+# Powerup # 3: increased paddle size. (COMPLETE)
+# The powers will spawn from the brick and move down the screen until the player picks it up. The powers will last a certain period of time (say 10 seconds). (COMPLETE)
+# Add a monkey power up that bounces across the screen and destroys all bricks in its path. (COMPLETE)
 # Find a way to make the brick corners rounded...
-# Add a boost mechanic that initiates at 100 and allows the player to increase their movement speed. This will recharge by destroying bricks.
\ No newline at end of file
+# Add a boost mechanic that initiates at 100 and allows the player to increase their movement speed. This will recharge by destroying bricks.
+
+if __name__ == '__main__':
+    # Import the argparse library to read the command line options.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Play Brick Breaker.')
+    parser.add_argument('--startup-time', action='store_true', help='print how long the game takes to start, then quit')
+    args = parser.parse_args()
+
+    main(startup_only=args.startup_time)
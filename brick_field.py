@@ -0,0 +1,336 @@
+'''
+Brick Breaker - Chunked Brick Field
+'''
+
+# Import the pygame libary.
+import pygame
+
+# Import the copy library to fork fields.
+import copy
+
+# Set the number of grid cells along each side of a chunk.
+CHUNK_SIZE = 32
+
+# Define classes.
+class FieldBrick:
+    '''A handle to one standing brick of a BrickField, made when a query or iteration returns the brick. It has the attributes of a Brick
+    sprite that the game rules use, and kill() and damage() change the field.'''
+    __slots__ = ('field', 'row', 'column', 'code', 'rect', 'width', 'height', 'color', 'hits')
+
+    def __init__(self, field, row, column, code):
+        '''Initialize the handle'''
+        self.field = field
+        self.row = row
+        self.column = column
+        self.rect = field.cell_rect(row, column)
+        self.width = field.brick_width
+        self.height = field.brick_height
+        self.set_code(code)
+
+    def set_code(self, code):
+        '''Set the brick code, and the color and hits left that it stands for'''
+        self.code = code
+        char, self.color, self.hits, weaker = self.field.brick_types[code]
+
+    def kill(self):
+        '''Remove the brick from the field'''
+        self.field.remove(self)
+
+    def damage(self):
+        '''Take one hit from a brick that has more than one left'''
+        self.field.damage(self)
+
+class BrickField:
+    '''A brick group that stores a level's bricks as one brick code per grid cell, in square chunks of cells.
+
+    A chunk is allocated only where bricks stand and is freed when its last brick breaks, so memory follows the live bricks rather than
+    the area of the grid. Queries look bricks up by grid position, and a FieldBrick handle is made only for a brick a query returns, so
+    a level of tens of thousands of bricks costs a few bytes per brick rather than a sprite each. Bricks do not move, so update() does
+    nothing. Bricks are returned in row-major order, the order a level lays them out in.'''
+    def __init__(self, brick_types):
+        '''Initialize the field. brick_types lists the (character, color, hits, weaker code) of each brick code, where code 0 is an
+        empty cell, hits is 0 for an indestructible brick, and the weaker code is the code a multi-hit brick becomes when hit.'''
+        self.brick_types = brick_types
+        self.codes = {(color, hits): code for code, (char, color, hits, weaker) in enumerate(brick_types) if code}
+
+        # Define the table that translates the brick codes of unbreakable bricks to 1 and every other code to 0, to count them quickly.
+        self.unbreakable = bytes(1 if 0 < code < len(brick_types) and not brick_types[code][2] else 0 for code in range(256))
+
+        # Define the grid geometry, set from a level by configure().
+        self.columns = 0
+        self.rows = 0
+        self.brick_width = 0.0
+        self.brick_height = 0.0
+        self.horizontal_buffer = 0.0
+        self.vertical_buffer = 0.0
+        self.HUD_height = 0
+
+        # Define the top left corner of the first brick and the distance between neighbouring bricks, used to find a position's cell.
+        self.left = 0.0
+        self.top = 0.0
+        self.pitch_x = 1.0
+        self.pitch_y = 1.0
+
+        # Define the cell size of the coarse occupancy grid used by batched ball lookups, which is the brick pitch.
+        self.cell_width = 1
+        self.cell_height = 1
+
+        self.empty()
+
+    def empty(self):
+        '''Remove every brick'''
+        # Map each (chunk column, chunk row) to its bytearray of brick codes and to the number of standing bricks in it.
+        self.chunks = {}
+        self.chunk_counts = {}
+
+        # Define the number of standing bricks, and how many of them can be broken.
+        self.count = 0
+        self.breakable = 0
+
+        # Map each cell of the coarse occupancy grid to the number of standing bricks overlapping it. The map is built the first time it
+        # is asked for and then kept up to date as bricks are placed and removed.
+        self.occupied = None
+
+        # Define the keys of the chunks shared with a fork, which are copied before they are first changed.
+        self.shared = set()
+
+    def configure(self, level, HUD_height):
+        '''Take the grid geometry of a level, and remove every brick'''
+        self.columns = level.columns
+        self.rows = level.rows
+        self.brick_width, self.brick_height, self.horizontal_buffer, self.vertical_buffer = level.geometry()
+        self.HUD_height = HUD_height
+        self.left = self.horizontal_buffer
+        self.top = self.vertical_buffer + HUD_height
+        self.pitch_x = self.brick_width + self.horizontal_buffer
+        self.pitch_y = self.brick_height + self.vertical_buffer
+        self.cell_width, self.cell_height = level.cell_size()
+
+        # Define the pixel position of each column and row of bricks, and the pixel size of a brick, placed as a Brick sprite would be
+        # by the level, and the rect around every cell of the grid.
+        self.xs = []
+        self.ys = []
+        rect = pygame.Rect(0, 0, int(self.brick_width), int(self.brick_height))
+        for column in range(self.columns):
+            rect.x = self.horizontal_buffer * (column + 1) + self.brick_width * column
+            self.xs.append(rect.x)
+        for row in range(self.rows):
+            rect.y = self.vertical_buffer * (row + 1) + self.brick_height * row + HUD_height
+            self.ys.append(rect.y)
+        self.rect_width, self.rect_height = rect.size
+        self.bounds = pygame.Rect(self.xs[0], self.ys[0], self.xs[-1] + self.rect_width - self.xs[0], self.ys[-1] + self.rect_height - self.ys[0])
+        self.empty()
+
+    def load(self, level, HUD_height, cells=None):
+        '''Replace the bricks with every brick of a level, copying the level's cells into chunks a row slice at a time. cells replaces
+        the level's own brick codes, e.g. with those of a saved game on the level.'''
+        self.configure(level, HUD_height)
+        columns = self.columns
+        cells = bytes(level.cells if cells is None else cells)
+        for chunk_row in range(0, self.rows, CHUNK_SIZE):
+            for chunk_column in range(0, columns, CHUNK_SIZE):
+                width = min(CHUNK_SIZE, columns - chunk_column)
+                chunk = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+                for row in range(chunk_row, min(chunk_row + CHUNK_SIZE, self.rows)):
+                    start = row * columns + chunk_column
+                    offset = (row - chunk_row) * CHUNK_SIZE
+                    chunk[offset:offset + width] = cells[start:start + width]
+
+                # Keep the chunk only if a brick stands in it, and count its bricks.
+                count = CHUNK_SIZE * CHUNK_SIZE - chunk.count(0)
+                if count:
+                    key = (chunk_column // CHUNK_SIZE, chunk_row // CHUNK_SIZE)
+                    self.chunks[key] = chunk
+                    self.chunk_counts[key] = count
+                    self.count += count
+                    self.breakable += count - chunk.translate(self.unbreakable).count(1)
+
+    def restore(self, level, HUD_height, bricks):
+        '''Replace the bricks with those listed as (x, y, width, height, color, hits), on the grid of a level'''
+        self.configure(level, HUD_height)
+        for x, y, width, height, color, hits in bricks:
+            self.place(*self.cell_at(x, y), self.codes[(color, hits)])
+
+    def cell_at(self, x, y):
+        '''Return the (row, column) of the brick whose top left corner is at a position'''
+        row = round((y - self.top) / self.pitch_y)
+        column = round((x - self.left) / self.pitch_x)
+        if not (0 <= row < self.rows and 0 <= column < self.columns) or self.cell_rect(row, column).topleft != (x, y):
+            raise ValueError(f'no grid cell has a brick at {(x, y)}')
+        return row, column
+
+    def cell_rect(self, row, column):
+        '''Return the rect of the brick in a cell'''
+        return pygame.Rect(self.xs[column], self.ys[row], self.rect_width, self.rect_height)
+
+    def place(self, row, column, code):
+        '''Stand a brick in an empty cell'''
+        key = (column // CHUNK_SIZE, row // CHUNK_SIZE)
+        if key in self.chunks:
+            chunk = self.writable(key)
+        else:
+            chunk = self.chunks[key] = bytearray(CHUNK_SIZE * CHUNK_SIZE)
+            self.chunk_counts[key] = 0
+        chunk[row % CHUNK_SIZE * CHUNK_SIZE + column % CHUNK_SIZE] = code
+        self.chunk_counts[key] += 1
+        self.count += 1
+        if self.brick_types[code][2]:
+            self.breakable += 1
+        if self.occupied is not None:
+            for key in self.occupancy_keys(row, column):
+                self.occupied[key] = self.occupied.get(key, 0) + 1
+
+    def code(self, row, column):
+        '''Return the brick code of a cell, 0 if it is empty'''
+        chunk = self.chunks.get((column // CHUNK_SIZE, row // CHUNK_SIZE))
+        if chunk is None:
+            return 0
+        return chunk[row % CHUNK_SIZE * CHUNK_SIZE + column % CHUNK_SIZE]
+
+    def remove(self, brick):
+        '''Remove a brick, freeing its chunk if it was the last brick in it. Removing a brick that is already gone does nothing.'''
+        row, column = brick.row, brick.column
+        key = (column // CHUNK_SIZE, row // CHUNK_SIZE)
+        chunk = self.chunks.get(key)
+        index = row % CHUNK_SIZE * CHUNK_SIZE + column % CHUNK_SIZE
+        if chunk is None or not chunk[index]:
+            return
+        if self.brick_types[chunk[index]][2]:
+            self.breakable -= 1
+        self.count -= 1
+        self.chunk_counts[key] -= 1
+        if self.chunk_counts[key]:
+            self.writable(key)[index] = 0
+        else:
+            del self.chunks[key]
+            del self.chunk_counts[key]
+            self.shared.discard(key)
+        if self.occupied is not None:
+            for key in self.occupancy_keys(row, column):
+                self.occupied[key] -= 1
+                if not self.occupied[key]:
+                    del self.occupied[key]
+
+    def damage(self, brick):
+        '''Take one hit from a multi-hit brick, changing it to the brick type with one hit fewer'''
+        code = self.brick_types[brick.code][3]
+        self.writable((brick.column // CHUNK_SIZE, brick.row // CHUNK_SIZE))[brick.row % CHUNK_SIZE * CHUNK_SIZE + brick.column % CHUNK_SIZE] = code
+        brick.set_code(code)
+
+    def writable(self, key):
+        '''Return a chunk that is about to be changed, first copying it if it is shared with a fork'''
+        chunk = self.chunks[key]
+        if key in self.shared:
+            chunk = self.chunks[key] = bytearray(chunk)
+            self.shared.discard(key)
+        return chunk
+
+    def fork(self):
+        '''Return a copy of the field that shares its chunks with this one. Either field copies a shared chunk only when it first
+        changes it, so forking costs one dictionary copy however many bricks stand.'''
+        fork = copy.copy(self)
+        fork.chunks = dict(self.chunks)
+        fork.chunk_counts = dict(self.chunk_counts)
+        fork.occupied = dict(self.occupied) if self.occupied is not None else None
+        self.shared = set(self.chunks)
+        fork.shared = set(self.chunks)
+        return fork
+
+    def grid(self):
+        '''Return the brick code of every cell, row by row, as bytes'''
+        grid = bytearray(self.rows * self.columns)
+        for (chunk_column, chunk_row), chunk in self.chunks.items():
+            column = chunk_column * CHUNK_SIZE
+            width = min(CHUNK_SIZE, self.columns - column)
+            for row in range(chunk_row * CHUNK_SIZE, min((chunk_row + 1) * CHUNK_SIZE, self.rows)):
+                offset = row % CHUNK_SIZE * CHUNK_SIZE
+                start = row * self.columns + column
+                grid[start:start + width] = chunk[offset:offset + width]
+        return bytes(grid)
+
+    def collide(self, sprite):
+        '''Return the bricks whose rects collide with the given sprite's rect, in row-major order'''
+        return self.query(sprite.rect)
+
+    def query(self, rect):
+        '''Return the bricks whose rects collide with a rect, in row-major order'''
+        if not self.count or not self.bounds.colliderect(rect):
+            return []
+
+        # Find the cells whose bricks could reach the rect, with a cell of slack for the rounding of brick positions.
+        left, top, right, bottom = rect.left, rect.top, rect.right, rect.bottom
+        first_row = max(int((top - self.top - self.brick_height) // self.pitch_y), 0)
+        last_row = min(int((bottom - self.top) // self.pitch_y) + 1, self.rows - 1)
+        first_column = max(int((left - self.left - self.brick_width) // self.pitch_x), 0)
+        last_column = min(int((right - self.left) // self.pitch_x) + 1, self.columns - 1)
+
+        # Keep the standing bricks whose rects overlap the rect.
+        xs, ys, width, height, chunks = self.xs, self.ys, self.rect_width, self.rect_height, self.chunks
+        hits = []
+        for row in range(first_row, last_row + 1):
+            y = ys[row]
+            if y >= bottom or y + height <= top:
+                continue
+            chunk_row = row // CHUNK_SIZE
+            offset = row % CHUNK_SIZE * CHUNK_SIZE
+            for column in range(first_column, last_column + 1):
+                x = xs[column]
+                if x >= right or x + width <= left:
+                    continue
+                chunk = chunks.get((column // CHUNK_SIZE, chunk_row))
+                if chunk is not None and chunk[offset + column % CHUNK_SIZE]:
+                    hits.append(FieldBrick(self, row, column, chunk[offset + column % CHUNK_SIZE]))
+        return hits
+
+    def occupancy_keys(self, row, column):
+        '''Return the cells of the coarse occupancy grid that the brick in a cell overlaps'''
+        rect = self.cell_rect(row, column)
+        return [(x, y) for x in range(rect.left // self.cell_width, (rect.right - 1) // self.cell_width + 1) for y in range(rect.top // self.cell_height, (rect.bottom - 1) // self.cell_height + 1)]
+
+    def occupied_cells(self):
+        '''Return the (column, row) cells of the coarse occupancy grid, whose cells are the brick pitch in size, that a standing brick overlaps'''
+        if self.occupied is None:
+            self.occupied = {}
+            for row, column, code in self.cells():
+                for key in self.occupancy_keys(row, column):
+                    self.occupied[key] = self.occupied.get(key, 0) + 1
+        return self.occupied.keys()
+
+    def __len__(self):
+        '''Return the number of standing bricks'''
+        return self.count
+
+    def __iter__(self):
+        '''Iterate over a handle to every standing brick, in row-major order'''
+        for row, column, code in self.cells():
+            yield FieldBrick(self, row, column, code)
+
+    def cells(self):
+        '''Iterate over the (row, column, code) of every standing brick, in row-major order'''
+        chunk_columns = sorted({key[0] for key in self.chunks})
+        for chunk_row in sorted({key[1] for key in self.chunks}):
+            keys = [(chunk_column, chunk_row) for chunk_column in chunk_columns if (chunk_column, chunk_row) in self.chunks]
+            for row in range(chunk_row * CHUNK_SIZE, min((chunk_row + 1) * CHUNK_SIZE, self.rows)):
+                offset = row % CHUNK_SIZE * CHUNK_SIZE
+                for key in keys:
+                    chunk = self.chunks[key]
+                    for index in range(offset, offset + CHUNK_SIZE):
+                        if chunk[index]:
+                            yield row, key[0] * CHUNK_SIZE + index - offset, chunk[index]
+
+    def sprites(self):
+        '''Return a list of handles to the standing bricks'''
+        return list(self)
+
+    def update(self, *args, **kwargs):
+        '''Bricks do not move, so there is nothing to update'''
+        pass
+
+    def draw(self, surface):
+        '''Fill the rect of every standing brick on a surface in its color. Returns the rects drawn.'''
+        rects = []
+        for row, column, code in self.cells():
+            rect = self.cell_rect(row, column)
+            surface.fill(self.brick_types[code][1], rect)
+            rects.append(rect)
+        return rects
@@ -0,0 +1,363 @@
+'''
+Brick Breaker - Reinforcement Learning Environment
+'''
+
+# Import the pygame libary.
+import pygame
+
+# Import the random library.
+import random
+
+# Import the multiprocessing library and shared memory blocks for the multi-process vector environment.
+import multiprocessing
+from multiprocessing import shared_memory
+
+# Import NumPy if it is available. The environments need it for their observation arrays, but the rest of the game does not.
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Import the headless simulation core.
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, BLACK, TICKS_PER_SECOND, BRICK_COLUMNS, BRICK_ROWS, create_simulation
+
+# Import the lookup of simulation types by name.
+from replay import simulation_class
+
+# Set the (left, right) inputs of each action: stay, move left, and move right.
+ACTIONS = ((False, False), (True, False), (False, True))
+
+# Define classes.
+class BrickBreakerEnv:
+    '''A Gym-style environment that plays one game of Brick Breaker per episode, without a display.
+
+    The observation is a float32 vector: the paddle's center, then max_balls slots of (x, y, dx, dy, present) for the lowest balls,
+    then one flag per cell of a max_rows x max_columns brick grid (the standard 12 x 11 levels by default) that holds a standing brick.
+    A level's grid is placed at the top left of the brick grid, so the observation has the same size on every level; the cells of a
+    smaller level that are outside it stay 0, and the bricks of a larger level that do not fit are left out. Positions are scaled to
+    [0, 1] by the playfield size.
+    The reward is the score gained in the step, less life_penalty for each life lost.
+    An episode ends when the game is lost, or won by clearing the last level listed by the level manifest (the manifest's endless
+    levels are not played), and is truncated after max_ticks ticks.'''
+    def __init__(self, simulation_name='Simulation', max_ticks=TICKS_PER_SECOND * 60 * 5, frame_skip=1, life_penalty=100.0, max_balls=4,
+                 max_columns=BRICK_COLUMNS, max_rows=BRICK_ROWS):
+        '''Initialize the environment'''
+        if numpy is None:
+            raise ImportError('The Brick Breaker environment requires NumPy. Install it with: pip install numpy')
+
+        # Define the simulation type, the episode length, and the number of ticks each action is held for.
+        self.simulation_type = simulation_class(simulation_name)
+        self.max_ticks = max_ticks
+        self.frame_skip = frame_skip
+
+        # Define the reward settings, the number of ball slots in the observation, and the size of its brick grid.
+        self.life_penalty = life_penalty
+        self.max_balls = max_balls
+        self.max_columns = max_columns
+        self.max_rows = max_rows
+
+        # Define the sizes of the action and observation spaces.
+        self.action_count = len(ACTIONS)
+        self.observation_size = 1 + max_balls * 5 + max_rows * max_columns
+
+        # Define the generator of game seeds, seeded by reset(seed).
+        self.seeds = random.Random()
+
+        # Define the current game, its brick flags by row and column, the number of the last level to play, and its episode counters.
+        self.simulation = None
+        self.bricks = numpy.zeros((max_rows, max_columns), dtype=numpy.float32)
+        self.last_level = None
+        self.ticks = 0
+        self.score = 0
+        self.lives_lost = 0
+        self.ended = None
+
+        # Define the off-screen surface used by render.
+        self.surface = None
+
+    def reset(self, seed=None):
+        '''Start a new game. A seed makes this and every following episode reproducible. Returns (observation, info).'''
+        if seed is not None:
+            self.seeds.seed(seed)
+        self.simulation = create_simulation(self.simulation_type, self.seeds.randrange(2 ** 32))
+        self.last_level = len(self.simulation.level_manifest.levels)
+        self.attach(self.simulation)
+        self.ticks = 0
+        self.score = 0
+        self.lives_lost = 0
+        self.ended = None
+        self.update_bricks()
+        return self.observation(), {'seed': self.simulation.seed}
+
+    def attach(self, simulation):
+        '''Follow the events of a simulation that the observation and reward depend on, by wrapping its hooks'''
+        break_brick = simulation.break_brick
+        on_level_start = simulation.on_level_start
+        on_life_lost = simulation.on_life_lost
+        on_game_over = simulation.on_game_over
+        on_level_complete = simulation.on_level_complete
+
+        def observed_break_brick(brick):
+            cell = self.cell(brick)
+            if cell is not None:
+                self.bricks[cell] = 0.0
+            break_brick(brick)
+
+        def observed_on_level_start():
+            self.update_bricks()
+            on_level_start()
+
+        def observed_on_life_lost():
+            self.lives_lost += 1
+            on_life_lost()
+
+        # The game resets the player straight after it is lost or won, so the score is taken first.
+        def observed_on_game_over():
+            self.end('game_over')
+            on_game_over()
+
+        # The level number has already moved on to the next level when a level is complete.
+        def observed_on_level_complete():
+            if simulation.level_number > self.last_level:
+                self.end('victory')
+            on_level_complete()
+
+        simulation.break_brick = observed_break_brick
+        simulation.on_level_start = observed_on_level_start
+        simulation.on_life_lost = observed_on_life_lost
+        simulation.on_game_over = observed_on_game_over
+        simulation.on_level_complete = observed_on_level_complete
+
+    def end(self, outcome):
+        '''Record how the game ended and its final score'''
+        if self.ended is None:
+            self.ended = (outcome, self.simulation.player.score)
+
+    def cell(self, brick):
+        '''Return the (row, column) of a brick's flag, or None if the brick is outside the observed brick grid'''
+        if brick.row < self.max_rows and brick.column < self.max_columns:
+            return brick.row, brick.column
+        return None
+
+    def update_bricks(self):
+        '''Set the brick flags from the bricks standing in the current level'''
+        self.bricks[:] = 0.0
+        for row, column, code in self.simulation.brick_group.cells():
+            if row < self.max_rows and column < self.max_columns:
+                self.bricks[row, column] = 1.0
+
+    def step(self, action):
+        '''Hold an action for frame_skip ticks. Returns (observation, reward, terminated, truncated, info).'''
+        reward, terminated, truncated, info = self.advance(action)
+        return self.observation(), reward, terminated, truncated, info
+
+    def advance(self, action):
+        '''Hold an action for frame_skip ticks without building the observation. Returns (reward, terminated, truncated, info).'''
+        lives_lost = self.lives_lost
+        left, right = ACTIONS[action]
+        for tick in range(self.frame_skip):
+            self.simulation.step(left, right)
+            self.ticks += 1
+            if self.ended:
+                break
+
+        # Reward the score gained, less a penalty for each life lost.
+        score = self.ended[1] if self.ended else self.simulation.player.score
+        reward = score - self.score - (self.lives_lost - lives_lost) * self.life_penalty
+        self.score = score
+
+        terminated = self.ended is not None
+        truncated = not terminated and self.ticks >= self.max_ticks
+        info = {'score': score, 'level': self.simulation.level_number, 'outcome': self.ended[0] if self.ended else None}
+        return reward, terminated, truncated, info
+
+    def observation(self, out=None):
+        '''Return the observation vector, writing it into an existing float32 array if one is given'''
+        if out is None:
+            out = numpy.empty(self.observation_size, dtype=numpy.float32)
+        simulation = self.simulation
+        out[0] = simulation.paddle.rect.centerx / WINDOW_WIDTH
+
+        # Fill the ball slots with the lowest balls, since those are the ones the paddle must reach first.
+        balls = sorted(simulation.get_ball_states(), key=lambda ball: -ball[1])[:self.max_balls]
+        slots = out[1:1 + self.max_balls * 5]
+        slots[:] = 0.0
+        for i, ball in enumerate(balls):
+            slots[i * 5:i * 5 + 5] = (ball[0] / WINDOW_WIDTH, ball[1] / WINDOW_HEIGHT, ball[2], ball[3], 1.0)
+
+        out[1 + self.max_balls * 5:] = self.bricks.ravel()
+        return out
+
+    def render(self):
+        '''Draw the game off-screen and return it as an RGB array of shape (height, width, 3)'''
+        if self.surface is None:
+            self.surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+        self.surface.fill(BLACK)
+        simulation = self.simulation
+        for group in (simulation.paddle_group, simulation.ball_group, simulation.brick_group, simulation.powerup_group, simulation.missile_group, simulation.monkey_group):
+            group.draw(self.surface)
+        return pygame.surfarray.array3d(self.surface).swapaxes(0, 1)
+
+class VectorEnv:
+    '''A batch of environments stepped in lockstep in this process, with batched NumPy observations, rewards, and flags.
+    An environment whose episode ends is reset at once, so the observation returned for it is the first of its next episode.'''
+    def __init__(self, num_envs, arrays=None, **env_options):
+        '''Initialize the environments. Pass arrays to have the batch written into existing arrays, such as shared memory.'''
+        self.envs = [BrickBreakerEnv(**env_options) for i in range(num_envs)]
+        self.num_envs = num_envs
+        self.action_count = self.envs[0].action_count
+        self.observation_size = self.envs[0].observation_size
+        if arrays is None:
+            arrays = allocate_arrays(num_envs, self.observation_size)
+        self.observations = arrays['observations']
+        self.rewards = arrays['rewards']
+        self.terminated = arrays['terminated']
+        self.truncated = arrays['truncated']
+
+    def reset(self, seed=None):
+        '''Reset every environment, seeding environment i with seed + i. Returns the batched observations.'''
+        for i, env in enumerate(self.envs):
+            env.reset(None if seed is None else seed + i)
+            env.observation(self.observations[i])
+        return self.observations
+
+    def step(self, actions):
+        '''Step every environment with its action. Returns (observations, rewards, terminated, truncated, infos).'''
+        infos = []
+        for i, env in enumerate(self.envs):
+            reward, terminated, truncated, info = env.advance(actions[i])
+            if terminated or truncated:
+                env.reset()
+            env.observation(self.observations[i])
+            self.rewards[i] = reward
+            self.terminated[i] = terminated
+            self.truncated[i] = truncated
+            infos.append(info)
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+class SharedMemoryVectorEnv:
+    '''A batch of environments split across worker processes, which write their results straight into shared memory arrays'''
+    def __init__(self, num_envs, workers=None, **env_options):
+        '''Initialize the environments and start the workers'''
+        if numpy is None:
+            raise ImportError('The Brick Breaker environment requires NumPy. Install it with: pip install numpy')
+        workers = min(num_envs, workers or multiprocessing.cpu_count())
+        self.num_envs = num_envs
+        self.observation_size = BrickBreakerEnv(**env_options).observation_size
+        self.action_count = len(ACTIONS)
+
+        # Allocate the shared arrays, including one for the actions.
+        self.blocks = {}
+        self.arrays = {}
+        for name, shape, dtype in array_layout(num_envs, self.observation_size) + [('actions', (num_envs,), numpy.int64)]:
+            block = shared_memory.SharedMemory(create=True, size=max(1, int(numpy.prod(shape)) * numpy.dtype(dtype).itemsize))
+            self.blocks[name] = block
+            self.arrays[name] = numpy.ndarray(shape, dtype=dtype, buffer=block.buf)
+        self.observations = self.arrays['observations']
+        self.rewards = self.arrays['rewards']
+        self.terminated = self.arrays['terminated']
+        self.truncated = self.arrays['truncated']
+
+        # Give each worker an even slice of the environments.
+        self.slices = []
+        self.pipes = []
+        self.processes = []
+        for worker in range(workers):
+            start = num_envs * worker // workers
+            end = num_envs * (worker + 1) // workers
+            parent_pipe, child_pipe = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=run_worker, args=(child_pipe, {name: block.name for name, block in self.blocks.items()}, num_envs, self.observation_size, start, end, env_options), daemon=True)
+            process.start()
+            self.slices.append((start, end))
+            self.pipes.append(parent_pipe)
+            self.processes.append(process)
+
+    def reset(self, seed=None):
+        '''Reset every environment, seeding environment i with seed + i. Returns the batched observations.'''
+        for (start, end), pipe in zip(self.slices, self.pipes):
+            pipe.send(('reset', None if seed is None else seed + start))
+        for pipe in self.pipes:
+            pipe.recv()
+        return self.observations
+
+    def step(self, actions):
+        '''Step every environment with its action. Returns (observations, rewards, terminated, truncated, infos).'''
+        self.arrays['actions'][:] = actions
+        for pipe in self.pipes:
+            pipe.send(('step', None))
+        infos = []
+        for pipe in self.pipes:
+            infos.extend(pipe.recv())
+        return self.observations, self.rewards, self.terminated, self.truncated, infos
+
+    def close(self):
+        '''Stop the workers and free the shared memory'''
+        for pipe in self.pipes:
+            pipe.send(('close', None))
+        for process in self.processes:
+            process.join()
+        self.arrays = {}
+        self.observations = self.rewards = self.terminated = self.truncated = None
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+def array_layout(num_envs, observation_size):
+    '''Return the (name, shape, dtype) of each batched array'''
+    return [
+        ('observations', (num_envs, observation_size), numpy.float32),
+        ('rewards', (num_envs,), numpy.float64),
+        ('terminated', (num_envs,), numpy.bool_),
+        ('truncated', (num_envs,), numpy.bool_),
+    ]
+
+def allocate_arrays(num_envs, observation_size):
+    '''Return new batched arrays for a number of environments'''
+    return {name: numpy.zeros(shape, dtype=dtype) for name, shape, dtype in array_layout(num_envs, observation_size)}
+
+def run_worker(pipe, block_names, num_envs, observation_size, start, end, env_options):
+    '''Run a slice of a SharedMemoryVectorEnv's environments, answering its commands until it is closed'''
+    blocks = {name: shared_memory.SharedMemory(name=block_name) for name, block_name in block_names.items()}
+    arrays = {}
+    for name, shape, dtype in array_layout(num_envs, observation_size) + [('actions', (num_envs,), numpy.int64)]:
+        arrays[name] = numpy.ndarray(shape, dtype=dtype, buffer=blocks[name].buf)[start:end]
+    vector = VectorEnv(end - start, arrays, **env_options)
+
+    while True:
+        command, argument = pipe.recv()
+        if command == 'reset':
+            vector.reset(argument)
+            pipe.send(None)
+        elif command == 'step':
+            infos = vector.step(arrays['actions'])[4]
+            pipe.send(infos)
+        else:
+            break
+
+    # Drop the views into the shared memory before closing it.
+    del vector, arrays
+    for block in blocks.values():
+        block.close()
+
+if __name__ == '__main__':
+    # Import the argparse and time libraries to read the command line options and measure throughput.
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description='Measure the throughput of the Brick Breaker environments with random actions.')
+    parser.add_argument('--envs', type=int, default=16, help='number of environments stepped in lockstep')
+    parser.add_argument('--steps', type=int, default=2000, help='number of batched steps')
+    parser.add_argument('--workers', type=int, default=0, help='number of worker processes, or 0 to step every environment in this process')
+    args = parser.parse_args()
+
+    vector = SharedMemoryVectorEnv(args.envs, args.workers) if args.workers else VectorEnv(args.envs)
+    vector.reset(seed=0)
+    actions = numpy.random.default_rng(0).integers(0, vector.action_count, size=(args.steps, args.envs))
+    start_time = time.perf_counter()
+    for step in range(args.steps):
+        vector.step(actions[step])
+    elapsed = time.perf_counter() - start_time
+    print(f'{args.steps * args.envs} environment steps in {elapsed:.2f} s: {args.steps * args.envs / elapsed:.0f} steps/s')
+    if args.workers:
+        vector.close()
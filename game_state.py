@@ -0,0 +1,66 @@
+'''
+Brick Breaker - Game States
+'''
+
+# Import the deque class for the queue of pause screens.
+from collections import deque
+
+# Import the pygame libary. Only event types and key codes are used here, so no display is required.
+import pygame
+
+# Set the game states.
+PLAYING = 'playing'
+PAUSED = 'paused'
+LEVEL_INTRO = 'level_intro'
+GAME_OVER = 'game_over'
+VICTORY = 'victory'
+
+# Set the keys that dismiss a pause screen.
+CONTINUE_KEYS = (pygame.K_RETURN, pygame.K_KP_ENTER)
+
+# Define classes.
+class Screen:
+    '''A pause screen: the state it stands for, its text, and the frame shown while it is up'''
+    def __init__(self, state, main_text, sub_text, frame=None):
+        '''Initialize the screen'''
+        self.state = state
+        self.main_text = main_text
+        self.sub_text = sub_text
+        self.frame = frame
+
+class GameStateMachine:
+    '''A class to track whether the game is being played or is waiting on a pause screen.
+
+    Game events push screens rather than blocking, so several can be queued in one tick (e.g. game over, then the intro of level 1).
+    The game is playing only once every queued screen has been dismissed.'''
+    def __init__(self):
+        '''Initialize the state machine'''
+        self.screens = deque()
+
+    @property
+    def state(self):
+        '''Return the current state'''
+        return self.screens[0].state if self.screens else PLAYING
+
+    @property
+    def paused(self):
+        '''Return whether a pause screen is up'''
+        return bool(self.screens)
+
+    @property
+    def screen(self):
+        '''Return the pause screen that is up, or None while playing'''
+        return self.screens[0] if self.screens else None
+
+    def enter(self, state, main_text, sub_text, frame=None):
+        '''Queue a pause screen, which is shown once the screens before it have been dismissed. Returns the screen.'''
+        screen = Screen(state, main_text, sub_text, frame)
+        self.screens.append(screen)
+        return screen
+
+    def handle(self, event):
+        '''Dismiss the current pause screen if the event is a continue key press. Returns whether a screen was dismissed.'''
+        if self.screens and event.type == pygame.KEYDOWN and event.key in CONTINUE_KEYS:
+            self.screens.popleft()
+            return True
+        return False
@@ -0,0 +1,104 @@
+'''
+Brick Breaker - HUD
+'''
+
+# Import the time library to measure the cost of drawing the HUD.
+import time
+
+# Import the OrderedDict class for the least recently used text cache.
+from collections import OrderedDict
+
+# Import the colors used by the game.
+from simulation import WHITE
+
+# Define classes.
+class HUD:
+    '''A class to draw the score, timer, and lives, rendering each piece of text only when its value changes'''
+    def __init__(self, font, width, height, color=WHITE, cache_size=16):
+        '''Initialize the HUD'''
+        self.font = font
+        self.width = width
+        self.height = height
+        self.color = color
+
+        # Map each HUD field to its last value and the rendered text and rect for that value.
+        self.fields = {}
+
+        # Define the least recently used cache of other rendered strings, such as the pause screen text.
+        self.text_cache = OrderedDict()
+        self.cache_size = cache_size
+
+        # Define the timing counters.
+        self.frames = 0
+        self.renders = 0
+        self.cache_hits = 0
+        self.render_time = 0.0
+        self.draw_time = 0.0
+
+    def render(self, text):
+        '''Render a string, timing the font rasterization'''
+        start_time = time.perf_counter()
+        surface = self.font.render(text, True, self.color)
+        self.render_time += time.perf_counter() - start_time
+        self.renders += 1
+        return surface
+
+    def field(self, name, value, text, **position):
+        '''Return the rendered text and rect of a HUD field, rendering it again only if its value has changed'''
+        cached = self.fields.get(name)
+        if cached and cached[0] == value:
+            self.cache_hits += 1
+            return cached[1], cached[2]
+
+        # Render the text and locate its rect.
+        surface = self.render(text)
+        rect = surface.get_rect(**position)
+        self.fields[name] = (value, surface, rect)
+        return surface, rect
+
+    def render_text(self, text):
+        '''Return a rendered string from the least recently used cache, rendering it on a miss'''
+        if text in self.text_cache:
+            self.text_cache.move_to_end(text)
+            self.cache_hits += 1
+            return self.text_cache[text]
+
+        surface = self.render(text)
+        self.text_cache[text] = surface
+        if len(self.text_cache) > self.cache_size:
+            self.text_cache.popitem(last=False)
+        return surface
+
+    def draw(self, surface, score, timer, lives):
+        '''Blit the score, timer, and lives text to a surface'''
+        start_time = time.perf_counter()
+
+        # Set text.
+        score_text, score_rect = self.field('score', score, f'Score: {score}', left=15, centery=self.height / 2)
+        time_text, time_rect = self.field('time', timer, f'{timer}', centerx=self.width / 2, centery=self.height / 2)
+        lives_text, lives_rect = self.field('lives', lives, f'Lives: {lives}', right=self.width - 15, centery=self.height / 2)
+
+        # Blit the text to the surface.
+        surface.blit(lives_text, lives_rect)
+        surface.blit(score_text, score_rect)
+        surface.blit(time_text, time_rect)
+
+        self.draw_time += time.perf_counter() - start_time
+        self.frames += 1
+
+    def stats(self):
+        '''Return the timing counters, including an estimate of the time saved by the caches'''
+        mean_render_time = self.render_time / self.renders if self.renders else 0.0
+        return {
+            'frames': self.frames,
+            'renders': self.renders,
+            'cache_hits': self.cache_hits,
+            'draw_ms_per_frame': self.draw_time / self.frames * 1000 if self.frames else 0.0,
+            'render_ms': mean_render_time * 1000,
+            'saved_ms_per_frame': self.cache_hits * mean_render_time / self.frames * 1000 if self.frames else 0.0,
+        }
+
+    def report(self):
+        '''Return a line of the HUD's time per frame and the time its caches save per frame, for the profiler overlay'''
+        stats = self.stats()
+        return f'HUD {stats["draw_ms_per_frame"]:.3f} ms/frame, cache saves {stats["saved_ms_per_frame"]:.3f} ms/frame'
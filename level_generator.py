@@ -0,0 +1,191 @@
+'''
+Brick Breaker - Level Generator
+'''
+
+# Import the random library.
+import random
+
+# Import the mmap and struct libraries to write and read packed level files.
+import mmap
+import struct
+
+# Set the size of the generated levels, which matches the standard level files.
+COLUMNS = 11
+ROWS = 12
+
+# Set the level file characters the generator uses: the blank character and the brick colors.
+BLANK = 'X'
+COLORS = 'PRGBW'
+
+# Set the words generated level names are made of.
+ADJECTIVES = ['Broken', 'Crimson', 'Silent', 'Hollow', 'Twin', 'Falling', 'Golden', 'Frozen', 'Lonely', 'Spinning', 'Shattered', 'Hidden']
+NOUNS = ['Tower', 'Bridge', 'Crown', 'Garden', 'Arrow', 'Castle', 'Comet', 'Lantern', 'Harbor', 'Maze', 'Anchor', 'Orchard']
+
+# Set the layout of a packed level file: a header holding the file signature, format version, level size, level count, and first
+# generator seed, followed by one fixed-size record per level holding its seed, its name, and its rows of level file characters.
+PACK_MAGIC = b'BBLP'
+PACK_VERSION = 1
+PACK_HEADER = struct.Struct('<4sHHHII')
+NAME_SIZE = 24
+RECORD_HEADER = struct.Struct(f'<I{NAME_SIZE}s')
+
+# Define the shapes a level's bricks can be laid out in. Each takes the random number generator and returns whether the cell at a row and
+# a column of the left half of the level (column 0 is the edge, the last column is the middle) holds a brick.
+def scatter_shape(rng):
+    '''Return a shape of randomly placed bricks'''
+    density = rng.uniform(0.35, 0.75)
+    cells = {(row, column) for row in range(ROWS) for column in range(COLUMNS // 2 + 1) if rng.random() < density}
+    return lambda row, column: (row, column) in cells
+
+def diamond_shape(rng):
+    '''Return a diamond, or the outline of one, centered on the middle column'''
+    middle = rng.randrange(3, ROWS - 3)
+    size = rng.randrange(4, 8)
+    outline = rng.random() < 0.5
+    def shape(row, column):
+        distance = abs(row - middle) + (COLUMNS // 2 - column)
+        return distance == size or (distance < size and not outline)
+    return shape
+
+def frame_shape(rng):
+    '''Return nested rectangular frames'''
+    spacing = rng.randrange(2, 4)
+    return lambda row, column: min(row, column, ROWS - 1 - row) % spacing == 0
+
+def stripe_shape(rng):
+    '''Return horizontal, vertical, or diagonal stripes'''
+    spacing = rng.randrange(2, 4)
+    direction = rng.randrange(3)
+    if direction == 0:
+        return lambda row, column: row % spacing != 0
+    if direction == 1:
+        return lambda row, column: column % spacing != 0
+    return lambda row, column: (row + column) % spacing != 0
+
+def wave_shape(rng):
+    '''Return bands that rise and fall across the level'''
+    period = rng.randrange(3, 7)
+    thickness = rng.randrange(2, 5)
+    offset = rng.randrange(ROWS - thickness)
+    return lambda row, column: 0 <= row - offset - abs(column % (2 * period) - period) // 2 < thickness
+
+SHAPES = [scatter_shape, diamond_shape, frame_shape, stripe_shape, wave_shape]
+
+def generate_level(seed, colors=COLORS, blank=BLANK):
+    '''Generate a level from a seed, returning its rows as strings of level file characters. Every level is symmetric about its middle
+    column and has at least one brick, and the same seed always gives the same level.'''
+    rng = random.Random(seed)
+
+    # Lay out the bricks of the left half from one or two shapes, trying again if the shapes leave too few bricks.
+    while True:
+        shapes = [rng.choice(SHAPES)(rng) for i in range(rng.randrange(1, 3))]
+        combine = any if rng.random() < 0.7 else all
+        half = [[combine(shape(row, column) for shape in shapes) for column in range(COLUMNS // 2 + 1)] for row in range(ROWS)]
+        if sum(map(sum, half)) >= 8:
+            break
+
+    # Color the bricks by row, by column, in rings, or in a single color.
+    palette = rng.sample(colors, rng.randrange(1, 4))
+    scheme = rng.randrange(4)
+    rows = []
+    for row in range(ROWS):
+        characters = []
+        for column in range(COLUMNS):
+            # Mirror the right half of the level onto the left half.
+            mirrored = min(column, COLUMNS - 1 - column)
+            if not half[row][mirrored]:
+                characters.append(blank)
+                continue
+            if scheme == 0:
+                index = row
+            elif scheme == 1:
+                index = mirrored
+            elif scheme == 2:
+                index = min(row, mirrored, ROWS - 1 - row)
+            else:
+                index = 0
+            characters.append(palette[index % len(palette)])
+        rows.append(''.join(characters))
+    return rows
+
+def generate_name(seed):
+    '''Generate a level's name from its seed'''
+    rng = random.Random(seed)
+    return f'{rng.choice(ADJECTIVES)} {rng.choice(NOUNS)}'
+
+def write_pack(path, first_seed, count, colors=COLORS, blank=BLANK):
+    '''Generate the levels of count consecutive seeds from first_seed and write them to a packed level file'''
+    with open(path, 'wb') as pack_file:
+        pack_file.write(PACK_HEADER.pack(PACK_MAGIC, PACK_VERSION, COLUMNS, ROWS, count, first_seed))
+        for seed in range(first_seed, first_seed + count):
+            name = generate_name(seed).encode()[:NAME_SIZE]
+            pack_file.write(RECORD_HEADER.pack(seed, name))
+            pack_file.write(''.join(generate_level(seed, colors, blank)).encode())
+
+# Define classes.
+class LevelPack:
+    '''A class to read levels from a packed level file. The file is memory mapped when it is opened, so reading any level afterwards
+    is a slice of memory rather than a file read.'''
+    def __init__(self, path):
+        '''Open the packed level file and check its header'''
+        self.path = path
+        with open(path, 'rb') as pack_file:
+            self.data = mmap.mmap(pack_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.columns, self.rows, self.count, self.first_seed = PACK_HEADER.unpack_from(self.data)
+        if magic != PACK_MAGIC or version != PACK_VERSION:
+            raise ValueError(f'{path}: not a version {PACK_VERSION} level pack')
+
+        # Every record has the same size, so a level's record is found from its index alone.
+        self.record_size = RECORD_HEADER.size + self.columns * self.rows
+        if len(self.data) < PACK_HEADER.size + self.count * self.record_size:
+            raise ValueError(f'{path}: the level pack is truncated')
+
+    def __len__(self):
+        '''Return the number of levels in the pack'''
+        return self.count
+
+    def __getitem__(self, index):
+        '''Return the seed, name, and level file characters (the rows joined together, as bytes) of a level'''
+        if not 0 <= index < self.count:
+            raise IndexError(f'level {index} is not in the pack')
+        offset = PACK_HEADER.size + index * self.record_size
+        seed, name = RECORD_HEADER.unpack_from(self.data, offset)
+        offset += RECORD_HEADER.size
+        return seed, name.rstrip(b'\0').decode(), self.data[offset:offset + self.columns * self.rows]
+
+    def find(self, seed):
+        '''Return the index of the level generated from a seed, or None if it is not in the pack'''
+        index = seed - self.first_seed
+        return index if 0 <= index < self.count else None
+
+    def close(self):
+        '''Close the packed level file'''
+        self.data.close()
+
+if __name__ == '__main__':
+    # Import the argparse, json, os, and time libraries to read the command line options and the manifest, and time the batch.
+    import argparse
+    import json
+    import os
+    import time
+
+    parser = argparse.ArgumentParser(description='Generate Brick Breaker levels.')
+    parser.add_argument('--manifest', default='levels/manifest.json', help='level manifest whose endless levels to generate')
+    parser.add_argument('--count', type=int, default=5000, help='number of levels to pack')
+    parser.add_argument('--seed', type=int, default=None, help='first generator seed (default: the manifest\'s endless seed)')
+    parser.add_argument('--output', default=None, help='packed level file to write (default: the manifest\'s endless pack)')
+    parser.add_argument('--show', type=int, default=None, metavar='SEED', help='print the level of one seed in the level file format instead')
+    args = parser.parse_args()
+
+    if args.show is not None:
+        print('\n'.join(generate_level(args.show)))
+    else:
+        # Pack the endless levels the manifest asks for, unless another seed or file is given.
+        with open(args.manifest) as manifest_file:
+            endless = json.load(manifest_file).get('endless', {})
+        seed = args.seed if args.seed is not None else endless['seed']
+        output = args.output or os.path.join(os.path.dirname(args.manifest), endless['pack'])
+
+        start_time = time.perf_counter()
+        write_pack(output, seed, args.count)
+        print(f'Packed {args.count} levels from seed {seed} into {output} in {time.perf_counter() - start_time:.2f} s')
@@ -0,0 +1,739 @@
+'''
+Brick Breaker - Network Play
+'''
+
+# Import the asyncio library to serve and watch games over sockets.
+import asyncio
+
+# Import the struct, array, operator, and zlib libraries to pack the game state messages.
+import struct
+from array import array
+import operator
+import zlib
+
+# Import the time library to measure the server's tick time.
+import time
+
+# Import the pygame libary.
+import pygame
+
+# Import the headless simulation core.
+from simulation import (TICKS_PER_SECOND, WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, BLACK, RED, PINK, BRICK_TYPES, POWERUP_TYPES, MISSILE_POOL,
+                        Simulation, Paddle, create_simulation, tracking_policy)
+
+# Import the fixed timestep, which paces the server's ticks.
+from timestep import FixedTimestep
+
+# Set the address the server listens on, and the number of ticks sent in each batch of deltas (4 ticks is 30 batches a second).
+HOST = '127.0.0.1'
+PORT = 5555
+BATCH_TICKS = 4
+
+# Set the number of bytes that may wait to be sent to a client. A client further behind than this is skipped, and is sent a keyframe
+# once it has caught up, so a slow client never holds up the game or the other clients.
+MAX_BUFFER = 256 * 1024
+
+# Set the roles a client asks for with the first byte it sends. Each byte a player sends afterwards holds its input flags.
+SPECTATOR = b'S'
+PLAYER = b'P'
+LEFT = 1
+RIGHT = 2
+
+# Set the message layout. Each message is its kind and the length of its payload, followed by the payload. A keyframe holds the tick,
+# the level's name, size, and brick positions, its compressed brick grid, and a record of every field; a delta batch holds the first
+# tick and the records of consecutive ticks.
+KEYFRAME = b'K'
+DELTAS = b'D'
+MESSAGE = struct.Struct('<cI')
+KEYFRAME_HEADER = struct.Struct('<IHHHH')
+DELTAS_HEADER = struct.Struct('<IB')
+LENGTH = struct.Struct('<I')
+MASK = struct.Struct('<H')
+COUNT = struct.Struct('<H')
+
+# Set the fields of the game state streamed to clients, each a flat tuple of integers. The state fields are sent when they change; the
+# event fields list what happened on a tick (broken brick IDs, damaged brick IDs and their new codes, and the power-up types collected)
+# and are sent on the ticks they happen. A brick's ID is its cell index, row by row.
+STATE_FIELDS = ['status', 'paddles', 'balls', 'powerups', 'missiles', 'monkeys', 'effects']
+EVENT_FIELDS = ['broken', 'damaged', 'collected']
+FIELDS = STATE_FIELDS + EVENT_FIELDS
+NO_EVENTS = ((),) * len(EVENT_FIELDS)
+EMPTY_VIEW = ((),) * len(FIELDS)
+
+# Set how a changed field is encoded: as one signed byte per value added to its previous values, when it has as many values as before
+# and none moved by more than a byte holds, or as a count and the values themselves.
+DELTA = 0
+VALUES = 1
+
+# Set the power-up type names in the order their indices are sent.
+POWERUP_NAMES = list(POWERUP_TYPES)
+
+# Set the sizes clients draw the moving objects at, matching the sprites of the simulation.
+BALL_DIAMETER = 25
+PADDLE_HEIGHT = 15
+POWERUP_SIZE = 20
+MISSILE_SIZE = (6, 16)
+MONKEY_SIZE = 36
+
+def encode_field(data, values, previous):
+    '''Append a changed field, as deltas from its previous values if they fit in a byte, or else as its values'''
+    if len(values) == len(previous):
+        try:
+            deltas = array('b', map(operator.sub, values, previous))
+        except OverflowError:
+            pass
+        else:
+            data.append(DELTA)
+            data += deltas.tobytes()
+            return
+    data.append(VALUES)
+    data += COUNT.pack(len(values))
+    data += array('i', values).tobytes()
+
+def encode_record(view, previous):
+    '''Return the record of a tick: a mask of the fields that differ from the previous view, and each of those fields'''
+    data = bytearray(MASK.size)
+    mask = 0
+    for index, (values, previous_values) in enumerate(zip(view, previous)):
+        if values != previous_values:
+            mask |= 1 << index
+            encode_field(data, values, previous_values)
+    MASK.pack_into(data, 0, mask)
+    return data
+
+def decode_record(data, offset, previous):
+    '''Read a tick's record, returning the view it describes and the offset just past it. The event fields of the previous view are
+    ignored, since events only last the tick they happen on.'''
+    mask, = MASK.unpack_from(data, offset)
+    offset += MASK.size
+    view = list(previous[:len(STATE_FIELDS)] + NO_EVENTS)
+    for index in range(len(FIELDS)):
+        if not mask >> index & 1:
+            continue
+        mode = data[offset]
+        offset += 1
+        if mode == DELTA:
+            count = len(view[index])
+            view[index] = tuple(map(operator.add, view[index], array('b', data[offset:offset + count])))
+        else:
+            count, = COUNT.unpack_from(data, offset)
+            offset += COUNT.size
+            values = array('i')
+            values.frombytes(data[offset:offset + count * values.itemsize])
+            view[index] = tuple(values)
+            count *= values.itemsize
+        offset += count
+    return tuple(view), offset
+
+def encode_keyframe(simulation, view):
+    '''Return a keyframe of the game: the level and its bricks, and every field of the view'''
+    brick_group = simulation.brick_group
+    data = bytearray(KEYFRAME_HEADER.pack(simulation.frame_counter, brick_group.columns, brick_group.rows, brick_group.rect_width,
+                                          brick_group.rect_height))
+    pack_bytes(data, simulation.level.name.encode())
+    pack_bytes(data, array('H', brick_group.xs).tobytes())
+    pack_bytes(data, array('H', brick_group.ys).tobytes())
+    pack_bytes(data, zlib.compress(brick_group.grid()))
+    data += encode_record(view, EMPTY_VIEW)
+    return data
+
+def pack_message(kind, payload):
+    '''Return a message of a kind with its payload'''
+    return MESSAGE.pack(kind, len(payload)) + payload
+
+def pack_bytes(data, value):
+    '''Append a length and the bytes it counts'''
+    data += LENGTH.pack(len(value))
+    data += value
+
+def unpack_bytes(data, offset):
+    '''Read bytes stored by pack_bytes, returning them and the offset just past them'''
+    length, = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    return data[offset:offset + length], offset + length
+
+def partner_policy(simulation):
+    '''Follow the lowest ball on the partner paddle's side of the screen with the partner paddle. Returns the (left, right) inputs.'''
+    balls = [ball for ball in simulation.ball_group if ball.rect.centerx >= WINDOW_WIDTH // 2]
+    if not balls:
+        return False, False
+    target = max(balls, key=lambda ball: ball.rect.bottom)
+    offset = target.rect.centerx - simulation.partner.rect.centerx
+    return offset < -simulation.partner.velocity, offset > simulation.partner.velocity
+
+# Define classes.
+class PartnerPaddle(Paddle):
+    '''A paddle for a second player, moved by its own input rather than the player's, which starts on the right of the screen'''
+    def __init__(self):
+        '''Initialize the paddle'''
+        super().__init__()
+
+        # Define the left and right inputs held for the next tick.
+        self.input = (False, False)
+        self.reset()
+
+    def update(self, left=False, right=False):
+        '''Move the paddle by the partner's input, ignoring the player's'''
+        super().update(*self.input)
+
+    def reset(self):
+        '''Return the paddle to its place on the right of the screen'''
+        self.rect.centerx = WINDOW_WIDTH * 3 // 4
+        self.rect.bottom = WINDOW_HEIGHT - self.lower_buffer
+
+class CoopSimulation(Simulation):
+    '''A headless simulation with a partner paddle beside the player's, which either can strike the balls with and collect power-ups
+    with, and which records what happens on each tick for the clients of a Server. The partner's input is set on simulation.partner
+    before each step.'''
+    def __init__(self, player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed=None):
+        '''Initialize the simulation and add the partner paddle'''
+        super().__init__(player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed)
+        self.partner = PartnerPaddle()
+        self.paddle_group.add(self.partner)
+
+        # Define the events of the current tick, and whether a level has started since the flag was last cleared.
+        self.broken = []
+        self.damaged = []
+        self.collected = []
+        self.level_started = False
+
+    def step(self, left=False, right=False):
+        '''Forget the last tick's events and advance the simulation by one tick'''
+        self.broken.clear()
+        self.damaged.clear()
+        self.collected.clear()
+        super().step(left, right)
+
+    def check_paddle_collisions(self):
+        '''Check for collisions between the balls and either paddle, bouncing each ball off the paddle it struck'''
+        collisions = pygame.sprite.groupcollide(self.ball_group, self.paddle_group, False, False)
+        if collisions:
+            self.on_paddle_hit()
+            for ball, paddles in collisions.items():
+                alpha = ball.rect.centerx - paddles[0].rect.centerx
+                beta = paddles[0].width / 2
+                ball.dx = alpha / beta
+                ball.dy = - (2 - (ball.dx) ** 2) ** 0.5
+
+    def check_powerup_collisions(self):
+        '''Check for collisions between either paddle and a powerup'''
+        for powerup in self.powerup_group:
+            if pygame.sprite.spritecollideany(powerup, self.paddle_group):
+                ptype = powerup.ptype
+                powerup.kill()
+                self.collect_powerup(ptype)
+
+    def collect_powerup(self, ptype):
+        '''Record and start the effect of a collected powerup'''
+        self.collected.append(POWERUP_NAMES.index(ptype))
+        super().collect_powerup(ptype)
+
+    def grow_paddle(self):
+        '''Widen both paddles'''
+        super().grow_paddle()
+        self.partner.resize(self.paddle_width())
+
+    def shrink_paddle(self):
+        '''Take back one boost from both paddles'''
+        super().shrink_paddle()
+        self.partner.resize(self.paddle_width())
+
+    def launch_missiles(self):
+        '''Launch missiles from both paddles'''
+        super().launch_missiles()
+        for x in (self.partner.rect.left + 10, self.partner.rect.right - 10):
+            self.missile_group.add(MISSILE_POOL.acquire(x, self.partner.rect.top))
+
+    def get_state(self, bricks=True):
+        '''Return a copy of the game state as plain data, including the partner paddle'''
+        state = super().get_state(bricks)
+        state['partner'] = self.partner.rect.topleft
+        return state
+
+    def set_state(self, state):
+        '''Restore a game state returned by get_state'''
+        super().set_state(state)
+        self.partner.resize(self.paddle_width())
+        if 'partner' in state:
+            self.partner.rect.topleft = state['partner']
+        else:
+            self.partner.reset()
+
+    def get_view(self):
+        '''Return the fields of the game state streamed to clients, in the order of FIELDS'''
+        return (
+            (self.level_number, self.level_timer, self.player.lives, self.player.score),
+            tuple(value for paddle in self.paddle_group for value in (paddle.rect.x, paddle.rect.y, paddle.width)),
+            tuple(value for ball in self.ball_group for value in ball.rect.topleft),
+            tuple(value for powerup in self.powerup_group for value in (powerup.rect.x, powerup.rect.y, POWERUP_NAMES.index(powerup.ptype))),
+            tuple(value for missile in self.missile_group for value in missile.rect.topleft),
+            tuple(value for monkey in self.monkey_group for value in monkey.rect.topleft),
+            tuple(POWERUP_NAMES.index(name) for expires, order, name in sorted(self.effects.heap)),
+            tuple(self.broken),
+            tuple(value for pair in self.damaged for value in pair),
+            tuple(self.collected),
+        )
+
+    # Define the event hooks, which record the events clients are sent and put the partner paddle back when the player's is reset.
+    def on_brick_hit(self, brick):
+        '''Record the ID of a broken brick'''
+        self.broken.append(brick.row * self.brick_group.columns + brick.column)
+
+    def on_brick_damaged(self, brick):
+        '''Record the ID and new code of a damaged brick'''
+        self.damaged.append((brick.row * self.brick_group.columns + brick.column, brick.code))
+
+    def on_life_lost(self):
+        '''Reset the partner paddle'''
+        self.partner.reset()
+
+    def on_level_complete(self):
+        '''Reset the partner paddle'''
+        self.partner.reset()
+
+    def on_level_start(self):
+        '''Flag the new level, whose bricks clients are sent in a keyframe'''
+        self.level_started = True
+
+class Connection:
+    '''A class to hold a client connected to a Server'''
+    def __init__(self, writer, slot=None):
+        '''Initialize the connection'''
+        self.writer = writer
+
+        # Define the paddle the client controls (0 for the player's, 1 for the partner's), or None for a spectator.
+        self.slot = slot
+
+        # Define whether the client has the game state that the next batch of deltas applies to.
+        self.synced = False
+
+    def writable(self):
+        '''Return whether the client is open and has caught up enough to be sent more'''
+        return not self.writer.is_closing() and self.writer.transport.get_write_buffer_size() <= MAX_BUFFER
+
+class Server:
+    '''A class to run a co-op game at the fixed tick rate and stream it to any number of spectators and up to two players.
+
+    Each tick is encoded once, as the changes since the last tick, and the ticks are batched, so every client is sent the same bytes
+    with one write per batch and the cost of a tick does not depend on the number of clients. A client that joins, or falls behind,
+    is sent a keyframe at the end of the next batch. Players take the paddles in order as they join; a paddle without a player is
+    moved by a policy, so the game keeps playing for spectators.'''
+    def __init__(self, simulation, batch_ticks=BATCH_TICKS, policy=tracking_policy):
+        '''Initialize the server. The simulation must be a CoopSimulation.'''
+        self.simulation = simulation
+        self.batch_ticks = batch_ticks
+        self.policy = policy
+        self.timestep = FixedTimestep()
+
+        # Define the connected clients and the tasks serving them, the client controlling each paddle, and each player's latest input.
+        self.clients = []
+        self.tasks = set()
+        self.players = [None, None]
+        self.inputs = [(False, False), (False, False)]
+
+        # Define the view the next tick is encoded against, and the batch of tick records waiting to be sent.
+        self.previous = simulation.get_view()[:len(STATE_FIELDS)] + NO_EVENTS
+        self.batch = bytearray()
+        self.batch_count = 0
+        self.first_tick = simulation.frame_counter + 1
+        simulation.level_started = False
+
+        # Define the statistics: the ticks run, the time spent stepping and encoding them and sending batches, and the bytes encoded
+        # once and sent to all clients.
+        self.ticks = 0
+        self.tick_time = 0.0
+        self.send_time = 0.0
+        self.encoded_bytes = 0
+        self.sent_bytes = 0
+        self.keyframes = 0
+        self.server = None
+
+    async def start(self, host=HOST, port=PORT):
+        '''Start listening for clients'''
+        self.server = await asyncio.start_server(self.serve_client, host, port)
+        return self.server
+
+    async def serve_client(self, reader, writer):
+        '''Serve a client from the role it asks for until it disconnects, applying a player's inputs to its paddle'''
+        task = asyncio.current_task()
+        self.tasks.add(task)
+        try:
+            role = await reader.readexactly(1)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            self.tasks.discard(task)
+            writer.close()
+            return
+
+        # A player takes the first free paddle, or watches if both are taken.
+        client = Connection(writer)
+        if role == PLAYER and None in self.players:
+            client.slot = self.players.index(None)
+            self.players[client.slot] = client
+        self.clients.append(client)
+
+        try:
+            while True:
+                data = await reader.read(256)
+                if not data:
+                    break
+                if client.slot is not None:
+                    flags = data[-1]
+                    self.inputs[client.slot] = (bool(flags & LEFT), bool(flags & RIGHT))
+        except ConnectionError:
+            pass
+        finally:
+            self.tasks.discard(task)
+            self.clients.remove(client)
+            if client.slot is not None:
+                self.players[client.slot] = None
+                self.inputs[client.slot] = (False, False)
+            writer.close()
+
+    def tick(self):
+        '''Step the game one tick and add its record to the batch, sending the batch when it is full or a level starts'''
+        start_time = time.perf_counter()
+        simulation = self.simulation
+        left, right = self.inputs[0] if self.players[0] else self.policy(simulation)
+        simulation.partner.input = self.inputs[1] if self.players[1] else partner_policy(simulation)
+        simulation.step(left, right)
+
+        # Encode the tick against the last one.
+        view = simulation.get_view()
+        self.batch += encode_record(view, self.previous)
+        self.previous = view[:len(STATE_FIELDS)] + NO_EVENTS
+        self.batch_count += 1
+        self.ticks += 1
+        self.tick_time += time.perf_counter() - start_time
+
+        # A new level's bricks are sent to every client in a keyframe.
+        if simulation.level_started:
+            simulation.level_started = False
+            self.flush(resync=True)
+        elif self.batch_count >= self.batch_ticks:
+            self.flush()
+
+    def flush(self, resync=False):
+        '''Send the batch of deltas to the clients that are in sync, then a keyframe to the clients that are not'''
+        start_time = time.perf_counter()
+        if self.batch_count:
+            message = pack_message(DELTAS, DELTAS_HEADER.pack(self.first_tick, self.batch_count) + self.batch)
+            self.encoded_bytes += len(message)
+            for client in self.clients:
+                if client.synced:
+                    self.send(client, message)
+            self.batch = bytearray()
+            self.batch_count = 0
+            self.first_tick = self.simulation.frame_counter + 1
+
+        # Encode the keyframe once, for every client that needs one and can take it.
+        if resync:
+            for client in self.clients:
+                client.synced = False
+        keyframe = None
+        for client in self.clients:
+            if not client.synced and client.writable():
+                if keyframe is None:
+                    keyframe = pack_message(KEYFRAME, encode_keyframe(self.simulation, self.previous))
+                    self.encoded_bytes += len(keyframe)
+                    self.keyframes += 1
+                client.synced = True
+                self.send(client, keyframe)
+        self.send_time += time.perf_counter() - start_time
+
+    def send(self, client, message):
+        '''Write a message to a client, or drop the client out of sync if it has fallen too far behind'''
+        if client.writable():
+            client.writer.write(message)
+            self.sent_bytes += len(message)
+        else:
+            client.synced = False
+
+    async def run(self, ticks=None, realtime=True):
+        '''Run the game for a number of ticks, or until cancelled. In real time the ticks are paced by the fixed timestep; otherwise they
+        are run as fast as possible, yielding to the clients after each batch.'''
+        self.timestep.reset()
+        while ticks is None or self.ticks < ticks:
+            if realtime:
+                await asyncio.sleep(self.timestep.tick_time)
+                count = self.timestep.advance()
+            else:
+                await asyncio.sleep(0)
+                count = self.batch_ticks
+            if ticks is not None:
+                count = min(count, ticks - self.ticks)
+            for tick in range(count):
+                self.tick()
+        self.flush()
+
+    def stats(self):
+        '''Return the server's statistics per tick'''
+        ticks = max(self.ticks, 1)
+        return {
+            'clients': len(self.clients),
+            'ticks': self.ticks,
+            'tick_ms': self.tick_time / ticks * 1000,
+            'send_ms': self.send_time / ticks * 1000,
+            'encoded_bytes_per_tick': self.encoded_bytes / ticks,
+            'sent_bytes_per_tick': self.sent_bytes / ticks,
+            'keyframes': self.keyframes,
+        }
+
+    async def close(self):
+        '''Stop listening, disconnect every client, and wait for the tasks serving them to finish'''
+        self.server.close()
+        for client in list(self.clients):
+            client.writer.close()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await self.server.wait_closed()
+
+class GameView:
+    '''A class to hold a client's copy of the game, kept up to date from the server's messages. The fields of FIELDS are attributes
+    holding flat tuples of integers; the event fields hold the events of the last tick applied.'''
+    def __init__(self):
+        '''Initialize the view'''
+        self.tick = 0
+        self.name = ''
+        self.columns = 0
+        self.rows = 0
+        self.xs = []
+        self.ys = []
+        self.brick_size = (0, 0)
+        self.grid = bytearray()
+        self.view = EMPTY_VIEW
+        self.keyframes = 0
+
+        # Define the number of bricks broken and power-ups collected since the view was created.
+        self.broken_count = 0
+        self.collected_count = 0
+
+    def __getattr__(self, name):
+        '''Return a field of the view by name'''
+        if name in FIELDS:
+            return self.view[FIELDS.index(name)]
+        raise AttributeError(name)
+
+    def apply(self, kind, payload):
+        '''Apply a message from the server'''
+        if kind == KEYFRAME:
+            self.apply_keyframe(payload)
+        elif kind == DELTAS:
+            self.apply_deltas(payload)
+
+    def apply_keyframe(self, payload):
+        '''Replace the view with a keyframe'''
+        self.tick, self.columns, self.rows, brick_width, brick_height = KEYFRAME_HEADER.unpack_from(payload)
+        self.brick_size = (brick_width, brick_height)
+        offset = KEYFRAME_HEADER.size
+        name, offset = unpack_bytes(payload, offset)
+        xs, offset = unpack_bytes(payload, offset)
+        ys, offset = unpack_bytes(payload, offset)
+        grid, offset = unpack_bytes(payload, offset)
+        self.name = name.decode()
+        self.xs = array('H', xs).tolist()
+        self.ys = array('H', ys).tolist()
+        self.grid = bytearray(zlib.decompress(grid))
+        self.view, offset = decode_record(payload, offset, EMPTY_VIEW)
+        self.keyframes += 1
+
+    def apply_deltas(self, payload):
+        '''Apply the records of a batch of ticks, breaking and damaging bricks as they happen'''
+        first_tick, count = DELTAS_HEADER.unpack_from(payload)
+        offset = DELTAS_HEADER.size
+        for index in range(count):
+            self.view, offset = decode_record(payload, offset, self.view)
+            for brick_id in self.broken:
+                self.grid[brick_id] = 0
+            damaged = self.damaged
+            for i in range(0, len(damaged), 2):
+                self.grid[damaged[i]] = damaged[i + 1]
+            self.broken_count += len(self.broken)
+            self.collected_count += len(self.collected)
+        self.tick = first_tick + count - 1
+
+    def bricks_left(self):
+        '''Return the number of standing bricks'''
+        return len(self.grid) - self.grid.count(0)
+
+    def draw(self, surface, font):
+        '''Draw the view on a surface'''
+        surface.fill(BLACK)
+        level_number, level_timer, lives, score = self.status or (0, 0, 0, 0)
+        status = f'Score: {score}   Lives: {lives}   Level: {level_number} ({self.name})   Time: {level_timer}'
+        surface.blit(font.render(status, True, WHITE), (15, 5))
+
+        # Draw the bricks in the colors of their codes.
+        width, height = self.brick_size
+        for index, code in enumerate(self.grid):
+            if code:
+                row, column = divmod(index, self.columns)
+                surface.fill(BRICK_TYPES[code][1], (self.xs[column], self.ys[row], width, height))
+
+        # Draw the moving objects.
+        paddles = self.paddles
+        for i in range(0, len(paddles), 3):
+            surface.fill(WHITE, (paddles[i], paddles[i + 1], paddles[i + 2], PADDLE_HEIGHT))
+        balls = self.balls
+        for i in range(0, len(balls), 2):
+            pygame.draw.circle(surface, WHITE, (balls[i] + BALL_DIAMETER // 2, balls[i + 1] + BALL_DIAMETER // 2), BALL_DIAMETER // 2)
+        powerups = self.powerups
+        for i in range(0, len(powerups), 3):
+            surface.fill(POWERUP_TYPES[POWERUP_NAMES[powerups[i + 2]]][2], (powerups[i], powerups[i + 1], POWERUP_SIZE, POWERUP_SIZE))
+        missiles = self.missiles
+        for i in range(0, len(missiles), 2):
+            surface.fill(RED, (missiles[i], missiles[i + 1], *MISSILE_SIZE))
+        monkeys = self.monkeys
+        for i in range(0, len(monkeys), 2):
+            pygame.draw.circle(surface, PINK, (monkeys[i] + MONKEY_SIZE // 2, monkeys[i + 1] + MONKEY_SIZE // 2), MONKEY_SIZE // 2)
+
+class RemoteGame:
+    '''A class to connect to a Server as a spectator or a player and keep a GameView of its game'''
+    def __init__(self):
+        '''Initialize the connection'''
+        self.view = GameView()
+        self.reader = None
+        self.writer = None
+        self.input = None
+        self.received_bytes = 0
+
+    async def connect(self, host=HOST, port=PORT, role=SPECTATOR):
+        '''Connect to a server in a role'''
+        self.reader, self.writer = await asyncio.open_connection(host, port)
+        self.writer.write(role)
+
+    async def receive(self):
+        '''Wait for the next message and apply it to the view. Raises asyncio.IncompleteReadError when the server disconnects.'''
+        kind, length = MESSAGE.unpack(await self.reader.readexactly(MESSAGE.size))
+        payload = await self.reader.readexactly(length)
+        self.received_bytes += MESSAGE.size + length
+        self.view.apply(kind, payload)
+        return kind
+
+    async def receive_forever(self):
+        '''Apply messages until the server disconnects'''
+        try:
+            while True:
+                await self.receive()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+
+    def send_input(self, left, right):
+        '''Send a player's input, if it has changed'''
+        flags = LEFT * bool(left) | RIGHT * bool(right)
+        if flags != self.input:
+            self.input = flags
+            self.writer.write(bytes([flags]))
+
+    async def close(self):
+        '''Disconnect from the server'''
+        self.writer.close()
+        try:
+            await self.writer.wait_closed()
+        except ConnectionError:
+            pass
+
+async def serve(host=HOST, port=PORT, seed=None, ticks=None):
+    '''Run a co-op game server, printing its statistics every ten seconds'''
+    server = Server(create_simulation(CoopSimulation, seed))
+    await server.start(host, port)
+    print(f'Serving on {host}:{port}')
+    game = asyncio.create_task(server.run(ticks))
+    try:
+        while not game.done():
+            await asyncio.wait([game], timeout=10)
+            simulation = server.simulation
+            print(f'Level: {simulation.level_number}  Score: {simulation.player.score}  Lives: {simulation.player.lives}  {server.stats()}')
+    finally:
+        game.cancel()
+        await server.close()
+
+async def watch(host=HOST, port=PORT, role=SPECTATOR, window=False):
+    '''Watch a server's game, printing its status every second or drawing it in a window. As a player in a window, the Left and Right
+    keys move the paddle.'''
+    remote = RemoteGame()
+    await remote.connect(host, port, role)
+    receiver = asyncio.create_task(remote.receive_forever())
+    view = remote.view
+    if not window:
+        while not receiver.done():
+            await asyncio.wait([receiver], timeout=1)
+            level_number, level_timer, lives, score = view.status or (0, 0, 0, 0)
+            print(f'Tick: {view.tick}  Level: {level_number}  Score: {score}  Lives: {lives}  Balls: {len(view.balls) // 2}  '
+                  f'Bricks left: {view.bricks_left()}  Received: {remote.received_bytes} bytes')
+        return
+
+    pygame.init()
+    display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption('Brick Breaker - Network Play')
+    font = pygame.font.Font('assets/Mechanical-g5Y5.otf', 32)
+    running = True
+    while running and not receiver.done():
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+        if role == PLAYER:
+            keys = pygame.key.get_pressed()
+            remote.send_input(keys[pygame.K_LEFT], keys[pygame.K_RIGHT])
+        view.draw(display_surface, font)
+        pygame.display.update()
+        await asyncio.sleep(1 / 60)
+    receiver.cancel()
+    await remote.close()
+    pygame.quit()
+
+async def benchmark(spectators, ticks, seed=1, port=0):
+    '''Serve a game to a number of spectators over localhost as fast as possible, check that every spectator's view matches the game,
+    and return the server's statistics'''
+    server = Server(create_simulation(CoopSimulation, seed))
+    listener = await server.start(HOST, port)
+    port = listener.sockets[0].getsockname()[1]
+    remotes = [RemoteGame() for i in range(spectators)]
+    for remote in remotes:
+        await remote.connect(HOST, port)
+    receivers = [asyncio.create_task(remote.receive_forever()) for remote in remotes]
+
+    # Wait for every spectator to join, then run the game and let the spectators take the last batch.
+    while len(server.clients) < spectators:
+        await asyncio.sleep(0.01)
+    await server.run(ticks, realtime=False)
+    while any(remote.view.tick != server.simulation.frame_counter for remote in remotes):
+        await asyncio.sleep(0.01)
+
+    simulation = server.simulation
+    grid = simulation.brick_group.grid()
+    matches = all(remote.view.view[:len(STATE_FIELDS)] == server.previous[:len(STATE_FIELDS)] and remote.view.grid == grid for remote in remotes)
+    stats = server.stats()
+    stats['matches'] = matches
+    await server.close()
+    await asyncio.gather(*receivers)
+    return stats
+
+if __name__ == '__main__':
+    # Import the argparse library to read the command line options.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve, watch, or play a Brick Breaker game over the network.')
+    parser.add_argument('mode', choices=['serve', 'watch', 'play', 'bench'], help='serve: run a game server; watch: print or show a '
+                        'server\'s game; play: control a paddle in a window; bench: serve spectators over localhost and check their views')
+    parser.add_argument('--host', default=HOST, help='address to serve on or connect to')
+    parser.add_argument('--port', type=int, default=PORT, help='port to serve on or connect to')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the game\'s random number generator')
+    parser.add_argument('--window', action='store_true', help='watch in a window rather than printing the status')
+    parser.add_argument('--spectators', type=int, nargs='+', default=[1, 10, 100], help='numbers of spectators to benchmark')
+    parser.add_argument('--ticks', type=int, default=None, help='number of ticks to serve (default: forever; 3600 when benchmarking)')
+    args = parser.parse_args()
+
+    if args.mode == 'bench':
+        for spectators in args.spectators:
+            stats = asyncio.run(benchmark(spectators, args.ticks or TICKS_PER_SECOND * 30, 1 if args.seed is None else args.seed))
+            print(f'{spectators:>5} spectators: tick {stats["tick_ms"]:.3f} ms, send {stats["send_ms"]:.3f} ms, '
+                  f'{stats["encoded_bytes_per_tick"]:.1f} bytes encoded and {stats["sent_bytes_per_tick"]:.0f} bytes sent per tick, '
+                  f'{stats["keyframes"]} keyframes, views match: {stats["matches"]}')
+    else:
+        # Serve or watch until interrupted.
+        try:
+            if args.mode == 'serve':
+                asyncio.run(serve(args.host, args.port, args.seed, args.ticks))
+            else:
+                asyncio.run(watch(args.host, args.port, PLAYER if args.mode == 'play' else SPECTATOR, args.window or args.mode == 'play'))
+        except KeyboardInterrupt:
+            pass
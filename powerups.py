@@ -0,0 +1,83 @@
+'''
+Brick Breaker - Power-Up Drop Tables and Effect Timers
+'''
+
+# Import the heapq library for the effect expiry heap.
+import heapq
+
+# Define classes.
+class AliasTable:
+    '''A class to draw weighted outcomes in constant time with Vose's alias method'''
+    def __init__(self, weights):
+        '''Build the table from a dictionary mapping each outcome to its weight'''
+        self.outcomes = list(weights)
+        self.size = len(self.outcomes)
+        total = sum(weights.values())
+
+        # Scale the weights so that they average 1, then split them into columns under and over 1.
+        scaled = [weights[outcome] * self.size / total for outcome in self.outcomes]
+        self.probability = [1.0] * self.size
+        self.alias = list(range(self.size))
+        small = [i for i, weight in enumerate(scaled) if weight < 1]
+        large = [i for i, weight in enumerate(scaled) if weight >= 1]
+
+        # Fill each column that is under 1 with the remainder of a column that is over.
+        while small and large:
+            less = small.pop()
+            more = large.pop()
+            self.probability[less] = scaled[less]
+            self.alias[less] = more
+            scaled[more] -= 1 - scaled[less]
+            if scaled[more] < 1:
+                small.append(more)
+            else:
+                large.append(more)
+
+    def sample(self, random_generator):
+        '''Draw an outcome using a single random number: its whole part picks the column and its fraction picks within it'''
+        position = random_generator.random() * self.size
+        column = int(position)
+        if position - column < self.probability[column]:
+            return self.outcomes[column]
+        return self.outcomes[self.alias[column]]
+
+class EffectTimers:
+    '''A class to hold timed effects in one heap ordered by the tick they expire on, so checking for expired effects does not
+    depend on how many are active'''
+    def __init__(self):
+        '''Initialize the timers'''
+        # Define the heap of (expiry tick, start order, effect name) entries. The start order keeps equal expiry ticks in order.
+        self.heap = []
+        self.started = 0
+
+    def __len__(self):
+        '''Return the number of active effects'''
+        return len(self.heap)
+
+    def start(self, name, expires):
+        '''Start an effect that ends on the given tick'''
+        heapq.heappush(self.heap, (expires, self.started, name))
+        self.started += 1
+
+    def expired(self, tick):
+        '''Remove and return the names of the effects that end on or before a tick, in the order they end'''
+        names = []
+        while self.heap and self.heap[0][0] <= tick:
+            names.append(heapq.heappop(self.heap)[2])
+        return names
+
+    def clear(self):
+        '''Remove and return the names of every active effect, in the order they would have ended'''
+        names = [entry[2] for entry in sorted(self.heap)]
+        self.heap = []
+        return names
+
+    def get_state(self):
+        '''Return the timers as plain data'''
+        return (sorted(self.heap), self.started)
+
+    def set_state(self, state):
+        '''Restore timers returned by get_state'''
+        heap, self.started = state
+        self.heap = [tuple(entry) for entry in heap]
+        heapq.heapify(self.heap)
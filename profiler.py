@@ -0,0 +1,251 @@
+'''
+Brick Breaker - Frame Profiler
+'''
+
+# Import the time library for the monotonic performance counter.
+import time
+
+# Import the csv and json libraries to export traces.
+import csv
+import json
+
+# Import the deque class for the rolling window of frames.
+from collections import deque
+
+# Import the pygame libary.
+import pygame
+
+# Import the colors used by the game.
+from simulation import WHITE, BLACK, GREEN, RED, TICKS_PER_SECOND, create_simulation, tracking_policy
+
+# Set the simulation methods and sprite group updates timed by FrameProfiler.instrument, in the order they run in a frame.
+SIMULATION_PHASES = ('move_balls', 'update_effects', 'check_collisions', 'check_fallen_ball', 'check_level_completion', 'check_fallen_powerup')
+GROUP_PHASES = (('paddle_group', 'paddle_update'), ('brick_group', 'brick_update'), ('powerup_group', 'powerup_update'), ('missile_group', 'missile_update'), ('monkey_group', 'monkey_update'))
+
+# Define classes.
+class FrameProfiler:
+    '''A class to time each phase of every frame and keep rolling percentiles of the results'''
+    def __init__(self, window=TICKS_PER_SECOND * 5, trace=False):
+        '''Initialize the profiler'''
+        # Define the number of recent frames the percentiles are computed over.
+        self.window = window
+
+        # Define the phase names in the order they were first timed, and each phase's recent durations in seconds.
+        self.phases = []
+        self.recent = {}
+        self.recent_frames = deque(maxlen=window)
+
+        # Define the full per-frame trace, kept only if requested since it grows with every frame.
+        self.trace = [] if trace else None
+
+        # Define the durations of the current frame.
+        self.frame_start = None
+        self.current = {}
+
+    def begin_frame(self):
+        '''Start timing a frame'''
+        self.frame_start = time.perf_counter()
+        self.current = {}
+
+    def add(self, phase, seconds):
+        '''Add time to a phase of the current frame'''
+        if phase not in self.recent:
+            self.phases.append(phase)
+            self.recent[phase] = deque(maxlen=self.window)
+        self.current[phase] = self.current.get(phase, 0.0) + seconds
+
+    def timed(self, phase, function):
+        '''Return a wrapper around a function that adds its running time to a phase'''
+        perf_counter = time.perf_counter
+        add = self.add
+
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                add(phase, perf_counter() - start)
+        return wrapper
+
+    def instrument(self, simulation):
+        '''Time the phases of a simulation's tick by wrapping its methods'''
+        for phase in SIMULATION_PHASES:
+            setattr(simulation, phase, self.timed(phase, getattr(simulation, phase)))
+        for group_name, phase in GROUP_PHASES:
+            group = getattr(simulation, group_name)
+            group.update = self.timed(phase, group.update)
+
+    def end_frame(self):
+        '''Finish timing a frame and add it to the rolling window and trace'''
+        frame_time = time.perf_counter() - self.frame_start
+        if self.trace is not None:
+            self.trace.append((frame_time, dict(self.current)))
+        self.recent_frames.append(frame_time)
+        for phase in self.phases:
+            self.recent[phase].append(self.current.get(phase, 0.0))
+
+    def percentiles(self, phase=None):
+        '''Return the p50, p95, and p99 durations in milliseconds of a phase, or of whole frames, over the rolling window'''
+        samples = sorted(self.recent_frames if phase is None else self.recent[phase])
+        if not samples:
+            return {'p50': 0.0, 'p95': 0.0, 'p99': 0.0}
+        last = len(samples) - 1
+        return {name: samples[int(fraction * last)] * 1000 for name, fraction in (('p50', 0.50), ('p95', 0.95), ('p99', 0.99))}
+
+    def summary(self):
+        '''Return the percentiles of every phase and of whole frames'''
+        summary = {phase: self.percentiles(phase) for phase in self.phases}
+        summary['frame'] = self.percentiles()
+        return summary
+
+    def trace_rows(self):
+        '''Return the trace as one dictionary per frame, with durations in milliseconds'''
+        if self.trace is None:
+            raise ValueError('The profiler was created without trace=True, so there is no trace to export.')
+        rows = []
+        for frame, (frame_time, phases) in enumerate(self.trace):
+            row = {'frame': frame, 'frame_ms': frame_time * 1000}
+            for phase in self.phases:
+                row[phase + '_ms'] = phases.get(phase, 0.0) * 1000
+            rows.append(row)
+        return rows
+
+    def export_csv(self, path):
+        '''Write the per-frame trace to a CSV file'''
+        rows = self.trace_rows()
+        with open(path, 'w', newline='') as trace_file:
+            writer = csv.DictWriter(trace_file, fieldnames=['frame', 'frame_ms'] + [phase + '_ms' for phase in self.phases])
+            writer.writeheader()
+            writer.writerows(rows)
+
+    def export_json(self, path):
+        '''Write the per-frame trace and the current percentiles to a JSON file'''
+        with open(path, 'w') as trace_file:
+            json.dump({'summary': self.summary(), 'frames': self.trace_rows()}, trace_file)
+
+    def export(self, path):
+        '''Write the per-frame trace to a JSON file if the path ends in .json, or a CSV file otherwise'''
+        if path.endswith('.json'):
+            self.export_json(path)
+        else:
+            self.export_csv(path)
+
+class ProfilerOverlay:
+    '''A class to draw the profiler's percentiles and a graph of recent frame times over the game'''
+    def __init__(self, profiler, font, rect, budget=1 / TICKS_PER_SECOND, counters=()):
+        '''Initialize the overlay. counters lists functions that each return a line of text to show below the percentile table, such
+        as the counters of a cache.'''
+        self.profiler = profiler
+        self.font = font
+        self.rect = rect
+        self.counters = list(counters)
+
+        # Define the frame time budget in seconds, drawn as a line on the graph.
+        self.budget = budget
+
+        # Define whether the overlay is shown.
+        self.visible = False
+
+        # Define the rendered text, which is refreshed a few times a second so the overlay does not cost more than it measures.
+        self.lines = []
+        self.refresh_interval = TICKS_PER_SECOND // 4
+        self.frames_until_refresh = 0
+
+    def toggle(self):
+        '''Show or hide the overlay'''
+        self.visible = not self.visible
+        self.frames_until_refresh = 0
+
+    def draw(self, surface):
+        '''Draw the overlay onto a surface. Returns the rect drawn, or None if the overlay is hidden.'''
+        if not self.visible:
+            return None
+
+        # Render the percentile table and the counters.
+        if self.frames_until_refresh <= 0:
+            self.lines = []
+            for phase, values in self.profiler.summary().items():
+                text = f'{phase:<24}{values["p50"]:7.3f}{values["p95"]:8.3f}{values["p99"]:8.3f}'
+                self.lines.append(self.font.render(text, True, WHITE))
+            for counter in self.counters:
+                self.lines.append(self.font.render(counter(), True, WHITE))
+            self.frames_until_refresh = self.refresh_interval
+        self.frames_until_refresh -= 1
+
+        # Draw the panel and the table.
+        surface.fill(BLACK, self.rect)
+        pygame.draw.rect(surface, WHITE, self.rect, 1)
+        header = self.font.render(f'{"phase (ms)":<24}{"p50":>7}{"p95":>8}{"p99":>8}', True, WHITE)
+        surface.blit(header, (self.rect.left + 6, self.rect.top + 4))
+        line_height = self.font.get_linesize()
+        for i, line in enumerate(self.lines, 1):
+            surface.blit(line, (self.rect.left + 6, self.rect.top + 4 + i * line_height))
+
+        # Draw the graph of recent frame times, scaled so that twice the budget fills its height.
+        graph = self.rect.inflate(-12, 0)
+        graph.height = 60
+        graph.bottom = self.rect.bottom - 6
+        scale = graph.height / (self.budget * 2)
+        budget_y = graph.bottom - self.budget * scale
+        pygame.draw.line(surface, RED, (graph.left, budget_y), (graph.right, budget_y), 1)
+        frames = list(self.profiler.recent_frames)[-graph.width:]
+        points = [(graph.left + i, graph.bottom - min(frame_time * scale, graph.height)) for i, frame_time in enumerate(frames)]
+        if len(points) > 1:
+            pygame.draw.lines(surface, GREEN, False, points, 1)
+        return self.rect
+
+class StartupTimer:
+    '''A class to time the steps of starting the game, from its creation to the first screen on the display'''
+    def __init__(self):
+        '''Initialize the timer, starting it now'''
+        self.start_time = time.perf_counter()
+        self.last_time = self.start_time
+
+        # Define the (name, seconds) of each step, in order.
+        self.steps = []
+
+    def mark(self, name):
+        '''End a step, timing it from the end of the one before'''
+        now = time.perf_counter()
+        self.steps.append((name, now - self.last_time))
+        self.last_time = now
+
+    def total(self):
+        '''Return the time from the start to the end of the last step, in seconds'''
+        return self.last_time - self.start_time
+
+    def report(self):
+        '''Return the time of each step and the total as text'''
+        lines = [f'{name:<20}{seconds * 1000:>9.1f} ms' for name, seconds in self.steps]
+        lines.append(f'{"total":<20}{self.total() * 1000:>9.1f} ms')
+        return '\n'.join(lines)
+
+def profile_headless(ticks, policy=tracking_policy, simulation=None, trace=False):
+    '''Step an instrumented headless simulation for a number of ticks, timing each one. Returns the profiler.'''
+    if simulation is None:
+        simulation = create_simulation()
+    profiler = FrameProfiler(window=ticks, trace=trace)
+    profiler.instrument(simulation)
+    for tick in range(ticks):
+        profiler.begin_frame()
+        left, right = policy(simulation)
+        simulation.step(left, right)
+        profiler.end_frame()
+    return profiler
+
+if __name__ == '__main__':
+    # Import the argparse library to read the command line options.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Profile each phase of a headless Brick Breaker simulation.')
+    parser.add_argument('--ticks', type=int, default=TICKS_PER_SECOND * 60, help='number of fixed timestep ticks to simulate')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the game\'s random number generator')
+    parser.add_argument('--trace', default=None, help='write a per-tick trace to this file (CSV, or JSON if it ends in .json)')
+    args = parser.parse_args()
+
+    profiler = profile_headless(args.ticks, simulation=create_simulation(seed=args.seed), trace=args.trace is not None)
+    print(f'{"phase (ms)":<24}{"p50":>8}{"p95":>8}{"p99":>8}')
+    for phase, values in profiler.summary().items():
+        print(f'{phase:<24}{values["p50"]:8.4f}{values["p95"]:8.4f}{values["p99"]:8.4f}')
+    if args.trace:
+        profiler.export(args.trace)
@@ -0,0 +1,118 @@
+'''
+Brick Breaker - Dirty Rectangle Renderer
+'''
+
+# Import the pygame libary.
+import pygame
+
+# Import the colors used by the game.
+from simulation import WHITE, BLACK
+
+# Define classes.
+class DirtyRenderer:
+    '''A class that redraws and pushes to the display only the regions that changed since the last frame'''
+    def __init__(self, surface, game, sprite_groups):
+        '''Initialize the renderer'''
+        # Define the display surface, the game whose HUD is drawn, and the moving sprite groups (which must be RenderUpdates groups).
+        self.surface = surface
+        self.game = game
+        self.sprite_groups = sprite_groups
+
+        # Define the cached background holding the black playfield, the HUD separator, and the brick layer.
+        self.background = pygame.Surface(surface.get_size()).convert()
+
+        # Define the region covered by the HUD text and separator line.
+        self.HUD_rect = pygame.Rect(0, 0, surface.get_width(), game.HUD_height + 2)
+
+        # Define the background regions patched since the last frame.
+        self.patched_rects = []
+
+        # Define the score, timer, and lives shown by the HUD when it was last drawn.
+        self.HUD_values = None
+
+        # Build the background and draw the whole display on the first frame.
+        self.rebuild()
+
+    def rebuild(self):
+        '''Draw the background again from the current bricks, e.g. at the start of a level'''
+        # The level's pre-rendered brick layer can be used only while every brick of the level stands undamaged, as at the start of a
+        # level. Otherwise, e.g. after a saved game is loaded, the bricks are drawn as they stand, each in the color of its hits left.
+        level = getattr(self.game, 'level', None)
+        if level is not None and self.game.brick_group.grid() == bytes(level.cells):
+            self.background.blit(level.layer(self.game.HUD_height), (0, 0))
+        else:
+            self.background.fill(BLACK)
+            self.game.brick_group.draw(self.background)
+        pygame.draw.line(self.background, WHITE, (0, self.game.HUD_height), (self.background.get_width(), self.game.HUD_height), 3)
+        self.patched_rects = []
+        self.invalidate()
+
+    def patch(self, rect):
+        '''Erase a killed brick from the background and mark its region to be redrawn'''
+        self.background.fill(BLACK, rect)
+        self.patched_rects.append(pygame.Rect(rect))
+
+    def repaint(self, brick):
+        '''Draw a brick that has changed color into the background and mark its region to be redrawn'''
+        self.background.fill(brick.color, brick.rect)
+        self.patched_rects.append(pygame.Rect(brick.rect))
+
+    def refresh(self, rect):
+        '''Mark a region drawn over by something other than the renderer, such as an overlay, to be redrawn next frame'''
+        self.patched_rects.append(pygame.Rect(rect))
+
+    def invalidate(self):
+        '''Redraw the whole display on the next frame, e.g. after a pause screen has been shown'''
+        self.full_redraw = True
+
+    def current_HUD_values(self):
+        '''Return the values shown by the HUD'''
+        return (self.game.player.score, self.game.level_timer, self.game.player.lives)
+
+    def render(self):
+        '''Draw the frame and push the changed regions to the display'''
+        if self.full_redraw:
+            # Blit the whole background, then draw the sprites and HUD on top of it.
+            self.surface.blit(self.background, (0, 0))
+            for group in self.sprite_groups:
+                group.draw(self.surface)
+            self.game.draw()
+            pygame.display.update()
+            self.HUD_values = self.current_HUD_values()
+            self.patched_rects = []
+            self.full_redraw = False
+            return
+
+        # Erase every group before drawing any of them, so one group's erase cannot cover another group's sprites.
+        for group in self.sprite_groups:
+            group.clear(self.surface, self.background)
+
+        # Copy the patched background regions onto the display.
+        dirty_rects = self.patched_rects
+        for rect in dirty_rects:
+            self.surface.blit(self.background, rect, rect)
+        self.patched_rects = []
+
+        # Draw the sprites, collecting the regions they covered last frame and cover now.
+        for group in self.sprite_groups:
+            dirty_rects.extend(group.draw(self.surface))
+
+        # Redraw the HUD over its own background if a sprite has crossed it or one of its values has changed.
+        HUD_values = self.current_HUD_values()
+        if HUD_values != self.HUD_values or self.HUD_rect.collidelist(dirty_rects) != -1:
+            self.surface.blit(self.background, self.HUD_rect, self.HUD_rect)
+
+            # Blit the sprites again within the HUD region, since the HUD is drawn over them. Group.draw is not used here
+            # because it would record the clipped rects as the sprites' positions.
+            self.surface.set_clip(self.HUD_rect)
+            for group in self.sprite_groups:
+                for sprite in group:
+                    self.surface.blit(sprite.image, sprite.rect)
+            self.surface.set_clip(None)
+
+            self.game.draw()
+            dirty_rects.append(self.HUD_rect)
+            self.HUD_values = HUD_values
+
+        # Push only the changed regions to the display.
+        pygame.display.update(dirty_rects)
@@ -0,0 +1,301 @@
+'''
+Brick Breaker - Input Recording and Replay
+'''
+
+# Import the struct library to pack the replay log.
+import struct
+
+# Import the zlib library to checksum the game state.
+import zlib
+
+# Import the time library to measure replay throughput.
+import time
+
+# Import the headless simulation core.
+from simulation import TICKS_PER_SECOND, WINDOW_WIDTH, WINDOW_HEIGHT, WHITE, BLACK, create_simulation
+
+# Import the game state snapshots.
+from snapshot import take_snapshot, restore_snapshot, Checkpoints
+
+# Set the input flags stored for each tick.
+LEFT = 1
+RIGHT = 2
+CLEAR_BRICKS = 4
+
+# Set the replay log layout: a header, the snapshot the recording starts from (empty for a game recorded from its start), run-length
+# encoded input flags, and a footer used to check the replay.
+MAGIC = b'BBRP'
+VERSION = 5
+HEADER = struct.Struct('<4sHQB')
+FOOTER = struct.Struct('<QI')
+
+# Define classes.
+class ReplayLog:
+    '''A class to hold the seed, simulation type, and per-tick inputs of a game session'''
+    def __init__(self, seed, simulation_name='Simulation', inputs=None, final_tick=None, checksum=None, start=b''):
+        '''Initialize the replay log'''
+        self.seed = seed
+        self.simulation_name = simulation_name
+
+        # Define the snapshot of the state the recording starts from, or empty bytes if it starts from a new game of the seed.
+        self.start = start
+
+        # Define the input flags of every tick, in order.
+        self.inputs = bytearray(inputs or b'')
+
+        # Define the tick count and state checksum at the end of the recording.
+        self.final_tick = final_tick
+        self.checksum = checksum
+
+    def to_bytes(self):
+        '''Pack the log into its compact binary form'''
+        name = self.simulation_name.encode()
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, len(name)))
+        data += name
+        data += encode_varint(len(self.start))
+        data += self.start
+
+        # Store each run of identical inputs as the flags followed by the run length as a variable-length integer.
+        runs = []
+        i = 0
+        while i < len(self.inputs):
+            flags = self.inputs[i]
+            j = i
+            while j < len(self.inputs) and self.inputs[j] == flags:
+                j += 1
+            runs.append((flags, j - i))
+            i = j
+        data += encode_varint(len(runs))
+        for flags, length in runs:
+            data.append(flags)
+            data += encode_varint(length)
+
+        data += FOOTER.pack(self.final_tick or 0, self.checksum or 0)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data):
+        '''Unpack a log from its compact binary form'''
+        magic, version, seed, name_length = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError('Not a Brick Breaker replay log, or written by an unsupported version.')
+        offset = HEADER.size
+        simulation_name = data[offset:offset + name_length].decode()
+        offset += name_length
+        start_length, offset = decode_varint(data, offset)
+        start = bytes(data[offset:offset + start_length])
+        offset += start_length
+
+        # Expand the runs of input flags.
+        inputs = bytearray()
+        run_count, offset = decode_varint(data, offset)
+        for run in range(run_count):
+            flags = data[offset]
+            length, offset = decode_varint(data, offset + 1)
+            inputs += bytes([flags]) * length
+
+        final_tick, checksum = FOOTER.unpack_from(data, offset)
+        return cls(seed, simulation_name, inputs, final_tick, checksum, start)
+
+    def save(self, path):
+        '''Write the log to a file'''
+        with open(path, 'wb') as log_file:
+            log_file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        '''Read a log from a file'''
+        with open(path, 'rb') as log_file:
+            return cls.from_bytes(log_file.read())
+
+class Recorder:
+    '''A class to record the inputs given to a simulation. It must be attached before the simulation's first tick, or with resumed=True
+    to record from the simulation's current state, e.g. after a saved game has been loaded.'''
+    def __init__(self, simulation, resumed=False):
+        '''Initialize the recorder'''
+        self.simulation = simulation
+        self.log = ReplayLog(simulation.seed, type(simulation).__name__, start=take_snapshot(simulation) if resumed else b'')
+
+        # Record the simulation type the game is built on, since a windowed Game replays as a headless Simulation.
+        for simulation_class in type(simulation).__mro__:
+            if simulation_class.__name__ in SIMULATION_CLASSES:
+                self.log.simulation_name = simulation_class.__name__
+                break
+
+    def step(self, left=False, right=False, clear_bricks=False):
+        '''Record the inputs for one tick, then apply them and step the simulation'''
+        self.log.inputs.append((LEFT if left else 0) | (RIGHT if right else 0) | (CLEAR_BRICKS if clear_bricks else 0))
+        apply_inputs(self.simulation, self.log.inputs[-1])
+
+    def finish(self):
+        '''Store the final tick and state checksum so that a replay can be checked, and return the log'''
+        self.log.final_tick = self.simulation.frame_counter
+        self.log.checksum = state_checksum(self.simulation)
+        return self.log
+
+class Replay:
+    '''A class to re-simulate a recorded game, with periodic state snapshots for fast seeking'''
+    def __init__(self, log, snapshot_interval=TICKS_PER_SECOND * 10):
+        '''Initialize the replay'''
+        self.log = log
+        self.snapshot_interval = snapshot_interval
+        self.simulation = create_simulation(simulation_class(log.simulation_name), log.seed)
+        if log.start:
+            restore_snapshot(self.simulation, log.start)
+
+        # Define the ticks the recording starts and ends on.
+        self.first_tick = self.simulation.frame_counter
+        self.end_tick = self.first_tick + len(log.inputs)
+
+        # Define the snapshots taken every snapshot_interval ticks, starting with the first tick.
+        self.checkpoints = Checkpoints(self.simulation, snapshot_interval)
+
+    @property
+    def tick(self):
+        '''Return the number of ticks that have been replayed'''
+        return self.simulation.frame_counter
+
+    def finished(self):
+        '''Return whether every recorded tick has been replayed'''
+        return self.tick >= self.end_tick
+
+    def step(self):
+        '''Replay one recorded tick, taking a snapshot every snapshot_interval ticks'''
+        apply_inputs(self.simulation, self.log.inputs[self.tick - self.first_tick])
+        self.checkpoints.update()
+
+    def run(self, ticks=None):
+        '''Replay a number of ticks, or every remaining tick, as fast as possible'''
+        end = self.end_tick if ticks is None else min(self.end_tick, self.tick + ticks)
+        while self.tick < end:
+            self.step()
+
+    def seek(self, tick):
+        '''Jump to a tick by restoring the closest earlier snapshot and replaying from there'''
+        tick = max(self.first_tick, min(tick, self.end_tick))
+        if tick < self.tick or tick - self.tick > self.snapshot_interval:
+            start = self.checkpoints.latest(tick)
+            if not (start <= self.tick <= tick):
+                self.checkpoints.rewind(tick)
+        self.run(tick - self.tick)
+
+    def verify(self):
+        '''Return whether the replay reached the same state as the recorded game'''
+        return self.finished() and self.tick == self.log.final_tick and state_checksum(self.simulation) == self.log.checksum
+
+def apply_inputs(simulation, flags):
+    '''Apply one tick of recorded input flags to a simulation'''
+    if flags & CLEAR_BRICKS:
+        simulation.clear_bricks()
+    simulation.step(bool(flags & LEFT), bool(flags & RIGHT))
+
+def state_checksum(simulation):
+    '''Return a checksum of a simulation's game state'''
+    return zlib.crc32(repr(simulation.get_state()).encode())
+
+def encode_varint(value):
+    '''Encode a non-negative integer in as few 7-bit groups as it needs'''
+    data = bytearray()
+    while True:
+        byte = value & 0x7f
+        value >>= 7
+        if value:
+            data.append(byte | 0x80)
+        else:
+            data.append(byte)
+            return data
+
+def decode_varint(data, offset):
+    '''Decode a variable-length integer, returning it and the offset just past it'''
+    value = 0
+    shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7f) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, offset
+
+# Map the simulation type names stored in replay logs to the modules that define them.
+SIMULATION_CLASSES = {
+    'Simulation': 'simulation',
+    'VectorSimulation': 'ball_system',
+    'SweptSimulation': 'swept',
+}
+
+def simulation_class(name):
+    '''Return the simulation class stored in a replay log, importing optional backends only when needed'''
+    if name not in SIMULATION_CLASSES:
+        raise ValueError(f'Unknown simulation type in replay log: {name}')
+    module = __import__(SIMULATION_CLASSES[name])
+    return getattr(module, name)
+
+def play(log, speed=1):
+    '''Show a replay in a window. Up/Down change the speed, Left/Right seek 10 seconds, Space pauses, and Escape quits.'''
+    # Import the pygame libary.
+    import pygame
+
+    pygame.init()
+    display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    pygame.display.set_caption('Brick Breaker - Replay')
+    font = pygame.font.Font('assets/Mechanical-g5Y5.otf', 32)
+    clock = pygame.time.Clock()
+
+    replay = Replay(log)
+    simulation = replay.simulation
+    paused = False
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_UP:
+                    speed = min(speed * 2, 64)
+                elif event.key == pygame.K_DOWN:
+                    speed = max(speed // 2, 1)
+                elif event.key == pygame.K_RIGHT:
+                    replay.seek(replay.tick + TICKS_PER_SECOND * 10)
+                elif event.key == pygame.K_LEFT:
+                    replay.seek(replay.tick - TICKS_PER_SECOND * 10)
+
+        # Advance the replay by as many ticks as the speed allows.
+        if not paused:
+            replay.run(speed)
+
+        # Draw the game and the replay status.
+        display_surface.fill(BLACK)
+        pygame.draw.line(display_surface, WHITE, (0, simulation.HUD_height), (WINDOW_WIDTH, simulation.HUD_height), 3)
+        for group in (simulation.paddle_group, simulation.ball_group, simulation.brick_group, simulation.powerup_group, simulation.missile_group, simulation.monkey_group):
+            group.draw(display_surface)
+        status = f'Score: {simulation.player.score}   Lives: {simulation.player.lives}   Level: {simulation.level_number}   Tick: {replay.tick}/{replay.end_tick}   Speed: x{speed}'
+        display_surface.blit(font.render(status, True, WHITE), (15, 5))
+        pygame.display.update()
+        clock.tick(TICKS_PER_SECOND)
+
+    pygame.quit()
+
+if __name__ == '__main__':
+    # Import the argparse library to read the command line options.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Replay a recorded Brick Breaker game.')
+    parser.add_argument('mode', choices=['run', 'play'], help='run: re-simulate headless and check the result; play: show the replay in a window')
+    parser.add_argument('log', help='path to a replay log')
+    args = parser.parse_args()
+
+    log = ReplayLog.load(args.log)
+    if args.mode == 'play':
+        play(log)
+    else:
+        replay = Replay(log)
+        start_time = time.perf_counter()
+        replay.run()
+        elapsed = time.perf_counter() - start_time
+        print(f'Replayed {replay.tick} ticks in {elapsed:.3f} s: {replay.tick / elapsed:.0f} ticks/s')
+        print(f'Replay matches the recording: {replay.verify()}')
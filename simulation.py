@@ -0,0 +1,1220 @@
+'''
+Brick Breaker - Headless Simulation
+'''
+
+# Import the pygame libary. Only rects, sprites and plain surfaces are used here, so no display is required.
+import pygame
+
+# Import the random library.
+import random
+
+# Import the time library to measure simulation throughput.
+import time
+
+# Import the os, pickle, array, and json libraries to find, cache, and store compiled levels, and read the level manifest.
+import os
+import pickle
+from array import array
+import json
+
+# Import the chunked brick field.
+from brick_field import BrickField
+
+# Import the power-up drop tables and effect timers.
+from powerups import AliasTable, EffectTimers
+
+# Import the level generator and the packed level file reader.
+from level_generator import generate_level, generate_name, LevelPack
+
+# Set the dimensions of the playfield.
+WINDOW_WIDTH = 1200
+WINDOW_HEIGHT = 1000
+
+# Set the number of simulation ticks per second of game time.
+TICKS_PER_SECOND = 120
+
+# Set the colors for the game.
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+BLUE = (0, 102, 255)
+GREEN = (71, 209, 71)
+RED = (230, 0, 0)
+PINK = (255, 102, 153)
+
+# Set the brick grid layout of the standard levels. Levels fill the top half of the playfield below the HUD.
+BRICK_COLUMNS = 11
+BRICK_ROWS = 12
+BRICK_HORIZONTAL_BUFFER = 5
+BRICK_VERTICAL_BUFFER = 5
+
+# Set the largest level, in bricks. Larger levels are scaled down to fill the same area, and at these limits a brick is 2 pixels across.
+MAX_LEVEL_COLUMNS = WINDOW_WIDTH // 3
+MAX_LEVEL_ROWS = WINDOW_HEIGHT // 2 // 3
+
+# Set the level file characters and the brick colors they stand for. The order of the palette defines the compiled color indices.
+COLOR_DICTIONARY = {'X':None, 'P':PINK, 'R':RED, 'G':GREEN, 'B':BLUE, 'W':WHITE}
+PALETTE = list(COLOR_DICTIONARY.values())
+
+# Set the other brick characters: '#' for an indestructible brick, and '1' to '9' for a brick that takes that many hits, drawn in a
+# darker color the more hits it has left.
+INDESTRUCTIBLE_CHARACTER = '#'
+GRAY = (140, 140, 140)
+HIT_COLORS = [(255, 230, 140), (255, 210, 110), (255, 190, 80), (255, 170, 50), (245, 145, 30), (230, 120, 20), (210, 95, 10), (185, 75, 5), (160, 55, 0)]
+
+# Set the brick types, indexed by the brick code stored for each grid cell: the character, color, hits needed to break the brick
+# (0 if it cannot be broken), and the code it becomes when hit without breaking. The codes of the colors above match their PALETTE index.
+BRICK_TYPES = [(char, color, 1 if color else 0, 0) for char, color in COLOR_DICTIONARY.items()]
+BRICK_TYPES.append((INDESTRUCTIBLE_CHARACTER, GRAY, 0, 0))
+BRICK_TYPES += [(str(hits), HIT_COLORS[hits - 1], hits, len(BRICK_TYPES) + hits - 2 if hits > 1 else 0) for hits in range(1, 10)]
+
+# Set the table that translates the bytes of a level file row into brick codes, with 255 for a byte that is not a brick character.
+LEVEL_TRANSLATION = bytes(next((code for code, brick_type in enumerate(BRICK_TYPES) if ord(brick_type[0]) == byte), 255) for byte in range(256))
+
+# Set the file listing the levels of the game, the prefix of the names that identify generated levels, and the number of generated
+# levels kept compiled in memory.
+LEVEL_MANIFEST_PATH = os.path.join('levels', 'manifest.json')
+GENERATED_PREFIX = 'generated:'
+GENERATED_LEVEL_LIMIT = 8
+
+# Set the power-up types: the drop weight of each, how many seconds its effect lasts (0 for an instant effect), its color,
+# and the names of the Simulation methods that start and end its effect.
+POWERUP_TYPES = {
+    'AddBall': (8, 0, WHITE, 'add_ball', None),
+    'BigPaddle': (5, 10, GREEN, 'grow_paddle', 'shrink_paddle'),
+    'Missiles': (4, 10, RED, 'arm_missiles', 'disarm_missiles'),
+    'Monkey': (3, 8, PINK, 'release_monkey', 'recall_monkey'),
+}
+
+# Set the weight of a broken brick dropping nothing. With the weights above, one brick in five drops a power-up.
+NO_DROP_WEIGHT = 80
+
+# Set the number of ticks between missile launches while missiles are armed.
+MISSILE_INTERVAL = TICKS_PER_SECOND // 3
+
+# Define classes.
+class Simulation:
+    '''A class to hold and step the game state without a display, audio, or frame rate throttle. The brick group must be a BrickField.'''
+    def __init__(self, player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed=None):
+        '''Initialize the simulation'''
+        self.player = player
+        self.paddle = paddle
+        self.paddle_group = paddle_group
+        self.ball_group = ball_group
+        self.brick_group = brick_group
+        self.powerup_group = powerup_group
+
+        self.level_number = 1
+
+        # Define the compiled level being played, set when a level starts.
+        self.level = None
+
+        self.HUD_height = 40
+
+        self.running = True
+
+        self.level_timer = 0
+
+        # Count the number of fixed timestep ticks that have been simulated.
+        self.frame_counter = 0
+
+        # Define the game's own random number generator. A game started from the same seed with the same inputs plays out identically.
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.random = random.Random(self.seed)
+
+        # Define the cache of compiled levels and the manifest listing the levels in order, shared by every simulation in the process,
+        # and the speed balls are launched at on the current level.
+        self.level_cache = LEVEL_CACHE
+        self.level_manifest = LEVEL_MANIFEST
+        self.ball_speed = 4
+
+        # Define the table power-up drops are drawn from, and the timers of the active power-up effects.
+        self.drop_table = DROP_TABLE
+        self.effects = EffectTimers()
+
+        # Define the number of active paddle boosts and missile launchers, and the missile and monkey groups.
+        self.paddle_boosts = 0
+        self.missile_launchers = 0
+        self.missile_group = pygame.sprite.RenderUpdates()
+        self.monkey_group = pygame.sprite.RenderUpdates()
+
+    def step(self, left=False, right=False):
+        '''Advance the simulation by one fixed timestep tick'''
+        # Increment the frame counter and level timer.
+        self.frame_counter += 1
+        if self.frame_counter % TICKS_PER_SECOND == 0:
+            self.level_timer += 1
+
+        # Update all sprite groups.
+        self.paddle_group.update(left, right)
+        self.move_balls()
+        self.brick_group.update()
+        self.powerup_group.update()
+        self.missile_group.update()
+        self.monkey_group.update()
+
+        # End the power-up effects that have run out, then apply the game rules.
+        self.update_effects()
+        self.update()
+
+    def move_balls(self):
+        '''Move every ball by one tick'''
+        self.ball_group.update()
+
+    def update(self):
+        '''Update the game'''
+        self.check_collisions()
+        self.check_fallen_ball()
+        self.check_level_completion()
+        self.check_fallen_powerup()
+
+    def check_collisions(self):
+        '''Check for collisions between the balls, walls, paddle, bricks, and powerups'''
+        self.check_wall_collisions()
+        self.check_paddle_collisions()
+        self.check_brick_collisions()
+        self.check_powerup_collisions()
+        self.check_missile_collisions()
+        self.check_monkey_collisions()
+
+    def check_wall_collisions(self):
+        '''Check collisions between the ball and the top, left, and right walls'''
+        for ball in self.ball_group:
+            if (ball.rect.left <= 0) and (ball.dx < 0):
+                ball.dx = (-1) * ball.dx
+            if (ball.rect.right >= WINDOW_WIDTH) and (ball.dx > 0):
+                ball.dx = (-1) * ball.dx
+            if (ball.rect.top <= self.HUD_height) and (ball.dy < 0):
+                ball.dy = (-1) * ball.dy
+
+    def check_paddle_collisions(self):
+        '''Check for collisions between the ball and the paddle'''
+        if pygame.sprite.spritecollide(self.paddle, self.ball_group, False):
+            self.on_paddle_hit()
+            for ball in pygame.sprite.groupcollide(self.ball_group, self.paddle_group, False, False):
+                alpha = ball.rect.centerx - self.paddle.rect.centerx
+                beta = self.paddle.width / 2
+                ball.dx = alpha / beta
+                ball.dy = - (2 - (ball.dx) ** 2) ** 0.5
+
+    def check_brick_collisions(self):
+        '''Check for collision between the ball and bricks'''
+        for ball in self.ball_group:
+            for brick in self.brick_group.collide(ball):
+                self.hit_brick(ball, brick)
+
+    def hit_brick(self, ball, brick):
+        '''Bounce a ball off a brick it overlaps and break the brick if the ball struck one of its hit zones'''
+        # Set the ball_brick_collision variable to False.
+        ball_brick_collision = False
+
+        # Set the hit zones within the brick that has been struck.
+        hit_zone_buffer = ball.diameter / 2
+        hit_zone_l = pygame.Rect(brick.rect.topleft, (hit_zone_buffer, brick.height))
+        hit_zone_r = pygame.Rect((brick.rect.right - hit_zone_buffer, brick.rect.top), (hit_zone_buffer, brick.height))
+        hit_zone_b = pygame.Rect((brick.rect.left, brick.rect.bottom - hit_zone_buffer), (brick.width, hit_zone_buffer))
+        hit_zone_t = pygame.Rect(brick.rect.topleft,(brick.width, hit_zone_buffer))
+
+        # Check which hit zone the ball has collided with.
+        if hit_zone_l.collidepoint(ball.rect.right, ball.rect.centery):
+            ball_brick_collision = True
+            ball.dx = (-1) * ball.dx
+        elif hit_zone_r.collidepoint(ball.rect.left, ball.rect.centery):
+            ball_brick_collision = True
+            ball.dx = (-1) * ball.dx
+        elif hit_zone_b.collidepoint(ball.rect.centerx, ball.rect.top):
+            ball_brick_collision = True
+            ball.dy = (-1) * ball.dy
+        elif hit_zone_t.collidepoint(ball.rect.centerx, ball.rect.bottom):
+            ball_brick_collision = True
+            ball.dy = (-1) * ball.dy
+
+        if ball_brick_collision:
+            self.strike_brick(brick)
+
+    def strike_brick(self, brick):
+        '''Break a brick that has been struck if this was its last hit, or weaken it. Indestructible bricks are not affected.'''
+        if brick.hits > 1:
+            brick.damage()
+            self.on_brick_damaged(brick)
+        elif brick.hits:
+            self.break_brick(brick)
+
+    def break_brick(self, brick):
+        '''Kill a brick that has been struck, possibly drop a powerup, and add to the player's score'''
+        # Notify the brick hit and kill the brick.
+        self.on_brick_hit(brick)
+        brick.kill()
+
+        # Draw a powerup, or none, from the drop table.
+        ptype = self.drop_table.sample(self.random)
+        if ptype is not None:
+            self.powerup_group.add(POWERUP_POOL.acquire(brick.rect.centerx, brick.rect.centery, ptype))
+
+        # Add to the player's score based on the level number and the level timer.
+        if self.level_timer <= 60:
+            self.player.score += self.level_number * 10 + (60 - self.level_timer)
+        else:
+            self.player.score += self.level_number * 10
+
+    def check_powerup_collisions(self):
+        '''Check for collisions between the paddle and a powerup'''
+        for powerup in self.powerup_group:
+            if self.paddle.rect.colliderect(powerup.rect):
+                ptype = powerup.ptype
+                powerup.kill()
+                self.collect_powerup(ptype)
+
+    def collect_powerup(self, ptype):
+        '''Start the effect of a collected powerup, and its timer if it lasts'''
+        weight, seconds, color, start, end = POWERUP_TYPES[ptype]
+        getattr(self, start)()
+        if seconds:
+            self.effects.start(ptype, self.frame_counter + seconds * TICKS_PER_SECOND)
+
+    def update_effects(self):
+        '''End the powerup effects that have run out, and launch missiles while they are armed'''
+        for ptype in self.effects.expired(self.frame_counter):
+            getattr(self, POWERUP_TYPES[ptype][4])()
+        if self.missile_launchers and self.frame_counter % MISSILE_INTERVAL == 0:
+            self.launch_missiles()
+
+    def clear_effects(self):
+        '''End every active powerup effect and remove the missiles in flight'''
+        for ptype in self.effects.clear():
+            getattr(self, POWERUP_TYPES[ptype][4])()
+        self.missile_group.empty()
+
+    def grow_paddle(self):
+        '''Widen the paddle by half its size, up to twice its normal width'''
+        self.paddle_boosts += 1
+        self.paddle.resize(self.paddle_width())
+
+    def shrink_paddle(self):
+        '''Take back one paddle boost'''
+        self.paddle_boosts -= 1
+        self.paddle.resize(self.paddle_width())
+
+    def paddle_width(self):
+        '''Return the paddle width for the active paddle boosts'''
+        return self.paddle.base_width + self.paddle.base_width // 2 * min(self.paddle_boosts, 2)
+
+    def arm_missiles(self):
+        '''Arm the paddle to launch missiles'''
+        self.missile_launchers += 1
+
+    def disarm_missiles(self):
+        '''Take back one missile launcher'''
+        self.missile_launchers -= 1
+
+    def launch_missiles(self):
+        '''Launch a missile from each end of the paddle'''
+        for x in (self.paddle.rect.left + 10, self.paddle.rect.right - 10):
+            self.missile_group.add(MISSILE_POOL.acquire(x, self.paddle.rect.top))
+
+    def check_missile_collisions(self):
+        '''Break the first brick each missile strikes, and remove missiles that reach the HUD'''
+        for missile in self.missile_group:
+            bricks = self.brick_group.collide(missile)
+            if bricks:
+                missile.kill()
+                self.strike_brick(bricks[0])
+            elif missile.rect.top <= self.HUD_height:
+                missile.kill()
+
+    def release_monkey(self):
+        '''Release a monkey from one side of the brick area'''
+        size = Monkey.size
+        x = self.random.choice([0, WINDOW_WIDTH - size])
+        y = self.random.randrange(self.HUD_height, WINDOW_HEIGHT // 2 - size)
+        dx = 1 if x == 0 else -1
+        dy = self.random.choice([-1, 1])
+        self.monkey_group.add(Monkey(x, y, dx, dy, self.HUD_height))
+
+    def recall_monkey(self):
+        '''Remove the monkey that has been out the longest'''
+        monkeys = self.monkey_group.sprites()
+        if monkeys:
+            monkeys[0].kill()
+
+    def check_monkey_collisions(self):
+        '''Break every brick in a monkey's path'''
+        for monkey in self.monkey_group:
+            for brick in self.brick_group.collide(monkey):
+                self.strike_brick(brick)
+
+    def check_fallen_ball(self):
+        '''Check if any of the player's balls has fallen off of the screen'''
+        # If a ball has fallen off the screen, check whether it is the last ball the player has.
+        # If the player has more balls, remove the ball from the ball group.
+        # If the player has run out of lives, run the game over conditions and reset the game.
+        for ball in self.ball_group:
+            if ball.rect.top >= WINDOW_HEIGHT:
+                # If the player has more balls available, simply kill the ball that has fallen off the screen.
+                if len(self.ball_group) > 1:
+                    ball.kill()
+                else:
+                    # Reset the position of the ball and remove a life.
+                    ball.reset()
+                    self.lose_life()
+
+    def lose_life(self):
+        '''Remove a life once the last ball has fallen, and reset the game if the player has run out of lives'''
+        # Remove a life.
+        self.player.lives -= 1
+
+        # Reset the position of the paddle.
+        self.paddle.reset()
+
+        # Remove all current powerups on the screen, and end the active powerup effects.
+        self.powerup_group.empty()
+        self.clear_effects()
+
+        # Notify the life loss.
+        self.on_life_lost()
+
+        # Check if the player has run out of lives.
+        if self.player.lives == 0:
+            self.on_game_over()
+            self.reset_game()
+
+    def check_fallen_powerup(self):
+        '''Check whether any existing powerups have fallen off the screen; if so, delete it'''
+        for powerup in self.powerup_group:
+            if powerup.rect.top >= WINDOW_HEIGHT:
+                powerup.kill()
+
+    def check_level_completion(self):
+        '''Check whether the current level has been completed'''
+        # Check whether there are no more bricks remaining that can be broken.
+        if self.brick_group.breakable == 0:
+            # Increment the level number.
+            self.level_number += 1
+
+            # Reset the paddle position.
+            self.paddle.reset()
+
+            # Remove all of the balls from the ball group, and end the active powerup effects.
+            self.ball_group.empty()
+            self.clear_effects()
+
+            # Notify the level completion.
+            self.on_level_complete()
+
+            # Start the next level.
+            self.start_new_level()
+
+    def add_ball(self):
+        '''Launch a new ball from the paddle at the current level's speed'''
+        new_ball = BALL_POOL.acquire(self.paddle_group.sprites()[0].rect.centerx, self.paddle_group.sprites()[0].rect.top, self.ball_speed, self.random)
+        self.ball_group.add(new_ball)
+
+    def start_new_level(self):
+        '''Start a new level of the game'''
+        self.level_timer = 0
+
+        # After the last level of the manifest the player has won, and the game starts again from level 1. A manifest with endless
+        # levels has no last level.
+        last_level = self.level_manifest.last_level()
+        if last_level is not None and self.level_number > last_level:
+            self.on_victory()
+            self.player.reset()
+            self.level_number = 1
+
+        # Load the level and launch a ball at its speed.
+        self.level = self.level_manifest.level(self.level_number, self.level_cache)
+        self.ball_speed = self.level_manifest.ball_speed(self.level_number)
+        self.add_ball()
+
+        self.lay_out_bricks()
+
+        # Notify the start of the level.
+        self.on_level_start()
+
+    def lay_out_bricks(self):
+        '''Replace the bricks with those of the current level'''
+        self.brick_group.load(self.level, self.HUD_height)
+
+    def clear_bricks(self):
+        '''Remove every brick from the level, for testing purposes'''
+        self.brick_group.empty()
+
+    def reset_game(self):
+        '''Reset the game and player attributes'''
+        self.player.reset()
+        self.brick_group.empty()
+        self.ball_group.empty()
+        self.powerup_group.empty()
+        self.clear_effects()
+        self.level_number = 1
+        self.start_new_level()
+
+    def get_state(self, bricks=True):
+        '''Return a copy of the game state as plain data. With bricks=False the bricks are left out, for callers that store the brick
+        field another way (see snapshot.py).'''
+        state = {
+            'frame_counter': self.frame_counter,
+            'level_number': self.level_number,
+            'level_timer': self.level_timer,
+            'level': (self.level.brick_map, self.level.name),
+            'player': (self.player.lives, self.player.score),
+            'paddle': self.paddle.rect.topleft,
+            'balls': self.get_ball_states(),
+            'powerups': [(powerup.rect.centerx, powerup.rect.centery, powerup.ptype) for powerup in self.powerup_group],
+            'effects': self.effects.get_state(),
+            'boosts': (self.paddle_boosts, self.missile_launchers),
+            'missiles': [missile.rect.topleft for missile in self.missile_group],
+            'monkeys': [(monkey.rect.x, monkey.rect.y, monkey.dx, monkey.dy) for monkey in self.monkey_group],
+            'random': self.random.getstate(),
+        }
+        if bricks:
+            state['bricks'] = [(brick.rect.x, brick.rect.y, brick.width, brick.height, brick.color, brick.hits) for brick in self.brick_group]
+        return state
+
+    def set_state(self, state):
+        '''Restore a game state returned by get_state'''
+        self.frame_counter = state['frame_counter']
+        self.level_number = state['level_number']
+        self.level_timer = state['level_timer']
+        if self.level is None or self.level.brick_map != state['level'][0]:
+            self.level = self.level_manifest.find(*state['level'], self.level_cache)
+        self.ball_speed = self.level_manifest.ball_speed(self.level_number)
+        self.player.lives, self.player.score = state['player']
+        self.set_ball_states(state['balls'])
+
+        # Restore the bricks on the level's grid, if the state includes them.
+        if 'bricks' in state:
+            self.brick_group.restore(self.level, self.HUD_height, state['bricks'])
+
+        self.powerup_group.empty()
+        for x, y, ptype in state['powerups']:
+            self.powerup_group.add(POWERUP_POOL.acquire(x, y, ptype))
+
+        # Restore the powerup effects and the missiles and monkeys they have released.
+        self.effects.set_state(state['effects'])
+        self.paddle_boosts, self.missile_launchers = state['boosts']
+        self.paddle.resize(self.paddle_width())
+        self.paddle.rect.topleft = state['paddle']
+        self.missile_group.empty()
+        for x, y in state['missiles']:
+            missile = MISSILE_POOL.acquire(0, 0)
+            missile.rect.topleft = (x, y)
+            self.missile_group.add(missile)
+        self.monkey_group.empty()
+        for x, y, dx, dy in state['monkeys']:
+            self.monkey_group.add(Monkey(x, y, dx, dy, self.HUD_height))
+
+        # Restore the random number generator last, since creating balls draws from it.
+        self.random.setstate(state['random'])
+
+    def get_ball_states(self):
+        '''Return the position, direction, and velocity of every ball'''
+        return [(ball.rect.x, ball.rect.y, ball.dx, ball.dy, ball.velocity) for ball in self.ball_group]
+
+    def set_ball_states(self, ball_states):
+        '''Replace the balls with ones in the given states'''
+        self.ball_group.empty()
+        for x, y, dx, dy, velocity in ball_states:
+            ball = BALL_POOL.acquire(0, 0, velocity, self.random)
+            ball.rect.topleft = (x, y)
+            ball.dx = dx
+            ball.dy = dy
+            self.ball_group.add(ball)
+
+    # Define the event hooks. The headless simulation ignores them; the windowed game overrides them to play sounds and show pause screens.
+    def on_paddle_hit(self):
+        '''Called when a ball strikes the paddle'''
+        pass
+
+    def on_brick_hit(self, brick):
+        '''Called when a ball destroys a brick, just before the brick is killed'''
+        pass
+
+    def on_brick_damaged(self, brick):
+        '''Called when a multi-hit brick is struck without breaking, after it has lost the hit'''
+        pass
+
+    def on_life_lost(self):
+        '''Called when the last ball falls off the screen'''
+        pass
+
+    def on_game_over(self):
+        '''Called when the player runs out of lives, before the game is reset'''
+        pass
+
+    def on_level_complete(self):
+        '''Called when every brick of a level has been destroyed'''
+        pass
+
+    def on_level_start(self):
+        '''Called once the bricks of a new level have been laid out'''
+        pass
+
+    def on_victory(self):
+        '''Called when every level has been completed, before the game restarts at level 1'''
+        pass
+
+class Player:
+    '''A class to model the player'''
+    def __init__(self):
+        '''Initialize the player and define player attributes'''
+        self.lives = 3
+        self.score = 0
+
+    def reset(self):
+        '''Reset the player attributes'''
+        self.lives = 3
+        self.score = 0
+
+class Paddle(pygame.sprite.Sprite):
+    '''A class to model a paddle controlled by the player.'''
+    def __init__(self):
+        '''Initialize the paddle'''
+        # Inherit the parent class's methods and attributes.
+        super().__init__()
+
+        # Define the paddle height, width, and buffer distance to the bottom of the display.
+        self.height = 15
+        self.base_width = 150
+        self.width = self.base_width
+        self.lower_buffer = 25
+
+        # Define the paddle image as a shared white surface.
+        self.image = SPRITE_ASSETS.get('rect', WHITE, (self.width, self.height))
+
+        # Generate and locate the paddle rect.
+        self.rect = self.image.get_rect()
+        self.rect.centerx = WINDOW_WIDTH / 2
+        self.rect.bottom = WINDOW_HEIGHT - self.lower_buffer
+
+        # Define the paddle velocity.
+        self.velocity = 8
+
+    def update(self, left=False, right=False):
+        '''Move the paddle across the screen based on the left and right inputs'''
+        # Move the paddle if the left or right input is held and it is within the screen bounds.
+        if left and self.rect.left >= 0:
+            self.rect.x -= self.velocity
+        if right and self.rect.right <= WINDOW_WIDTH:
+            self.rect.x += self.velocity
+
+    def reset(self):
+        self.rect.centerx = WINDOW_WIDTH / 2
+        self.rect.bottom = WINDOW_HEIGHT - self.lower_buffer
+
+    def resize(self, width):
+        '''Change the paddle width about its center, keeping it on the screen'''
+        if width == self.width:
+            return
+        self.width = width
+        self.image = SPRITE_ASSETS.get('rect', WHITE, (self.width, self.height))
+        center = self.rect.center
+        self.rect.size = (self.width, self.height)
+        self.rect.center = center
+        self.rect.clamp_ip(pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT))
+
+class PooledSprite(pygame.sprite.Sprite):
+    '''A sprite that returns to its class's SpritePool once it has left its last group. It must not be added to a group again after that.'''
+    # Define the pool the sprite class is recycled through, which is set by the pool.
+    pool = None
+
+    def kill(self):
+        '''Remove the sprite from every group and return it to the pool'''
+        super().kill()
+        if self.pooled:
+            self.pool.release(self)
+
+    def remove_internal(self, group):
+        '''Remove the sprite from a group, returning it to the pool if that was its last group'''
+        super().remove_internal(group)
+        if self.pooled and not self.alive():
+            self.pool.release(self)
+
+class Ball(PooledSprite):
+    '''A class to model the ball. Balls are recycled through BALL_POOL, so their launch state is set by setup.'''
+    def __init__(self, x, y, velocity, random_generator=random):
+        '''Initialize the ball'''
+        # Inherit the parent class's attributes and methods.
+        super().__init__()
+        self.pooled = False
+
+        # Define the ball diameter.
+        self.diameter = 25
+
+        # Define the ball image as a shared surface with a white circle.
+        self.image = SPRITE_ASSETS.get('circle', WHITE, (self.diameter, self.diameter))
+
+        # Generate the ball rect.
+        self.rect = self.image.get_rect()
+
+        self.setup(x, y, velocity, random_generator)
+
+    def setup(self, x, y, velocity, random_generator=random):
+        '''Launch the ball from a position, as a new ball or one reused from the pool'''
+        # Define the random number generator used to pick the ball's direction.
+        self.random = random_generator
+
+        # Define the kinematic attributes of the ball.
+        self.starting_dx = self.random.choice([-1, 1])
+        self.starting_dy = -1
+        self.velocity = velocity
+        self.dx = self.starting_dx
+        self.dy = self.starting_dy
+
+        # Locate the ball rect.
+        self.rect.center = (x, y)
+
+    def update(self):
+        '''Move the ball'''
+        self.rect.x += self.dx * self.velocity
+        self.rect.y += self.dy * self.velocity
+
+    def reset(self):
+        '''Reset the ball to the center of the screen'''
+        self.dx = self.random.choice([-1, 1])
+        self.dy = -1
+        self.rect.center = (WINDOW_WIDTH / 2, WINDOW_HEIGHT - 55)
+
+class PowerUp(PooledSprite):
+    '''A powerup that the player can obtain. Powerups are recycled through POWERUP_POOL, so their drop state is set by setup.'''
+    def __init__(self, x, y, ptype):
+        # Inherit the parent classes attributes and methods.
+        super().__init__()
+        self.pooled = False
+
+        # Set the width and height of the powerup block.
+        self.height = 20
+        self.width = 20
+
+        # Generate the power up rect.
+        self.rect = pygame.Rect(0, 0, self.width, self.height)
+
+        self.setup(x, y, ptype)
+
+    def setup(self, x, y, ptype):
+        '''Drop the powerup from a position, as a new powerup or one reused from the pool'''
+        # Define the powerup image as a shared surface in the color of its type.
+        self.image = SPRITE_ASSETS.get('rect', POWERUP_TYPES[ptype][2], (self.width, self.height))
+
+        # Locate the power up rect.
+        self.rect.centerx = x
+        self.rect.centery = y
+
+        # Define the powerup velocity.
+        self.velocity = 2
+
+        # Define the type of the power up.
+        self.ptype = ptype
+
+    def update(self):
+        '''Move the powerup down the screen for the player to collect it'''
+        self.rect.y += self.velocity
+
+class Missile(PooledSprite):
+    '''A missile launched up the screen from the paddle. Missiles are recycled through MISSILE_POOL.'''
+    def __init__(self, x, y):
+        '''Initialize the missile'''
+        super().__init__()
+        self.pooled = False
+
+        # Define the missile image as a shared red surface.
+        self.image = SPRITE_ASSETS.get('rect', RED, (6, 16))
+        self.rect = self.image.get_rect()
+
+        # Define the missile velocity.
+        self.velocity = 12
+
+        self.setup(x, y)
+
+    def setup(self, x, y):
+        '''Launch the missile with its bottom center at a position'''
+        self.rect.midbottom = (x, y)
+
+    def update(self):
+        '''Move the missile up the screen'''
+        self.rect.y -= self.velocity
+
+class Monkey(pygame.sprite.Sprite):
+    '''A monkey that bounces around the brick area and breaks every brick in its path'''
+    # Define the monkey size.
+    size = 36
+
+    def __init__(self, x, y, dx, dy, top):
+        '''Initialize the monkey'''
+        super().__init__()
+
+        # Define the monkey image as a shared pink circle.
+        self.image = SPRITE_ASSETS.get('circle', PINK, (self.size, self.size))
+        self.rect = self.image.get_rect()
+        self.rect.topleft = (x, y)
+
+        # Define the kinematic attributes of the monkey, and the top and bottom of the area it bounces in.
+        self.dx = dx
+        self.dy = dy
+        self.velocity = 5
+        self.top = top
+        self.bottom = WINDOW_HEIGHT // 2
+
+    def update(self):
+        '''Move the monkey, bouncing off the walls, the HUD, and the bottom of the brick area'''
+        self.rect.x += self.dx * self.velocity
+        self.rect.y += self.dy * self.velocity
+        if (self.rect.left <= 0 and self.dx < 0) or (self.rect.right >= WINDOW_WIDTH and self.dx > 0):
+            self.dx = - self.dx
+        if (self.rect.top <= self.top and self.dy < 0) or (self.rect.bottom >= self.bottom and self.dy > 0):
+            self.dy = - self.dy
+
+class SpriteAssets:
+    '''A class to share one surface between every sprite of the same kind, color, and size'''
+    def __init__(self):
+        '''Initialize the sprite assets'''
+        # Map each (kind, color, size) to its surface.
+        self.surfaces = {}
+
+        # Count the surface requests and the surfaces created for them.
+        self.requests = 0
+        self.created = 0
+
+    def get(self, kind, color, size):
+        '''Return the shared surface for a kind ('rect' or 'circle'), color, and size, creating it on first use'''
+        self.requests += 1
+
+        # Surfaces truncate their size to whole pixels, so fractional sizes share the same surface.
+        key = (kind, color, (int(size[0]), int(size[1])))
+        surface = self.surfaces.get(key)
+        if surface is None:
+            surface = self.create(*key)
+            self.surfaces[key] = surface
+        return surface
+
+    def create(self, kind, color, size):
+        '''Create a surface, matching the display's pixel format if a display has been opened'''
+        self.created += 1
+        surface = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        if kind == 'circle':
+            surface.fill(BLACK)
+            pygame.draw.circle(surface, color, (size[0] / 2, size[1] / 2), size[0] / 2)
+        else:
+            surface.fill(color)
+        return surface
+
+# Define the sprite assets shared by every sprite in the process.
+SPRITE_ASSETS = SpriteAssets()
+
+class SpritePool:
+    '''A free list of sprites of one PooledSprite class, reset in place and reused instead of being created and garbage collected'''
+    def __init__(self, sprite_class):
+        '''Initialize the pool and attach it to its sprite class'''
+        self.sprite_class = sprite_class
+        sprite_class.pool = self
+
+        # Define the free sprites, reused last in, first out.
+        self.free = []
+
+        # Count the sprites reused from the free list, those created because it was empty, and those returned to it.
+        self.hits = 0
+        self.misses = 0
+        self.releases = 0
+
+        # Count the sprites handed out and not yet returned, and the most there have been at once.
+        self.in_use = 0
+        self.high_water = 0
+
+    def acquire(self, *args):
+        '''Return a sprite set up with the given arguments, reusing a free one if there is one'''
+        if self.free:
+            sprite = self.free.pop()
+            sprite.setup(*args)
+            self.hits += 1
+        else:
+            sprite = self.sprite_class(*args)
+            self.misses += 1
+        sprite.pooled = True
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return sprite
+
+    def release(self, sprite):
+        '''Return a sprite to the free list'''
+        sprite.pooled = False
+        self.free.append(sprite)
+        self.releases += 1
+        self.in_use -= 1
+
+    def stats(self):
+        '''Return the pool counters'''
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'releases': self.releases,
+            'in_use': self.in_use,
+            'free': len(self.free),
+            'high_water': self.high_water,
+        }
+
+# Define the ball, powerup, and missile pools shared by every simulation in the process.
+BALL_POOL = SpritePool(Ball)
+POWERUP_POOL = SpritePool(PowerUp)
+MISSILE_POOL = SpritePool(Missile)
+
+# Define the default powerup drop table.
+DROP_TABLE = AliasTable({None: NO_DROP_WEIGHT, **{ptype: row[0] for ptype, row in POWERUP_TYPES.items()}})
+
+class CompiledLevel:
+    '''A level that has been parsed and validated once, stored as one brick code per grid cell with its brick geometry precomputed.
+    Levels of any size are scaled to fill the width of the playfield and the top half of its height.'''
+    def __init__(self, brick_map, name, cells, columns=BRICK_COLUMNS):
+        '''Initialize the compiled level'''
+        self.brick_map = brick_map
+        self.name = name
+
+        # Check that the cells fill whole rows of a grid the playfield can show, with a known brick code in each.
+        if not cells or not 0 < columns <= MAX_LEVEL_COLUMNS or len(cells) % columns:
+            raise ValueError(f'{brick_map}: expected whole rows of 1 to {MAX_LEVEL_COLUMNS} cells, found {len(cells)} cells in rows of {columns}')
+        if len(cells) // columns > MAX_LEVEL_ROWS:
+            raise ValueError(f'{brick_map}: expected at most {MAX_LEVEL_ROWS} rows, found {len(cells) // columns}')
+        if max(cells) >= len(BRICK_TYPES):
+            raise ValueError(f'{brick_map}: unknown brick code {max(cells)}')
+
+        # Define the brick code of each cell, row by row, and the grid size. Code 0 is an empty cell.
+        self.cells = cells
+        self.columns = columns
+        self.rows = len(cells) // columns
+
+        # Map each HUD height to the precomputed bricks and the pre-rendered brick layer.
+        self.layouts = {}
+        self.layers = {}
+
+    def geometry(self):
+        '''Return the width and height of a brick and the horizontal and vertical gaps between bricks. The gaps shrink with the bricks
+        on levels too large for the standard gaps, so that they never take more than a fifth of the brick pitch.'''
+        horizontal_buffer = min(BRICK_HORIZONTAL_BUFFER, WINDOW_WIDTH / self.columns / 5)
+        vertical_buffer = min(BRICK_VERTICAL_BUFFER, WINDOW_HEIGHT / 2 / self.rows / 5)
+        brick_width = ((WINDOW_WIDTH) - (self.columns + 1) * horizontal_buffer) / self.columns
+        brick_height = ((WINDOW_HEIGHT) * (1/2) - (self.rows + 1) * vertical_buffer) / self.rows
+        return brick_width, brick_height, horizontal_buffer, vertical_buffer
+
+    def brick_size(self):
+        '''Return the width and height of a brick'''
+        return self.geometry()[:2]
+
+    def cell_size(self):
+        '''Return the brick pitch, used as the cell size of grids indexing the bricks'''
+        brick_width, brick_height, horizontal_buffer, vertical_buffer = self.geometry()
+        return max(int(brick_width + horizontal_buffer), 1), max(int(brick_height + vertical_buffer), 1)
+
+    def layout(self, HUD_height):
+        '''Return the (x, y, width, height, color) of every brick, computed once per HUD height'''
+        if HUD_height not in self.layouts:
+            brick_width, brick_height, horizontal_buffer, vertical_buffer = self.geometry()
+            bricks = []
+            for index, code in enumerate(self.cells):
+                if code:
+                    i, j = divmod(index, self.columns)
+                    x = horizontal_buffer * (j + 1) + brick_width * j
+                    y = vertical_buffer * (i + 1) + brick_height * i + HUD_height
+                    bricks.append((x, y, brick_width, brick_height, BRICK_TYPES[code][1]))
+            self.layouts[HUD_height] = tuple(bricks)
+        return self.layouts[HUD_height]
+
+    def layer(self, HUD_height):
+        '''Return a playfield-sized surface with every brick of the level drawn on black, rendered once per HUD height'''
+        if HUD_height not in self.layers:
+            layer = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT))
+            if pygame.display.get_surface() is not None:
+                layer = layer.convert()
+            layer.fill(BLACK)
+            for x, y, width, height, color in self.layout(HUD_height):
+                # Fill the same pixels that a Brick sprite's rect covers.
+                rect = pygame.Rect(0, 0, int(width), int(height))
+                rect.topleft = (x, y)
+                layer.fill(color, rect)
+            self.layers[HUD_height] = layer
+        return self.layers[HUD_height]
+
+class LevelCache:
+    '''A class to compile level files once and keep them in memory, and optionally on disk, until the files change'''
+    def __init__(self, cache_path=None):
+        '''Initialize the level cache'''
+        # Map each level file path to its modification time, size, and compiled level.
+        self.levels = {}
+
+        # Define the optional file that compiled levels are stored in between runs, and its entries: the modification time, size, brick
+        # codes, and column count of each level file. Entries stored in an older form are compiled again.
+        self.cache_path = cache_path
+        self.disk_entries = {}
+        if cache_path and os.path.exists(cache_path):
+            try:
+                with open(cache_path, 'rb') as cache_file:
+                    self.disk_entries = pickle.load(cache_file)
+            except (OSError, pickle.UnpicklingError, EOFError):
+                self.disk_entries = {}
+
+    def load(self, brick_map, name):
+        '''Return the compiled level for a level file, compiling it only if it is new or has changed'''
+        stat = os.stat(brick_map)
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        # Check the memory cache, then the disk cache, before parsing the file.
+        entry = self.levels.get(brick_map)
+        if entry is None or entry[0] != signature:
+            disk_entry = self.disk_entries.get(brick_map)
+            if disk_entry is not None and len(disk_entry) == 3 and disk_entry[0] == signature:
+                cells, columns = disk_entry[1:]
+            else:
+                cells, columns = compile_level_file(brick_map)
+                self.disk_entries[brick_map] = (signature, cells, columns)
+            entry = (signature, CompiledLevel(brick_map, name, cells, columns))
+            self.levels[brick_map] = entry
+
+        entry[1].name = name
+        return entry[1]
+
+    def load_directory(self, directory='levels'):
+        '''Compile every level file in a directory, then save the disk cache. Returns the compiled levels by file name.'''
+        compiled = {}
+        for file_name in sorted(os.listdir(directory)):
+            if file_name.endswith('.txt'):
+                compiled[file_name] = self.load(os.path.join(directory, file_name), file_name.removesuffix('.txt'))
+        self.save()
+        return compiled
+
+    def save(self):
+        '''Write the compiled levels to the disk cache, if one is used'''
+        if self.cache_path:
+            with open(self.cache_path, 'wb') as cache_file:
+                pickle.dump(self.disk_entries, cache_file, pickle.HIGHEST_PROTOCOL)
+
+def read_level_rows(brick_map):
+    '''Read a level file one row at a time, yielding each row as bytes of brick codes once it has been validated. Every row must have
+    the width of the first, and the level must fit within MAX_LEVEL_COLUMNS by MAX_LEVEL_ROWS.'''
+    columns = None
+    rows = 0
+    with open(brick_map, 'rb') as level_file:
+        for line in level_file:
+            line = line.rstrip(b'\r\n')
+            rows += 1
+
+            # Check the dimensions of the row.
+            if columns is None:
+                columns = len(line)
+                if not 0 < columns <= MAX_LEVEL_COLUMNS:
+                    raise ValueError(f'{brick_map}, row 1: expected 1 to {MAX_LEVEL_COLUMNS} characters, found {columns}')
+            elif len(line) != columns:
+                raise ValueError(f'{brick_map}, row {rows}: expected {columns} characters, found {len(line)}')
+            if rows > MAX_LEVEL_ROWS:
+                raise ValueError(f'{brick_map}: expected at most {MAX_LEVEL_ROWS} rows')
+
+            # Translate the row's characters to brick codes in one pass, then check for any that are not brick characters.
+            row = line.translate(LEVEL_TRANSLATION)
+            if 255 in row:
+                j = row.index(255)
+                raise ValueError(f'{brick_map}, row {rows}, column {j + 1}: unknown brick character {line[j:j + 1].decode(errors="replace")!r}')
+            yield row
+
+    if not rows:
+        raise ValueError(f'{brick_map}: the level has no rows')
+
+def compile_level_file(brick_map):
+    '''Parse and validate a level file, returning the brick code of every cell as a compact array, and the number of columns'''
+    cells = array('B')
+    columns = 0
+    for row in read_level_rows(brick_map):
+        cells.frombytes(row)
+        columns = len(row)
+    return cells, columns
+
+# Define the level cache shared by every simulation in the process.
+LEVEL_CACHE = LevelCache()
+
+class LevelManifest:
+    '''A class to list the levels of the game from a manifest file, in the order they are played.
+
+    The manifest gives the name and ball speed of each level, and either its level file or the seed of a generated level. It can end
+    with endless levels: generated from consecutive seeds, read from a packed level file when one has been made with
+    `python level_generator.py`, and played for as long as the player lasts. The manifest and the pack are read once, the first time a
+    level is asked for, and recently played generated levels are kept compiled, so level transitions do not read any files.'''
+    def __init__(self, path=LEVEL_MANIFEST_PATH):
+        '''Initialize the manifest'''
+        self.path = path
+
+        # Define the levels listed by the manifest, the endless level settings, and the packed level file, read on first use.
+        self.levels = None
+        self.endless = None
+        self.pack = None
+
+        # Map the seeds of recently played generated levels to their compiled levels, least recently played first.
+        self.generated = {}
+
+    def read(self):
+        '''Read the manifest file and open the endless levels' packed level file, if it has not been done already'''
+        if self.levels is not None:
+            return
+        with open(self.path) as manifest_file:
+            manifest = json.load(manifest_file)
+        directory = os.path.dirname(self.path)
+
+        # Level files are found relative to the manifest.
+        self.levels = []
+        for entry in manifest['levels']:
+            if 'file' in entry:
+                entry = dict(entry, file=os.path.join(directory, entry['file']))
+            self.levels.append(entry)
+
+        # Use the packed endless levels if they have been made. Without them, the same levels are generated as they are needed.
+        self.endless = manifest.get('endless')
+        if self.endless and self.endless.get('pack'):
+            pack_path = os.path.join(directory, self.endless['pack'])
+            if os.path.exists(pack_path):
+                self.pack = LevelPack(pack_path)
+
+    def last_level(self):
+        '''Return the number of the last level, or None if the levels are endless'''
+        self.read()
+        return None if self.endless else len(self.levels)
+
+    def entry(self, level_number):
+        '''Return the manifest entry of a level number, counting from 1'''
+        self.read()
+        if level_number <= len(self.levels):
+            return self.levels[level_number - 1]
+        if self.endless:
+            depth = level_number - len(self.levels)
+            return {'seed': self.endless['seed'] + depth - 1, 'ball_speed': self.endless_ball_speed(depth)}
+
+        # Levels played beyond the manifest (e.g. by the batch runner) use the speed of the last level.
+        return self.levels[-1]
+
+    def endless_ball_speed(self, depth):
+        '''Return the ball speed of an endless level, counting from 1 after the listed levels. The speed starts at the endless ball speed
+        and rises by 1 every speed_up_every levels, up to max_ball_speed.'''
+        speed_up_every = self.endless.get('speed_up_every')
+        if not speed_up_every:
+            return self.endless['ball_speed']
+        speed = self.endless['ball_speed'] + (depth - 1) // speed_up_every
+        return min(speed, self.endless.get('max_ball_speed', speed))
+
+    def ball_speed(self, level_number):
+        '''Return the speed balls are launched at on a level'''
+        return self.entry(level_number)['ball_speed']
+
+    def level(self, level_number, level_cache):
+        '''Return the compiled level of a level number, loading level files through a level cache'''
+        entry = self.entry(level_number)
+        if 'file' in entry:
+            return level_cache.load(entry['file'], entry['name'])
+        return self.generated_level(entry['seed'], entry.get('name'))
+
+    def find(self, brick_map, name, level_cache):
+        '''Return a compiled level from the brick map and name it was stored with, generating it again if it was generated'''
+        if brick_map.startswith(GENERATED_PREFIX):
+            return self.generated_level(int(brick_map.removeprefix(GENERATED_PREFIX)), name)
+        return level_cache.load(brick_map, name)
+
+    def generated_level(self, seed, name=None):
+        '''Return the compiled level generated from a seed, reading it from the pack if it is there'''
+        level = self.generated.pop(seed, None)
+        if level is None:
+            index = self.pack.find(seed) if self.pack is not None else None
+            if index is not None:
+                seed, packed_name, characters = self.pack[index]
+                name = name or packed_name
+                columns = self.pack.columns
+            else:
+                rows = generate_level(seed, ''.join(COLOR_DICTIONARY)[1:])
+                characters = ''.join(rows).encode()
+                name = name or generate_name(seed)
+                columns = len(rows[0])
+
+            # Translate the level file characters to brick codes, as a level file is compiled. Unknown characters become code 255, which
+            # CompiledLevel rejects.
+            cells = characters.translate(LEVEL_TRANSLATION)
+            level = CompiledLevel(f'{GENERATED_PREFIX}{seed}', name, array('B', cells), columns)
+
+            # Forget the least recently played level once there are too many.
+            if len(self.generated) >= GENERATED_LEVEL_LIMIT:
+                del self.generated[next(iter(self.generated))]
+
+        # Move the level to the end, as the most recently played.
+        self.generated[seed] = level
+        return level
+
+# Define the level manifest shared by every simulation in the process.
+LEVEL_MANIFEST = LevelManifest()
+
+# Define the headless helpers.
+def tracking_policy(simulation):
+    '''A simple paddle control policy that follows the lowest ball. Returns the (left, right) inputs.'''
+    # Find the ball that is closest to the bottom of the screen.
+    balls = simulation.ball_group.sprites()
+    if not balls:
+        return False, False
+    target = max(balls, key=lambda ball: ball.rect.bottom)
+
+    # Move the paddle toward the ball, allowing a small dead zone to avoid jitter.
+    offset = target.rect.centerx - simulation.paddle.rect.centerx
+    return offset < -simulation.paddle.velocity, offset > simulation.paddle.velocity
+
+def aiming_policy(simulation):
+    '''Follow the lowest ball, striking it with a different part of the paddle every two seconds so the ball does not settle into a loop'''
+    balls = simulation.ball_group.sprites()
+    if not balls:
+        return False, False
+    target = max(balls, key=lambda ball: ball.rect.bottom)
+    aim = (simulation.frame_counter // (TICKS_PER_SECOND * 2)) * 37 % 121 - 60
+    offset = target.rect.centerx + aim - simulation.paddle.rect.centerx
+    return offset < -simulation.paddle.velocity, offset > simulation.paddle.velocity
+
+def create_simulation(simulation_class=Simulation, seed=None, brick_group=None, start=True):
+    '''Create the player, paddle, and sprite groups, then build and start a simulation. A brick group may be given to use instead of a
+    new brick field, and with start=False the first level is not started, e.g. for a simulation whose state will be restored.'''
+    # Create the player.
+    player = Player()
+
+    # Create the paddle group and the Paddle object.
+    paddle_group = pygame.sprite.Group()
+    paddle = Paddle()
+    paddle_group.add(paddle)
+
+    # Create the ball, brick, and powerup groups (they are filled by start_new_level and during play).
+    ball_group = pygame.sprite.Group()
+    if brick_group is None:
+        brick_group = BrickField(BRICK_TYPES)
+    powerup_group = pygame.sprite.Group()
+
+    # Create the simulation and start the first level.
+    simulation = simulation_class(player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed=seed)
+    if start:
+        simulation.start_new_level()
+    return simulation
+
+def run_headless(ticks, policy=tracking_policy, simulation=None):
+    '''Step a simulation for a number of ticks as fast as possible. Returns the simulation and the elapsed time in seconds.'''
+    if simulation is None:
+        simulation = create_simulation()
+
+    # Step the simulation without rendering, audio, or a frame rate throttle.
+    start_time = time.perf_counter()
+    for tick in range(ticks):
+        left, right = policy(simulation)
+        simulation.step(left, right)
+    elapsed = time.perf_counter() - start_time
+
+    return simulation, elapsed
+
+if __name__ == '__main__':
+    # Import the argparse library to read the command line options.
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Run a headless Brick Breaker simulation.')
+    parser.add_argument('--ticks', type=int, default=TICKS_PER_SECOND * 60, help='number of fixed timestep ticks to simulate')
+    parser.add_argument('--seed', type=int, default=None, help='seed for the game\'s random number generator')
+    args = parser.parse_args()
+
+    simulation, elapsed = run_headless(args.ticks, simulation=create_simulation(seed=args.seed))
+    print(f'Simulated {args.ticks} ticks ({args.ticks / TICKS_PER_SECOND:.1f} s of game time) in {elapsed:.3f} s: {args.ticks / elapsed:.0f} ticks/s')
+    print(f'Level: {simulation.level_number}  Score: {simulation.player.score}  Lives: {simulation.player.lives}  Bricks left: {len(simulation.brick_group)}')
+    print(f'Ball pool: {BALL_POOL.stats()}')
+    print(f'Powerup pool: {POWERUP_POOL.stats()}')
@@ -0,0 +1,231 @@
+'''
+Brick Breaker - Game State Snapshots
+'''
+
+# Import the struct and array libraries to pack snapshots.
+import struct
+from array import array
+
+# Import the operator library to mask the level's bricks with the standing brick bitmap.
+import operator
+
+# Import the headless simulation core.
+from simulation import TICKS_PER_SECOND, POWERUP_TYPES, create_simulation
+
+# Set the snapshot layout. The header holds the file signature, format version, frame counter, level number, level timer, lives, score,
+# paddle position, paddle boosts, missile launchers, and number of effects started so far. It is followed by the level's file and name,
+# the bricks as a bitmap of the standing cells and a list of damaged bricks, tables of the balls, powerups, missiles, monkeys, and effect
+# timers, and the random number generator's state.
+MAGIC = b'BBSS'
+VERSION = 1
+HEADER = struct.Struct('<4sHIIIHqiiHHI')
+LENGTH = struct.Struct('<I')
+TABLE = struct.Struct('<IB')
+RANDOM = struct.Struct('<BBd')
+
+# Set the power-up type names in the order their indices are stored.
+POWERUP_NAMES = list(POWERUP_TYPES)
+
+# Set the tables that translate brick codes to '0' for an empty cell and '1' for a standing brick, and back from '0' and '1' to 0 and 1.
+STANDING_DIGITS = b'0' + b'1' * 255
+DIGIT_VALUES = bytes(1 if byte == ord('1') else 0 for byte in range(256))
+
+def take_snapshot(simulation):
+    '''Return the simulation's game state packed into a compact snapshot'''
+    state = simulation.get_state(bricks=False)
+    data = bytearray(HEADER.pack(MAGIC, VERSION, state['frame_counter'], state['level_number'], state['level_timer'], *state['player'],
+                                 *state['paddle'], *state['boosts'], state['effects'][1]))
+    for text in state['level']:
+        pack_bytes(data, text.encode())
+
+    # Store which cells of the level still hold a brick, one bit per cell, and the codes of the bricks that have been damaged since the
+    # level started.
+    level_cells = simulation.level.cells
+    grid = simulation.brick_group.grid()
+    standing = grid.translate(STANDING_DIGITS)
+    pack_bytes(data, int(standing, 2).to_bytes((len(standing) + 7) // 8, 'little') if standing else b'')
+    expected = bytes(map(operator.mul, standing.translate(DIGIT_VALUES), level_cells))
+    damaged = []
+    if grid != expected:
+        # Only compare the cells of the rows that differ.
+        columns = simulation.level.columns
+        for start in range(0, len(grid), columns):
+            end = start + columns
+            if grid[start:end] != expected[start:end]:
+                damaged += [(start + j, code) for j, (code, expected_code) in enumerate(zip(grid[start:end], expected[start:end])) if code != expected_code]
+    pack_table(data, damaged, 2)
+
+    # Store the moving objects and effects. Power-up types are stored by their index.
+    ball_states = state['balls']
+    pack_table(data, ball_states, len(ball_states[0]) if ball_states else 0)
+    pack_table(data, [(x, y, POWERUP_NAMES.index(ptype)) for x, y, ptype in state['powerups']], 3)
+    pack_table(data, state['missiles'], 2)
+    pack_table(data, state['monkeys'], 4)
+    pack_table(data, [(expires, order, POWERUP_NAMES.index(name)) for expires, order, name in state['effects'][0]], 3)
+
+    # Store the random number generator's state.
+    version, internal_state, gauss_next = state['random']
+    data += RANDOM.pack(version, gauss_next is not None, gauss_next or 0.0)
+    pack_bytes(data, array('I', internal_state).tobytes())
+    return bytes(data)
+
+def restore_snapshot(simulation, snapshot):
+    '''Restore the game state packed into a snapshot'''
+    magic, version, frame_counter, level_number, level_timer, lives, score, paddle_x, paddle_y, paddle_boosts, missile_launchers, effects_started = HEADER.unpack_from(snapshot)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError('Not a Brick Breaker snapshot, or written by an unsupported version.')
+    offset = HEADER.size
+    brick_map, offset = unpack_bytes(snapshot, offset)
+    name, offset = unpack_bytes(snapshot, offset)
+    bitmap, offset = unpack_bytes(snapshot, offset)
+    damaged, offset = unpack_table(snapshot, offset)
+    ball_states, offset = unpack_table(snapshot, offset)
+    powerups, offset = unpack_table(snapshot, offset)
+    missiles, offset = unpack_table(snapshot, offset)
+    monkeys, offset = unpack_table(snapshot, offset)
+    effects, offset = unpack_table(snapshot, offset)
+    random_version, has_gauss, gauss_next = RANDOM.unpack_from(snapshot, offset)
+    internal_state, offset = unpack_bytes(snapshot, offset + RANDOM.size)
+
+    simulation.set_state({
+        'frame_counter': frame_counter,
+        'level_number': level_number,
+        'level_timer': level_timer,
+        'level': (brick_map.decode(), name.decode()),
+        'player': (lives, score),
+        'paddle': (paddle_x, paddle_y),
+        'balls': ball_states,
+        'powerups': [(x, y, POWERUP_NAMES[index]) for x, y, index in powerups],
+        'effects': ([(expires, order, POWERUP_NAMES[index]) for expires, order, index in effects], effects_started),
+        'boosts': (paddle_boosts, missile_launchers),
+        'missiles': missiles,
+        'monkeys': monkeys,
+        'random': (random_version, tuple(array('I', internal_state)), gauss_next if has_gauss else None),
+    })
+
+    # Lay out the level's bricks that were standing, then put back the damaged bricks' codes.
+    level_cells = simulation.level.cells
+    standing = format(int.from_bytes(bitmap, 'little'), f'0{len(level_cells)}b').encode() if bitmap else b''
+    grid = bytearray(map(operator.mul, standing.translate(DIGIT_VALUES), level_cells))
+    for index, code in damaged:
+        grid[index] = code
+    simulation.brick_group.load(simulation.level, simulation.HUD_height, grid)
+
+def save_snapshot(simulation, path):
+    '''Write a snapshot of the simulation to a file'''
+    with open(path, 'wb') as snapshot_file:
+        snapshot_file.write(take_snapshot(simulation))
+
+def load_snapshot(simulation, path):
+    '''Restore a simulation from a snapshot file'''
+    with open(path, 'rb') as snapshot_file:
+        restore_snapshot(simulation, snapshot_file.read())
+
+def fork(simulation, simulation_class=None):
+    '''Return a new headless simulation in the same state as a simulation, e.g. to look ahead without changing the game. The fork shares
+    the level's bricks with the simulation until either of them breaks one (see BrickField.fork), so forking does not depend on the
+    number of bricks. The fork is of the simulation's own class unless another is given, e.g. the headless class a windowed game is
+    built on.'''
+    forked = create_simulation(simulation_class or type(simulation), simulation.seed, simulation.brick_group.fork(), start=False)
+    forked.level_cache = simulation.level_cache
+    forked.level_manifest = simulation.level_manifest
+    forked.level = simulation.level
+    forked.set_state(simulation.get_state(bricks=False))
+    return forked
+
+def pack_bytes(data, value):
+    '''Append a length and the bytes it counts'''
+    data += LENGTH.pack(len(value))
+    data += value
+
+def unpack_bytes(data, offset):
+    '''Read bytes stored by pack_bytes, returning them and the offset just past them'''
+    length, = LENGTH.unpack_from(data, offset)
+    offset += LENGTH.size
+    return data[offset:offset + length], offset + length
+
+def pack_table(data, rows, width):
+    '''Append a table of rows of numbers, all of the same width, as doubles followed by one flag per number marking the integers, so that
+    every number comes back as the type it was stored as'''
+    values = [value for row in rows for value in row]
+    data += TABLE.pack(len(rows), width)
+    data += array('d', values).tobytes()
+    data += bytes(type(value) is int for value in values)
+
+def unpack_table(data, offset):
+    '''Read a table stored by pack_table, returning its rows as tuples and the offset just past it'''
+    count, width = TABLE.unpack_from(data, offset)
+    offset += TABLE.size
+    size = count * width
+    values = array('d')
+    values.frombytes(data[offset:offset + size * 8])
+    offset += size * 8
+    values = [int(value) if is_int else value for value, is_int in zip(values, data[offset:offset + size])]
+    return [tuple(values[i:i + width]) for i in range(0, size, width)], offset + size
+
+# Define classes.
+class Checkpoints:
+    '''A class to keep snapshots of a simulation every interval ticks, for seeking back through a long headless run or replay. Each
+    checkpoint is a few kilobytes, so a run can keep thousands of them.'''
+    def __init__(self, simulation, interval=TICKS_PER_SECOND * 10):
+        '''Initialize the checkpoints and take the first one'''
+        self.simulation = simulation
+        self.interval = interval
+
+        # Map each checkpoint tick to its snapshot.
+        self.snapshots = {}
+        self.take()
+
+    def take(self):
+        '''Take a checkpoint at the simulation's current tick'''
+        self.snapshots[self.simulation.frame_counter] = take_snapshot(self.simulation)
+
+    def update(self):
+        '''Take a checkpoint if the simulation is on a checkpoint tick that does not have one yet'''
+        tick = self.simulation.frame_counter
+        if tick % self.interval == 0 and tick not in self.snapshots:
+            self.take()
+
+    def step(self, left=False, right=False):
+        '''Step the simulation one tick, taking a checkpoint if it is due'''
+        self.simulation.step(left, right)
+        self.update()
+
+    def latest(self, tick):
+        '''Return the tick of the last checkpoint at or before a tick'''
+        return max(checkpoint_tick for checkpoint_tick in self.snapshots if checkpoint_tick <= tick)
+
+    def rewind(self, tick):
+        '''Restore the last checkpoint at or before a tick, and return its tick'''
+        checkpoint_tick = self.latest(tick)
+        restore_snapshot(self.simulation, self.snapshots[checkpoint_tick])
+        return checkpoint_tick
+
+if __name__ == '__main__':
+    # Import the argparse and time libraries to read the command line options and time the snapshots.
+    import argparse
+    import time
+
+    # Import the headless helpers.
+    from simulation import run_headless
+
+    parser = argparse.ArgumentParser(description='Measure the size and speed of Brick Breaker snapshots.')
+    parser.add_argument('--ticks', type=int, default=TICKS_PER_SECOND * 60, help='number of ticks to play before taking snapshots')
+    parser.add_argument('--seed', type=int, default=1, help='seed for the game\'s random number generator')
+    parser.add_argument('--repeat', type=int, default=1000, help='number of snapshots to take and restore')
+    args = parser.parse_args()
+
+    simulation, elapsed = run_headless(args.ticks, simulation=create_simulation(seed=args.seed))
+    start_time = time.perf_counter()
+    for i in range(args.repeat):
+        snapshot = take_snapshot(simulation)
+    take_time = (time.perf_counter() - start_time) / args.repeat
+    start_time = time.perf_counter()
+    for i in range(args.repeat):
+        restore_snapshot(simulation, snapshot)
+    restore_time = (time.perf_counter() - start_time) / args.repeat
+    start_time = time.perf_counter()
+    for i in range(args.repeat):
+        fork(simulation)
+    fork_time = (time.perf_counter() - start_time) / args.repeat
+    print(f'Snapshot of {len(snapshot)} bytes: take {take_time * 1000:.3f} ms, restore {restore_time * 1000:.3f} ms, fork {fork_time * 1000:.3f} ms')
@@ -0,0 +1,216 @@
+'''
+Brick Breaker - Swept Collision Detection
+'''
+
+# Import the pygame libary.
+import pygame
+
+# Import the headless simulation core.
+from simulation import WINDOW_WIDTH, Simulation
+
+# Define classes.
+class SweptSimulation(Simulation):
+    '''A Simulation that sweeps each ball along its path every tick, resolving every wall, paddle, and brick contact at its exact time of impact'''
+    def __init__(self, player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed=None, max_bounces=8):
+        '''Initialize the simulation'''
+        super().__init__(player, paddle, paddle_group, ball_group, brick_group, powerup_group, seed)
+
+        # Define the most contacts resolved for a single ball in one tick.
+        self.max_bounces = max_bounces
+
+        # Map each ball to its sub-pixel center and the rect position that center was last written to.
+        self.ball_positions = {}
+
+    def move_balls(self):
+        '''Sweep every ball through one tick of movement'''
+        # Keep positions only for the balls still in play.
+        previous_positions, self.ball_positions = self.ball_positions, {}
+        paddle_hit = False
+        for ball in self.ball_group:
+            paddle_hit |= self.sweep_ball(ball, previous_positions.get(ball))
+        if paddle_hit:
+            self.on_paddle_hit()
+
+    def ball_center(self, ball, position):
+        '''Return the sub-pixel center of a ball, starting again from its rect if something else has moved it'''
+        if position is None or position[2] != ball.rect.topleft:
+            return float(ball.rect.centerx), float(ball.rect.centery)
+        return position[0], position[1]
+
+    def sweep_ball(self, ball, position=None):
+        '''Move one ball through a tick, bouncing at each contact. Returns True if the ball struck the paddle.'''
+        radius = ball.diameter / 2
+        x, y = self.ball_center(ball, position)
+        remaining = 1.0
+        paddle_hit = False
+
+        # A ball pushed into the paddle from the side or above is deflected at once, as the overlap rule did.
+        if ball.dy > 0 and self.paddle.rect.colliderect(ball.rect):
+            self.deflect(ball, x)
+            paddle_hit = True
+
+        for bounce in range(self.max_bounces):
+            move_x = ball.dx * ball.velocity * remaining
+            move_y = ball.dy * ball.velocity * remaining
+
+            # Find the earliest contact along the remaining path.
+            contact = self.first_contact(x, y, move_x, move_y, radius, ball.dy > 0)
+            if contact is None:
+                x += move_x
+                y += move_y
+                break
+            t, normal_x, normal_y, target = contact
+
+            # Move the ball to the point of contact.
+            x += move_x * t
+            y += move_y * t
+            remaining *= 1 - t
+
+            # Respond to the contact.
+            if target is self.paddle:
+                self.deflect(ball, x)
+                paddle_hit = True
+            else:
+                reflect(ball, normal_x, normal_y)
+                if target is not None:
+                    self.strike_brick(target)
+        else:
+            # Out of bounces: spend the rest of the tick in a straight line.
+            x += ball.dx * ball.velocity * remaining
+            y += ball.dy * ball.velocity * remaining
+
+        # Write the new center back to the ball's rect.
+        ball.rect.center = (round(x), round(y))
+        self.ball_positions[ball] = (x, y, ball.rect.topleft)
+        return paddle_hit
+
+    def get_ball_states(self):
+        '''Return the state of every ball, including its sub-pixel center'''
+        ball_states = []
+        for ball in self.ball_group:
+            x, y = self.ball_center(ball, self.ball_positions.get(ball))
+            ball_states.append((ball.rect.x, ball.rect.y, ball.dx, ball.dy, ball.velocity, x, y))
+        return ball_states
+
+    def set_ball_states(self, ball_states):
+        '''Replace the balls with ones in the given states, including their sub-pixel centers'''
+        super().set_ball_states([ball_state[:5] for ball_state in ball_states])
+        self.ball_positions = {}
+        for ball, ball_state in zip(self.ball_group, ball_states):
+            self.ball_positions[ball] = (ball_state[5], ball_state[6], ball.rect.topleft)
+
+    def first_contact(self, x, y, move_x, move_y, radius, falling):
+        '''Return (t, normal_x, normal_y, target) for the earliest contact along a move, where target is a brick, the paddle, or None for a wall'''
+        best = None
+
+        # Check the left, right, and top walls.
+        for t, normal_x, normal_y in wall_contacts(x, y, move_x, move_y, radius, self.HUD_height):
+            if best is None or t < best[0]:
+                best = (t, normal_x, normal_y, None)
+
+        # Check the bricks near the path of the ball.
+        path = pygame.Rect(min(x, x + move_x) - radius, min(y, y + move_y) - radius, abs(move_x) + radius * 2 + 2, abs(move_y) + radius * 2 + 2)
+        for brick in self.brick_group.query(path):
+            contact = sweep_circle_rect(x, y, move_x, move_y, radius, brick.rect)
+            if contact and (best is None or contact[0] < best[0]):
+                best = contact + (brick,)
+
+        # Check the paddle, which only catches a falling ball.
+        if falling:
+            contact = sweep_circle_rect(x, y, move_x, move_y, radius, self.paddle.rect)
+            if contact and (best is None or contact[0] < best[0]):
+                best = contact + (self.paddle,)
+
+        return best
+
+    def deflect(self, ball, x):
+        '''Bounce a ball off the paddle based on where it struck it'''
+        alpha = x - self.paddle.rect.centerx
+        beta = self.paddle.width / 2
+        ball.dx = max(-1.4, min(1.4, alpha / beta))
+        ball.dy = - (2 - (ball.dx) ** 2) ** 0.5
+
+    def check_wall_collisions(self):
+        '''Walls are handled while the balls are swept'''
+        pass
+
+    def check_paddle_collisions(self):
+        '''The paddle is handled while the balls are swept'''
+        pass
+
+    def check_brick_collisions(self):
+        '''Bricks are handled while the balls are swept'''
+        pass
+
+def reflect(ball, normal_x, normal_y):
+    '''Reflect a ball's direction about a unit surface normal'''
+    dot = ball.dx * normal_x + ball.dy * normal_y
+    ball.dx -= 2 * dot * normal_x
+    ball.dy -= 2 * dot * normal_y
+
+def wall_contacts(x, y, move_x, move_y, radius, top):
+    '''Yield (t, normal_x, normal_y) for each wall the ball reaches during a move'''
+    contacts = []
+    if move_x < 0:
+        contacts.append(((radius - x) / move_x, 1.0, 0.0))
+    if move_x > 0:
+        contacts.append(((WINDOW_WIDTH - radius - x) / move_x, -1.0, 0.0))
+    if move_y < 0:
+        contacts.append(((top + radius - y) / move_y, 0.0, 1.0))
+    for t, normal_x, normal_y in contacts:
+        if t <= 1:
+            yield max(0.0, t), normal_x, normal_y
+
+def sweep_circle_rect(x, y, move_x, move_y, radius, rect):
+    '''Return (t, normal_x, normal_y) for the first time in [0, 1] that a moving circle touches a rect, or None if it does not'''
+    # Sweep the center against the rect grown by the radius (the slab method).
+    t_enter, t_exit = 0.0, 1.0
+    normal_x, normal_y = 0.0, 0.0
+    for position, move, low, high, axis in ((x, move_x, rect.left - radius, rect.right + radius, 0), (y, move_y, rect.top - radius, rect.bottom + radius, 1)):
+        if move == 0:
+            if position <= low or position >= high:
+                return None
+            continue
+        t_low = (low - position) / move
+        t_high = (high - position) / move
+        if t_low > t_high:
+            t_low, t_high = t_high, t_low
+        if t_low >= t_enter:
+            t_enter = t_low
+            normal = -1.0 if move > 0 else 1.0
+            normal_x, normal_y = (normal, 0.0) if axis == 0 else (0.0, normal)
+        t_exit = min(t_exit, t_high)
+        if t_enter > t_exit:
+            return None
+
+    # If the entry point lies beyond a corner of the rect, the contact is with the rounded corner instead.
+    # This includes a circle that starts in a corner square of the grown rect without touching the corner.
+    hit_x = x + move_x * t_enter
+    hit_y = y + move_y * t_enter
+    corner_x = rect.left if hit_x < rect.left else rect.right if hit_x > rect.right else None
+    corner_y = rect.top if hit_y < rect.top else rect.bottom if hit_y > rect.bottom else None
+    if corner_x is not None and corner_y is not None:
+        return sweep_circle_point(x, y, move_x, move_y, radius, corner_x, corner_y)
+
+    # A circle that already overlaps the rect is not a new contact.
+    if normal_x == 0 and normal_y == 0:
+        return None
+    return t_enter, normal_x, normal_y
+
+def sweep_circle_point(x, y, move_x, move_y, radius, point_x, point_y):
+    '''Return (t, normal_x, normal_y) for the first time in [0, 1] that a moving circle touches a point, or None if it does not'''
+    # Solve |(x, y) + t * move - point| = radius for the smallest t.
+    offset_x = x - point_x
+    offset_y = y - point_y
+    a = move_x * move_x + move_y * move_y
+    b = offset_x * move_x + offset_y * move_y
+    c = offset_x * offset_x + offset_y * offset_y - radius * radius
+    discriminant = b * b - a * c
+    if a == 0 or b >= 0 or discriminant < 0:
+        return None
+    t = (-b - discriminant ** 0.5) / a
+    if t < 0 or t > 1:
+        return None
+    normal_x = (offset_x + move_x * t) / radius
+    normal_y = (offset_y + move_y * t) / radius
+    return t, normal_x, normal_y
@@ -0,0 +1,35 @@
+'''
+Brick Breaker - Test Configuration
+'''
+
+# Import the os and sys libraries to run the tests from the repository root, where the game finds its levels and assets.
+import os
+import sys
+
+# Import the array class to build custom levels.
+from array import array
+
+# Import the pytest library.
+import pytest
+
+# Run pygame without a window or an audio device.
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+os.environ.setdefault('PYGAME_HIDE_SUPPORT_PROMPT', '1')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+# Import the level compiler.
+from simulation import LEVEL_TRANSLATION, CompiledLevel
+
+def make_level(rows, name='test'):
+    '''Return a compiled level from its rows of level file characters'''
+    cells = array('B', ''.join(rows).encode().translate(LEVEL_TRANSLATION))
+    return CompiledLevel(name, name, cells, len(rows[0]))
+
+@pytest.fixture
+def hard_level():
+    '''A level of a row of indestructible bricks above a row of three-hit bricks'''
+    return make_level(['#' * 11, 'X' * 11, '3' * 11] + ['X' * 11] * 9, 'hard')
@@ -0,0 +1,67 @@
+'''
+Brick Breaker - Audio Mixer Tests
+'''
+
+# Import the sound mixer.
+from audio import SoundMixer
+
+# Define classes.
+class Channel:
+    '''A stand-in for a pygame mixer channel that records the sounds played on it'''
+    def __init__(self, busy=False):
+        '''Initialize the channel'''
+        self.busy = busy
+        self.played = []
+
+    def get_busy(self):
+        '''Return whether a sound is playing on the channel'''
+        return self.busy
+
+    def play(self, sound):
+        '''Start playing a sound on the channel'''
+        self.played.append(sound)
+        self.busy = True
+
+def loaded_mixer(channels):
+    '''Return a mixer of the game's sounds that plays on stand-in channels, as though load() had run'''
+    mixer = SoundMixer()
+    mixer.sounds = {name: name for name in mixer.sound_files}
+    mixer.channels = channels
+    mixer.loaded = True
+    return mixer
+
+def test_sound_asked_for_many_times_in_a_frame_plays_once():
+    '''Every brick hit of a frame is merged into one brick hit sound'''
+    channels = [[Channel()], [Channel()], [Channel(), Channel()]]
+    mixer = loaded_mixer(channels)
+    for i in range(5):
+        mixer.play('brick_hit')
+    mixer.flush()
+    assert channels[2][0].played == ['brick_hit']
+    assert channels[2][1].played == []
+    assert mixer.stats() == {'requested': 5, 'played': 1, 'merged': 4, 'skipped': 0}
+
+    # The next frame plays it again.
+    mixer.play('brick_hit')
+    mixer.flush()
+    assert channels[2][1].played == ['brick_hit']
+    assert mixer.report() == 'sounds 6 asked, 2 played, 4 merged, 0 skipped'
+
+def test_higher_priority_sound_takes_a_lower_priority_channel():
+    '''A life lost sound whose own channel is busy takes the idle brick hit channel, and the brick hit of the same frame is skipped'''
+    channels = [[Channel(busy=True)], [Channel(busy=True)], [Channel()]]
+    mixer = loaded_mixer(channels)
+    mixer.play('brick_hit')
+    mixer.play('life_loss')
+    mixer.flush()
+    assert channels[2][0].played == ['life_loss']
+    assert mixer.stats() == {'requested': 2, 'played': 1, 'merged': 0, 'skipped': 1}
+
+def test_lower_priority_sound_does_not_take_a_higher_priority_channel():
+    '''A brick hit sound whose channels are busy is skipped rather than taking an idle channel of a higher priority'''
+    channels = [[Channel()], [Channel()], [Channel(busy=True)]]
+    mixer = loaded_mixer(channels)
+    mixer.play('brick_hit')
+    mixer.flush()
+    assert channels[0][0].played == channels[1][0].played == []
+    assert mixer.skipped == 1
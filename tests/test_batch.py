@@ -0,0 +1,57 @@
+'''
+Brick Breaker - Batch Simulator Tests
+'''
+
+# Import the pytest library.
+import pytest
+
+# Import the headless simulation core and the batch simulator.
+from simulation import TICKS_PER_SECOND
+from batch import run_batch, summarize
+
+def game(level, outcome, seconds, score, lives_lost=0, bricks_broken=0, powerups_dropped=0, powerups_collected=0):
+    '''Return the results of one game, as play_game does'''
+    return {'level': level, 'seed': 0, 'outcome': outcome, 'ticks': seconds * TICKS_PER_SECOND, 'score': score, 'lives_lost': lives_lost,
+            'bricks_broken': bricks_broken, 'powerups_dropped': powerups_dropped, 'powerups_collected': powerups_collected}
+
+def test_summarize_aggregates_each_level():
+    '''Each level's statistics are taken from its own games only'''
+    summary = summarize([
+        game('1: Heart', 'cleared', 30, 500, 1, 60, 10, 5),
+        game('1: Heart', 'cleared', 50, 700, 0, 60, 14, 7),
+        game('1: Heart', 'game_over', 20, 100, 3, 20, 4, 0),
+        game('1: Heart', 'timeout', 100, 300, 2, 40, 0, 0),
+        game('2: Box', 'game_over', 10, 50, 3, 5, 0, 0),
+    ])
+    assert list(summary) == ['1: Heart', '2: Box']
+    heart = summary['1: Heart']
+    assert heart['games'] == 4
+    assert heart['clear_rate'] == 0.5
+    assert heart['game_over_rate'] == 0.25
+    assert heart['timeout_rate'] == 0.25
+    assert (heart['clear_time_p50'], heart['clear_time_p95'], heart['clear_time_mean']) == (30, 30, 40)
+    assert heart['lives_lost_mean'] == 1.5
+    assert (heart['score_min'], heart['score_p50'], heart['score_max'], heart['score_mean']) == (100, 300, 700, 400)
+    assert heart['bricks_per_second'] == 180 / 200
+    assert heart['powerup_pickup_rate'] == 12 / 28
+
+    box = summary['2: Box']
+    assert box['clear_rate'] == 0.0
+    assert box['clear_time_p50'] is None and box['clear_time_mean'] is None
+    assert box['powerup_pickup_rate'] is None
+
+def test_seeded_batch_summary():
+    '''A small seeded batch gives the same results every run, and its summary counts every game of each level'''
+    results = run_batch([1, 2], 3, max_ticks=TICKS_PER_SECOND * 20, workers=1)
+    assert results == run_batch([1, 2], 3, max_ticks=TICKS_PER_SECOND * 20, workers=1)
+    assert [result['seed'] for result in results] == [0, 1, 2] * 2
+
+    summary = summarize(results)
+    assert list(summary) == ['1: Heart', '2: Box']
+    for level, stats in summary.items():
+        games = [result for result in results if result['level'] == level]
+        assert stats['games'] == 3
+        assert stats['clear_rate'] + stats['game_over_rate'] + stats['timeout_rate'] == pytest.approx(1.0)
+        assert stats['score_min'] == min(result['score'] for result in games)
+        assert stats['score_max'] == max(result['score'] for result in games)
+        assert stats['bricks_per_second'] == sum(result['bricks_broken'] for result in games) / (sum(result['ticks'] for result in games) / TICKS_PER_SECOND)
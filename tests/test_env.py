@@ -0,0 +1,51 @@
+'''
+Brick Breaker - Reinforcement Learning Environment Tests
+'''
+
+# Import the pytest library, and skip these tests if NumPy is not installed.
+import pytest
+numpy = pytest.importorskip('numpy')
+
+# Import the environments.
+from env import BrickBreakerEnv, VectorEnv
+
+def run_env(env, seed, actions):
+    '''Reset an environment with a seed, step it through a list of actions, and return every observation, reward, and flag'''
+    observation, info = env.reset(seed)
+    steps = [observation.copy()]
+    for action in actions:
+        observation, reward, terminated, truncated, info = env.step(action)
+        steps.append((observation.copy(), reward, terminated, truncated))
+        if terminated or truncated:
+            break
+    return steps
+
+def test_env_reset_seed_repeats_episode():
+    '''Resetting with the same seed and taking the same actions gives the same observations, rewards, and end of the episode'''
+    actions = [tick // 40 % 3 for tick in range(2000)]
+    env = BrickBreakerEnv(max_ticks=1500, frame_skip=4)
+    first = run_env(env, 5, actions)
+    second = run_env(env, 5, actions)
+    assert first[-1][2] or first[-1][3]
+    assert len(first) == len(second)
+    assert numpy.array_equal(first[0], second[0])
+    for (observation, reward, terminated, truncated), expected in zip(second[1:], first[1:]):
+        assert numpy.array_equal(observation, expected[0])
+        assert (reward, terminated, truncated) == expected[1:]
+    assert any(step[1] for step in first[1:])
+
+def test_vector_env_reset_seed_repeats_episodes():
+    '''Resetting a vector environment with the same seed and taking the same actions gives the same batches'''
+    env = VectorEnv(3, max_ticks=600, frame_skip=2)
+    runs = []
+    for run in range(2):
+        steps = [env.reset(9).copy()]
+        for tick in range(400):
+            observations, rewards, terminated, truncated, infos = env.step([(tick // 20 + i) % 3 for i in range(3)])
+            steps.append((observations.copy(), rewards.copy(), terminated.copy(), truncated.copy()))
+        runs.append(steps)
+    assert numpy.array_equal(runs[0][0], runs[1][0])
+    for batch, expected in zip(runs[1][1:], runs[0][1:]):
+        for array, expected_array in zip(batch, expected):
+            assert numpy.array_equal(array, expected_array)
+    assert any(step[2].any() or step[3].any() for step in runs[0][1:])
@@ -0,0 +1,47 @@
+'''
+Brick Breaker - Game State Tests
+'''
+
+# Import the pygame library. Only events are made here, so no display is opened.
+import pygame
+
+# Import the game state machine.
+from game_state import PLAYING, PAUSED, LEVEL_INTRO, GAME_OVER, GameStateMachine
+
+def key_event(key):
+    '''Return a key press event'''
+    return pygame.event.Event(pygame.KEYDOWN, key=key)
+
+def test_screens_are_shown_in_the_order_they_are_queued():
+    '''Screens queued in one tick are shown one after another, and the game plays once the last is dismissed'''
+    states = GameStateMachine()
+    assert states.state == PLAYING
+    assert not states.paused
+    assert states.screen is None
+
+    game_over = states.enter(GAME_OVER, 'Game Over', 'Press ENTER to play again')
+    states.enter(LEVEL_INTRO, 'Level: 1', 'Press ENTER to continue')
+    assert states.paused
+    assert states.state == GAME_OVER
+    assert states.screen is game_over
+
+    assert states.handle(key_event(pygame.K_RETURN))
+    assert states.paused
+    assert states.state == LEVEL_INTRO
+
+    assert states.handle(key_event(pygame.K_KP_ENTER))
+    assert not states.paused
+    assert states.state == PLAYING
+
+def test_only_continue_keys_dismiss_a_screen():
+    '''Other keys and events leave the screen up, and continue keys do nothing while playing'''
+    states = GameStateMachine()
+    assert not states.handle(key_event(pygame.K_RETURN))
+
+    states.enter(PAUSED, 'Paused', 'Press ENTER to Continue')
+    assert not states.handle(key_event(pygame.K_SPACE))
+    assert not states.handle(pygame.event.Event(pygame.KEYUP, key=pygame.K_RETURN))
+    assert not states.handle(pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=1, pos=(0, 0)))
+    assert states.state == PAUSED
+    assert states.handle(key_event(pygame.K_RETURN))
+    assert states.state == PLAYING
@@ -0,0 +1,36 @@
+'''
+Brick Breaker - HUD Tests
+'''
+
+# Import the pygame library.
+import pygame
+
+# Import the cached HUD and the frame profiler overlay.
+from hud import HUD
+from profiler import FrameProfiler, ProfilerOverlay
+
+def test_unchanged_fields_are_not_rendered_again():
+    '''Drawing the same score, timer, and lives again blits the cached text, and the saving is reported'''
+    pygame.font.init()
+    hud = HUD(pygame.font.Font(None, 32), 1200, 40)
+    surface = pygame.Surface((1200, 40))
+    hud.draw(surface, 0, 0, 3)
+    hud.draw(surface, 0, 0, 3)
+    hud.draw(surface, 10, 0, 3)
+    stats = hud.stats()
+    assert stats['renders'] == 4
+    assert stats['cache_hits'] == 5
+    assert stats['saved_ms_per_frame'] > 0
+    assert hud.report().startswith('HUD ')
+
+def test_overlay_shows_counters():
+    '''The profiler overlay adds a line for each of its counters below the percentile table'''
+    pygame.font.init()
+    profiler = FrameProfiler()
+    profiler.begin_frame()
+    profiler.add('render', 0.001)
+    profiler.end_frame()
+    overlay = ProfilerOverlay(profiler, pygame.font.Font(None, 22), pygame.Rect(0, 0, 420, 370), counters=[lambda: 'counter'])
+    overlay.toggle()
+    assert overlay.draw(pygame.Surface((1200, 1000))) == overlay.rect
+    assert len(overlay.lines) == 3
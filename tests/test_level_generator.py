@@ -0,0 +1,63 @@
+'''
+Brick Breaker - Level Generator Tests
+'''
+
+# Import the json library to write level manifests.
+import json
+
+# Import the pytest library.
+import pytest
+
+# Import the level generator and the level manifest.
+from level_generator import COLUMNS, ROWS, COLORS, BLANK, generate_level, generate_name, write_pack, LevelPack
+from simulation import LevelManifest, LEVEL_CACHE
+
+def test_same_seed_gives_the_same_level():
+    '''A seed always generates the same level and name, and different seeds give different levels'''
+    levels = [generate_level(seed) for seed in range(50)]
+    assert levels == [generate_level(seed) for seed in range(50)]
+    assert [generate_name(seed) for seed in range(50)] == [generate_name(seed) for seed in range(50)]
+    assert len({tuple(level) for level in levels}) > 40
+
+def test_generated_levels_are_valid():
+    '''Generated levels have the standard size, only brick characters, some bricks, and mirror about their middle column'''
+    for seed in range(200):
+        rows = generate_level(seed)
+        assert len(rows) == ROWS
+        assert all(len(row) == COLUMNS and set(row) <= set(COLORS + BLANK) and row == row[::-1] for row in rows)
+        assert sum(row.count(BLANK) for row in rows) < ROWS * COLUMNS
+
+def test_level_pack_round_trip(tmp_path):
+    '''A packed level file reads back every level it was written with, by index and by seed'''
+    path = tmp_path / 'endless.pack'
+    write_pack(path, 500, 20)
+    pack = LevelPack(path)
+    try:
+        assert len(pack) == 20
+        for seed in range(500, 520):
+            index = pack.find(seed)
+            assert pack[index] == (seed, generate_name(seed), ''.join(generate_level(seed)).encode())
+        assert pack.find(499) is None and pack.find(520) is None
+        with pytest.raises(IndexError):
+            pack[20]
+    finally:
+        pack.close()
+
+def test_truncated_pack_is_rejected(tmp_path):
+    '''A packed level file cut short is rejected when it is opened'''
+    path = tmp_path / 'endless.pack'
+    write_pack(path, 500, 20)
+    path.write_bytes(path.read_bytes()[:-1])
+    with pytest.raises(ValueError, match='truncated'):
+        LevelPack(path)
+
+def test_endless_levels_speed_up(tmp_path):
+    '''Endless levels are generated from consecutive seeds, and their ball speed rises with their depth up to the maximum'''
+    path = tmp_path / 'manifest.json'
+    path.write_text(json.dumps({
+        'levels': [{'name': 'Heart', 'file': 'level_1.txt', 'ball_speed': 4}],
+        'endless': {'seed': 1000, 'ball_speed': 7, 'speed_up_every': 3, 'max_ball_speed': 9},
+    }))
+    manifest = LevelManifest(str(path))
+    assert [manifest.ball_speed(level_number) for level_number in range(1, 12)] == [4, 7, 7, 7, 8, 8, 8, 9, 9, 9, 9]
+    assert manifest.level(3, LEVEL_CACHE).brick_map == 'generated:1001'
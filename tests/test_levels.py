@@ -0,0 +1,118 @@
+'''
+Brick Breaker - Level Loading and Brick Rule Tests
+'''
+
+# Import the array class to build bad levels.
+from array import array
+
+# Import the pytest library.
+import pytest
+
+# Import the headless simulation core and the other ball backends.
+from simulation import MAX_LEVEL_COLUMNS, MAX_LEVEL_ROWS, BRICK_TYPES, Simulation, CompiledLevel, LevelCache, compile_level_file, create_simulation, tracking_policy
+from swept import SweptSimulation
+from batch import start_level
+
+from conftest import make_level
+
+def vector_simulation():
+    '''Return the NumPy ball backend, skipping the test if NumPy is not installed'''
+    pytest.importorskip('numpy')
+    from ball_system import VectorSimulation
+    return VectorSimulation
+
+def write_level(tmp_path, text):
+    '''Write a level file and return its path'''
+    path = tmp_path / 'level.txt'
+    path.write_text(text)
+    return str(path)
+
+def test_level_file_compiles(tmp_path):
+    '''A level file compiles to one brick code per cell, row by row'''
+    cells, columns = compile_level_file(write_level(tmp_path, 'XR#\n3XB\n'))
+    assert columns == 3
+    assert [BRICK_TYPES[code][0] for code in cells] == list('XR#3XB')
+
+def test_shipped_levels_compile():
+    '''Every level file shipped with the game compiles'''
+    levels = LevelCache().load_directory('levels')
+    assert levels
+    for level in levels.values():
+        assert len(level.cells) == level.rows * level.columns
+
+@pytest.mark.parametrize('text, message', [
+    ('XXX\nXX\nXXX\n', 'row 2: expected 3 characters, found 2'),
+    ('XXX\nXQX\n', "row 2, column 2: unknown brick character 'Q'"),
+    ('X' * (MAX_LEVEL_COLUMNS + 1) + '\n', f'row 1: expected 1 to {MAX_LEVEL_COLUMNS} characters, found {MAX_LEVEL_COLUMNS + 1}'),
+    ('XXX\n' * (MAX_LEVEL_ROWS + 1), f'expected at most {MAX_LEVEL_ROWS} rows'),
+    ('', 'the level has no rows'),
+    ('\nXXX\n', 'row 1: expected 1 to'),
+], ids=['ragged', 'unknown character', 'too wide', 'too tall', 'empty', 'empty first row'])
+def test_bad_level_file_is_rejected(tmp_path, text, message):
+    '''A level file that is not a grid of brick characters the playfield can show is rejected, saying where it went wrong'''
+    path = write_level(tmp_path, text)
+    with pytest.raises(ValueError, match=message):
+        compile_level_file(path)
+    with pytest.raises(ValueError, match=message):
+        LevelCache().load(path, 'bad')
+
+@pytest.mark.parametrize('cells, columns, message', [
+    (array('B'), 11, 'found 0 cells'),
+    (array('B', [1] * 10), 3, 'found 10 cells in rows of 3'),
+    (array('B', [1] * 3), 0, 'found 3 cells in rows of 0'),
+    (array('B', [1] * (MAX_LEVEL_ROWS + 1)), 1, f'expected at most {MAX_LEVEL_ROWS} rows'),
+    (array('B', [1, 255, 1]), 3, 'unknown brick code 255'),
+], ids=['empty', 'ragged', 'no columns', 'too tall', 'unknown code'])
+def test_bad_compiled_level_is_rejected(cells, columns, message):
+    '''A compiled level, e.g. from a stale disk cache or a level pack, is checked as a level file is'''
+    with pytest.raises(ValueError, match=message):
+        CompiledLevel('bad', 'bad', cells, columns)
+
+def test_multi_hit_brick_takes_its_hits(hard_level):
+    '''A three-hit brick is damaged by its first two hits and broken by the third, scoring only when it breaks'''
+    simulation = create_simulation(seed=1, start=False)
+    start_level(simulation, hard_level, 1)
+    count = len(simulation.brick_group)
+    for hits_left in (2, 1):
+        brick = next(brick for brick in simulation.brick_group if brick.row == 2 and brick.column == 0)
+        simulation.strike_brick(brick)
+        brick = next(brick for brick in simulation.brick_group if brick.row == 2 and brick.column == 0)
+        assert brick.hits == hits_left
+        assert len(simulation.brick_group) == count
+        assert simulation.player.score == 0
+    simulation.strike_brick(brick)
+    assert len(simulation.brick_group) == count - 1
+    assert simulation.player.score > 0
+
+def test_indestructible_brick_survives_hits(hard_level):
+    '''Striking an indestructible brick leaves it standing, and it does not count towards clearing the level'''
+    simulation = create_simulation(seed=1, start=False)
+    start_level(simulation, hard_level, 1)
+    assert simulation.brick_group.breakable == 11
+    for i in range(5):
+        simulation.strike_brick(next(iter(simulation.brick_group)))
+    assert len(simulation.brick_group) == 22
+
+def test_level_with_only_indestructible_bricks_left_is_complete():
+    '''A level is complete once only indestructible bricks are left'''
+    simulation = create_simulation(seed=1, start=False)
+    start_level(simulation, make_level(['#' * 5 + 'R' + '#' * 5] + ['X' * 11] * 11), 1)
+    simulation.strike_brick(next(brick for brick in simulation.brick_group if brick.hits))
+    simulation.step()
+    assert simulation.level_number == 2
+
+@pytest.mark.parametrize('simulation_type', [Simulation, SweptSimulation, vector_simulation], ids=['Simulation', 'SweptSimulation', 'VectorSimulation'])
+def test_backends_keep_brick_rules(simulation_type, hard_level):
+    '''Every ball backend leaves indestructible bricks standing and breaks multi-hit bricks only after their hits'''
+    if not isinstance(simulation_type, type):
+        simulation_type = simulation_type()
+    simulation = create_simulation(simulation_type, seed=3, start=False)
+    start_level(simulation, hard_level, 1)
+    broken = []
+    simulation.on_brick_hit = lambda brick: broken.append(brick.code)
+    for tick in range(6000):
+        simulation.step(*tracking_policy(simulation))
+    assert simulation.level is hard_level
+    codes = simulation.brick_group.grid()
+    assert sum(1 for code in codes if code and not simulation.brick_group.brick_types[code][2]) == 11
+    assert broken and all(simulation.brick_group.brick_types[code][2] == 1 for code in broken)
@@ -0,0 +1,76 @@
+'''
+Brick Breaker - Network Play Tests
+'''
+
+# Import the asyncio and random libraries.
+import asyncio
+import random
+
+# Import the headless simulation core and network play.
+from simulation import create_simulation
+from netplay import (FIELDS, STATE_FIELDS, NO_EVENTS, EMPTY_VIEW, KEYFRAME, DELTAS, DELTAS_HEADER, CoopSimulation, GameView, encode_record,
+                     decode_record, encode_keyframe, benchmark)
+
+def random_view(rng, previous=None):
+    '''Return a view of random fields, each either unchanged from a previous view, moved a little, moved a lot, or resized'''
+    view = []
+    for index in range(len(FIELDS)):
+        old = previous[index] if previous else ()
+        choice = rng.randrange(4)
+        if choice == 0 and index < len(STATE_FIELDS):
+            view.append(old)
+        elif choice == 1 and old:
+            view.append(tuple(value + rng.randint(-128, 127) for value in old))
+        elif choice == 2 and old:
+            view.append(tuple(value + rng.randint(-100000, 100000) for value in old))
+        else:
+            view.append(tuple(rng.randint(-2 ** 31, 2 ** 31 - 1) for i in range(rng.randrange(8))))
+    return tuple(view)
+
+def test_record_round_trip():
+    '''Every tick record decodes to the view it was encoded from, whether fields are unchanged, deltas, or values'''
+    rng = random.Random(1)
+    previous = EMPTY_VIEW
+    data = bytearray()
+    views = []
+    for tick in range(500):
+        view = random_view(rng, previous)
+        data += encode_record(view, previous)
+        views.append(view)
+        previous = view[:len(STATE_FIELDS)] + NO_EVENTS
+
+    offset = 0
+    decoded = EMPTY_VIEW
+    for view in views:
+        decoded, offset = decode_record(data, offset, decoded)
+        assert decoded == view
+    assert offset == len(data)
+
+def test_view_follows_game():
+    '''A GameView given a keyframe and then batches of tick records keeps the same fields and bricks as the game'''
+    simulation = create_simulation(CoopSimulation, seed=4)
+    game_view = GameView()
+    game_view.apply(KEYFRAME, encode_keyframe(simulation, simulation.get_view()))
+    previous = simulation.get_view()[:len(STATE_FIELDS)] + NO_EVENTS
+    for batch in range(600):
+        records = bytearray()
+        first_tick = simulation.frame_counter + 1
+        for tick in range(4):
+            simulation.partner.input = (tick % 3 == 0, tick % 3 == 1)
+            simulation.step()
+            view = simulation.get_view()
+            records += encode_record(view, previous)
+            previous = view[:len(STATE_FIELDS)] + NO_EVENTS
+        game_view.apply(DELTAS, DELTAS_HEADER.pack(first_tick, 4) + records)
+        if simulation.level_started:
+            simulation.level_started = False
+            game_view.apply(KEYFRAME, encode_keyframe(simulation, view))
+        assert game_view.view[:len(STATE_FIELDS)] == view[:len(STATE_FIELDS)]
+        assert game_view.grid == simulation.brick_group.grid()
+        assert game_view.tick == simulation.frame_counter
+
+def test_spectators_over_localhost():
+    '''Spectators connected over localhost end with the server's game'''
+    stats = asyncio.run(benchmark(3, 1200))
+    assert stats['matches']
+    assert stats['ticks'] == 1200
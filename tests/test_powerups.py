@@ -0,0 +1,67 @@
+'''
+Brick Breaker - Power-Up Tests
+'''
+
+# Import the random library to seed the alias table draws.
+import random
+
+# Import the headless simulation core and the power-up engine.
+from simulation import TICKS_PER_SECOND, create_simulation
+from powerups import AliasTable, EffectTimers
+
+def test_alias_table_draws_outcomes_in_proportion_to_their_weights():
+    '''Seeded draws from an alias table come out at each outcome's share of the weights, and repeat for the same seed'''
+    weights = {None: 80, 'AddBall': 8, 'BigPaddle': 5, 'Missiles': 4, 'Monkey': 3}
+    table = AliasTable(weights)
+    draws = 200000
+    rng = random.Random(1)
+    samples = [table.sample(rng) for i in range(draws)]
+    for outcome, weight in weights.items():
+        share = weight / sum(weights.values())
+        assert abs(samples.count(outcome) / draws - share) < 0.005
+
+    rng = random.Random(1)
+    assert [table.sample(rng) for i in range(1000)] == samples[:1000]
+
+def test_alias_table_never_draws_zero_weights():
+    '''An outcome of weight 0 is never drawn'''
+    table = AliasTable({'never': 0, 'rare': 1, 'common': 99})
+    rng = random.Random(2)
+    assert 'never' not in {table.sample(rng) for i in range(20000)}
+
+def test_effects_expire_in_deadline_order():
+    '''Effects end in the order of their deadlines, whatever order they started in, and ties end in the order they started'''
+    timers = EffectTimers()
+    timers.start('Missiles', 300)
+    timers.start('BigPaddle', 100)
+    timers.start('Monkey', 200)
+    timers.start('BigPaddle', 200)
+    assert timers.expired(99) == []
+    assert timers.expired(100) == ['BigPaddle']
+    assert timers.expired(250) == ['Monkey', 'BigPaddle']
+    assert len(timers) == 1
+    assert timers.expired(1000) == ['Missiles']
+    assert len(timers) == 0
+
+def test_effects_are_cleared_when_a_life_is_lost():
+    '''Losing a life ends every active effect, undoing what each one started'''
+    simulation = create_simulation(seed=1)
+    width = simulation.paddle.rect.width
+    for ptype in ('BigPaddle', 'Missiles', 'Monkey', 'BigPaddle'):
+        simulation.collect_powerup(ptype)
+    assert len(simulation.effects) == 4
+    assert simulation.paddle.rect.width > width
+    assert simulation.missile_launchers == 1
+    assert len(simulation.monkey_group) == 1
+
+    simulation.lose_life()
+    assert len(simulation.effects) == 0
+    assert simulation.paddle.rect.width == width
+    assert simulation.missile_launchers == 0
+    assert len(simulation.monkey_group) == 0
+
+    # No effect ends again once its timer would have run out.
+    simulation.frame_counter += TICKS_PER_SECOND * 11
+    simulation.update_effects()
+    assert simulation.paddle_boosts == 0
+    assert simulation.missile_launchers == 0
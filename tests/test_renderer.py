@@ -0,0 +1,76 @@
+'''
+Brick Breaker - Dirty Rectangle Renderer Tests
+'''
+
+# Import the pytest library.
+import pytest
+
+# Import the pygame library.
+import pygame
+
+# Import the headless simulation core, the renderer, and the game state snapshots.
+from simulation import WINDOW_WIDTH, WINDOW_HEIGHT, LEVEL_CACHE, create_simulation
+from renderer import DirtyRenderer
+from snapshot import save_snapshot, load_snapshot
+from batch import start_level
+
+@pytest.fixture
+def display():
+    '''Open a display on the dummy video driver, and close it again after the test'''
+    pygame.display.init()
+    surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
+    yield surface
+    pygame.display.quit()
+
+def make_game(level):
+    '''Return a headless game on a level, with the HUD drawing that the renderer calls left out'''
+    game = create_simulation(seed=1, start=False)
+    start_level(game, level, 1)
+    game.draw = lambda: None
+    return game
+
+def brick_color(renderer, brick):
+    '''Return the color of a brick's cell in the renderer's background'''
+    return tuple(renderer.background.get_at(brick.rect.center))[:3]
+
+def test_loaded_damaged_brick_is_drawn_damaged(tmp_path, display):
+    '''After a saved game with a damaged multi-hit brick is loaded, the rebuilt background shows the brick in its damaged color'''
+    level_path = tmp_path / 'damaged.txt'
+    level_path.write_text('3' * 11 + '\n' + 'X' * 11 + '\n')
+    level = LEVEL_CACHE.load(str(level_path), 'damaged')
+
+    # Damage one brick without breaking any, and save the game.
+    saved = make_game(level)
+    brick = next(iter(saved.brick_group))
+    saved.strike_brick(brick)
+    damaged = next(iter(saved.brick_group))
+    assert damaged.hits == 2 and len(saved.brick_group) == 11
+    save_path = tmp_path / 'quicksave.bbs'
+    save_snapshot(saved, save_path)
+
+    # Start a game on the same level, then load the saved game as F9 does.
+    game = make_game(level)
+    renderer = DirtyRenderer(display, game, [game.ball_group])
+    full_color = brick_color(renderer, next(iter(game.brick_group)))
+    load_snapshot(game, save_path)
+    renderer.rebuild()
+
+    bricks = game.brick_group.sprites()
+    assert brick_color(renderer, bricks[0]) == damaged.color != full_color
+    assert all(brick_color(renderer, brick) == full_color for brick in bricks[1:])
+
+def test_untouched_level_uses_the_brick_layer(display, monkeypatch):
+    '''The level's pre-rendered brick layer is used while every brick of the level stands, and not once one has broken'''
+    game = make_game(LEVEL_CACHE.load('levels/level_1.txt', 'Heart'))
+    layers = []
+    layer = game.level.layer
+    monkeypatch.setattr(game.level, 'layer', lambda HUD_height: layers.append(HUD_height) or layer(HUD_height))
+    renderer = DirtyRenderer(display, game, [game.ball_group])
+    assert layers == [game.HUD_height]
+
+    renderer.rebuild()
+    assert len(layers) == 2
+
+    next(iter(game.brick_group)).kill()
+    renderer.rebuild()
+    assert len(layers) == 2
@@ -0,0 +1,61 @@
+'''
+Brick Breaker - Replay Tests
+'''
+
+# Import the random library to script paddle inputs.
+import random
+
+# Import the headless simulation core and the replays.
+from simulation import create_simulation, tracking_policy
+from replay import ReplayLog, Recorder, Replay, state_checksum
+
+def record(simulation, ticks, input_seed=0):
+    '''Record a game with the tracking policy, random inputs every other ten seconds, and the bricks cleared once, and return its log'''
+    recorder = Recorder(simulation)
+    inputs = random.Random(input_seed)
+    for tick in range(ticks):
+        if tick // 1200 % 2:
+            left, right = inputs.random() < 0.5, inputs.random() < 0.5
+        else:
+            left, right = tracking_policy(simulation)
+        recorder.step(left, right, tick == ticks // 2)
+    return recorder.finish()
+
+def test_replay_round_trip(tmp_path):
+    '''A saved replay log loads unchanged and re-simulates to the recorded state'''
+    log = record(create_simulation(seed=11), 6000)
+    path = tmp_path / 'game.bbr'
+    log.save(path)
+    loaded = ReplayLog.load(path)
+    assert loaded.to_bytes() == log.to_bytes()
+
+    replay = Replay(loaded)
+    replay.run()
+    assert replay.verify()
+
+def test_replay_seek():
+    '''Seeking back and forth through a replay reaches the same state as playing straight to the tick'''
+    log = record(create_simulation(seed=12), 6000)
+    straight = Replay(log, snapshot_interval=600)
+    straight.run(4500)
+    expected = state_checksum(straight.simulation)
+
+    replay = Replay(log, snapshot_interval=600)
+    replay.run()
+    replay.seek(4500)
+    assert state_checksum(replay.simulation) == expected
+    replay.seek(100)
+    replay.seek(4500)
+    assert state_checksum(replay.simulation) == expected
+
+def test_resumed_recording_replays():
+    '''A recording started from a restored snapshot replays from that snapshot'''
+    simulation = create_simulation(seed=13)
+    for tick in range(2000):
+        simulation.step(*tracking_policy(simulation))
+    recorder = Recorder(simulation, resumed=True)
+    for tick in range(2000):
+        recorder.step(*tracking_policy(simulation))
+    replay = Replay(recorder.finish())
+    replay.run()
+    assert replay.verify()
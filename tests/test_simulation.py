@@ -0,0 +1,47 @@
+'''
+Brick Breaker - Simulation Tests
+'''
+
+# Import the random library to script paddle inputs.
+import random
+
+# Import the pygame library.
+import pygame
+
+# Import the headless simulation core.
+from simulation import create_simulation, tracking_policy
+
+def play(simulation, ticks, input_seed=0):
+    '''Step a simulation with the tracking policy, switching to random inputs for a while every few seconds'''
+    inputs = random.Random(input_seed)
+    for tick in range(ticks):
+        if tick // 600 % 2:
+            simulation.step(inputs.random() < 0.5, inputs.random() < 0.5)
+        else:
+            simulation.step(*tracking_policy(simulation))
+
+def test_seeded_games_repeat():
+    '''Two games of the same seed and inputs end in the same state, and a game of another seed does not'''
+    states = []
+    for seed in (7, 7, 8):
+        simulation = create_simulation(seed=seed)
+        play(simulation, 3000)
+        states.append(simulation.get_state())
+    assert states[0] == states[1]
+    assert states[0] != states[2]
+
+def test_runs_without_a_display():
+    '''A headless game plays without opening a display'''
+    simulation = create_simulation(seed=1)
+    play(simulation, 1200)
+    assert simulation.frame_counter == 1200
+    assert pygame.display.get_surface() is None
+
+def test_clearing_the_bricks_starts_the_next_level():
+    '''Once the last brick of a level is gone, the next tick starts the next level with its bricks laid out'''
+    simulation = create_simulation(seed=1)
+    simulation.clear_bricks()
+    simulation.step()
+    assert simulation.level_number == 2
+    assert len(simulation.brick_group) > 0
+    assert len(simulation.ball_group) == 1
@@ -0,0 +1,49 @@
+'''
+Brick Breaker - Snapshot Tests
+'''
+
+# Import the headless simulation core, the state checksum, and the snapshots.
+from simulation import Simulation, create_simulation, tracking_policy
+from replay import state_checksum
+from snapshot import take_snapshot, restore_snapshot, save_snapshot, load_snapshot, fork
+
+def test_snapshot_restore_round_trip(tmp_path):
+    '''A game restored from a snapshot, in memory or from a file, plays on exactly as the original does'''
+    simulation = create_simulation(seed=21)
+    for tick in range(3000):
+        simulation.step(*tracking_policy(simulation))
+    snapshot = take_snapshot(simulation)
+    path = tmp_path / 'game.bbs'
+    save_snapshot(simulation, path)
+
+    restored = create_simulation(seed=99, start=False)
+    restore_snapshot(restored, snapshot)
+    loaded = create_simulation(seed=98)
+    load_snapshot(loaded, path)
+    assert state_checksum(restored) == state_checksum(loaded) == state_checksum(simulation)
+    assert take_snapshot(restored) == snapshot
+
+    for tick in range(3000):
+        for game in (simulation, restored, loaded):
+            game.step(*tracking_policy(game))
+    assert state_checksum(restored) == state_checksum(loaded) == state_checksum(simulation)
+
+def test_fork_is_independent():
+    '''A fork plays out as the original does, and breaking bricks in either leaves the other's bricks alone'''
+    simulation = create_simulation(seed=22)
+    for tick in range(1000):
+        simulation.step(*tracking_policy(simulation))
+    bricks = simulation.brick_group.grid()
+    forked = fork(simulation, Simulation)
+    assert state_checksum(forked) == state_checksum(simulation)
+
+    for brick in forked.brick_group.sprites()[:5]:
+        brick.kill()
+    assert forked.brick_group.grid() != bricks
+    assert simulation.brick_group.grid() == bricks
+
+    forked = fork(simulation, Simulation)
+    for tick in range(3000):
+        for game in (simulation, forked):
+            game.step(*tracking_policy(game))
+    assert state_checksum(forked) == state_checksum(simulation)
@@ -0,0 +1,70 @@
+'''
+Brick Breaker - Sprite Pool Tests
+'''
+
+# Import the pygame library.
+import pygame
+
+# Import the pooled sprite base class and the sprite pool.
+from simulation import PooledSprite, SpritePool
+
+# Define classes.
+class Token(PooledSprite):
+    '''A pooled sprite that records the value it was last set up with'''
+    def __init__(self, value):
+        '''Initialize the token'''
+        super().__init__()
+        self.pooled = False
+        self.rect = pygame.Rect(0, 0, 1, 1)
+        self.setup(value)
+
+    def setup(self, value):
+        '''Set the token's value, as a new token or one reused from the pool'''
+        self.value = value
+
+def test_released_sprite_is_reused():
+    '''A killed sprite returns to the pool, and the next acquire sets it up again instead of creating a sprite'''
+    pool = SpritePool(Token)
+    group = pygame.sprite.Group()
+    token = pool.acquire(1)
+    group.add(token)
+    token.kill()
+    assert pool.stats()['free'] == 1
+
+    reused = pool.acquire(2)
+    assert reused is token
+    assert reused.value == 2
+    assert (pool.hits, pool.misses, pool.releases) == (1, 1, 1)
+
+def test_pool_stays_at_its_high_water_mark():
+    '''Acquiring and releasing the same number of sprites over and over creates no sprites beyond the most in use at once'''
+    pool = SpritePool(Token)
+    group = pygame.sprite.Group()
+    for cycle in range(10):
+        group.add(pool.acquire(cycle) for i in range(5))
+        group.empty()
+    stats = pool.stats()
+    assert stats['high_water'] == 5
+    assert stats['misses'] == 5
+    assert stats['free'] == 5
+    assert stats['in_use'] == 0
+
+def test_sprite_is_released_when_it_leaves_its_last_group():
+    '''A sprite removed from one of its groups stays in use until it has left every group'''
+    pool = SpritePool(Token)
+    first, second = pygame.sprite.Group(), pygame.sprite.Group()
+    token = pool.acquire(1)
+    first.add(token)
+    second.add(token)
+
+    first.remove(token)
+    assert pool.in_use == 1
+    assert not pool.free
+
+    second.remove(token)
+    assert pool.in_use == 0
+    assert pool.free == [token]
+
+    # Killing the sprite again once it is in the pool does not release it twice.
+    token.kill()
+    assert pool.releases == 1
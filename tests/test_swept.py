@@ -0,0 +1,17 @@
+'''
+Brick Breaker - Swept Collision Tests
+'''
+
+# Import the headless simulation core and the swept ball backend.
+from simulation import create_simulation, tracking_policy
+from swept import SweptSimulation
+
+def test_seeded_games_repeat():
+    '''Two games of the swept backend with the same seed and inputs end in the same state'''
+    states = []
+    for run in range(2):
+        simulation = create_simulation(SweptSimulation, seed=7)
+        for tick in range(3000):
+            simulation.step(*tracking_policy(simulation))
+        states.append(simulation.get_state())
+    assert states[0] == states[1]
@@ -0,0 +1,75 @@
+'''
+Brick Breaker - Fixed Timestep Tests
+'''
+
+# Import the pytest library.
+import pytest
+
+# Import the pygame library.
+import pygame
+
+# Import the fixed timestep and the render interpolator.
+import timestep
+from timestep import FixedTimestep, Interpolator
+
+@pytest.fixture
+def clock(monkeypatch):
+    '''A clock whose time only moves when a test moves it, used in place of the performance counter. The tests use a tick of 1/64 s
+    so that their times add up exactly.'''
+    now = [0.0]
+    monkeypatch.setattr(timestep.time, 'perf_counter', lambda: now[0])
+    return now
+
+def test_banked_time_pays_for_whole_ticks(clock):
+    '''Each frame runs the whole ticks its time pays for, carrying the rest over to the next frame'''
+    steps = FixedTimestep(tick_rate=64)
+    clock[0] += 3.5 / 64
+    assert steps.advance() == 3
+    assert steps.alpha == 0.5
+    clock[0] += 1.75 / 64
+    assert steps.advance() == 2
+    assert steps.alpha == 0.25
+
+    # A second of frames of any length runs a second of ticks.
+    ticks = 0
+    for frame in range(32):
+        clock[0] += 1 / 32
+        ticks += steps.advance()
+    assert ticks == 64
+
+def test_a_stall_is_capped(clock):
+    '''A frame after a long stall runs no more ticks than max_frame_time pays for'''
+    steps = FixedTimestep(tick_rate=64, max_frame_time=0.25)
+    clock[0] += 5.0
+    assert steps.advance() == 16
+    clock[0] += 1 / 64
+    assert steps.advance() == 1
+
+def test_reset_discards_the_time_of_a_pause(clock):
+    '''Time spent on a pause screen, and the time banked before it, are not run after reset'''
+    steps = FixedTimestep(tick_rate=64)
+    clock[0] += 1.5 / 64
+    assert steps.advance() == 1
+    clock[0] += 0.125
+    steps.reset()
+    assert steps.alpha == 0.0
+    clock[0] += 0.5 / 64
+    assert steps.advance() == 0
+    clock[0] += 0.5 / 64
+    assert steps.advance() == 1
+
+def test_interpolator_draws_between_ticks_and_restores():
+    '''Sprites are drawn part of the way from their last position, then put back where the tick left them'''
+    sprite = pygame.sprite.Sprite()
+    sprite.rect = pygame.Rect(0, 0, 10, 10)
+    interpolator = Interpolator([pygame.sprite.Group(sprite)])
+    interpolator.capture()
+    sprite.rect.topleft = (10, 20)
+    interpolator.apply(0.5)
+    assert sprite.rect.topleft == (5, 10)
+    interpolator.restore()
+    assert sprite.rect.topleft == (10, 20)
+
+    interpolator.clear()
+    interpolator.apply(0.5)
+    assert sprite.rect.topleft == (10, 20)
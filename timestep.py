@@ -0,0 +1,87 @@
+'''
+Brick Breaker - Fixed Timestep
+'''
+
+# Import the time library.
+import time
+
+# Import the tick rate of the simulation.
+from simulation import TICKS_PER_SECOND
+
+# Define classes.
+class FixedTimestep:
+    '''A class to run the simulation at a fixed tick rate whatever the frame rate, by accumulating real time and spending it in whole ticks.
+
+    A slow frame is caught up with extra ticks, so game time, the level timer, and the score stay tied to real time rather than to
+    how fast frames are drawn. The time left over after the last whole tick gives the fraction of a tick to interpolate the
+    drawing by.'''
+    def __init__(self, tick_rate=TICKS_PER_SECOND, max_frame_time=0.25):
+        '''Initialize the timestep'''
+        # Define the length of a tick in seconds.
+        self.tick_time = 1 / tick_rate
+
+        # Define the longest time a single frame may add, so that a stall (e.g. dragging the window) cannot demand an endless catch up.
+        self.max_frame_time = max_frame_time
+
+        self.reset()
+
+    def reset(self):
+        '''Start accumulating time from now, discarding the time banked so far, e.g. when play resumes after a pause screen'''
+        self.last_time = time.perf_counter()
+        self.accumulator = 0.0
+
+    def advance(self):
+        '''Bank the real time since the last call and return the number of whole ticks it pays for'''
+        now = time.perf_counter()
+        self.accumulator += min(now - self.last_time, self.max_frame_time)
+        self.last_time = now
+        ticks = int(self.accumulator / self.tick_time)
+        self.accumulator -= ticks * self.tick_time
+        return ticks
+
+    @property
+    def alpha(self):
+        '''Return how far through the next tick the banked time reaches, from 0 to 1'''
+        return min(self.accumulator / self.tick_time, 1.0)
+
+class Interpolator:
+    '''A class to draw moving sprites part of the way between their positions before and after the last tick.
+
+    capture() is called before the last tick of a frame, and apply() and restore() around drawing the frame, so the game
+    rules only ever see the sprites' true positions. Sprites created by the last tick are drawn where they are.'''
+    def __init__(self, sprite_groups):
+        '''Initialize the interpolator'''
+        self.sprite_groups = sprite_groups
+
+        # Define the positions of the sprites before the last tick, and their true positions while they are moved for drawing.
+        self.previous = {}
+        self.actual = []
+
+    def capture(self):
+        '''Store the position of every sprite before a tick'''
+        self.previous = {sprite: sprite.rect.topleft for group in self.sprite_groups for sprite in group}
+
+    def clear(self):
+        '''Forget the stored positions, so that the next frame is drawn as simulated, e.g. after a pause screen'''
+        self.previous = {}
+
+    def apply(self, alpha):
+        '''Move each sprite to its interpolated position for drawing'''
+        self.actual = []
+        if not self.previous or alpha >= 1.0:
+            return
+        for group in self.sprite_groups:
+            for sprite in group:
+                previous = self.previous.get(sprite)
+                if previous is None:
+                    continue
+                x, y = sprite.rect.topleft
+                if previous != (x, y):
+                    self.actual.append((sprite, x, y))
+                    sprite.rect.topleft = (round(previous[0] + (x - previous[0]) * alpha), round(previous[1] + (y - previous[1]) * alpha))
+
+    def restore(self):
+        '''Return the sprites moved by apply() to their true positions'''
+        for sprite, x, y in self.actual:
+            sprite.rect.topleft = (x, y)
+        self.actual = []